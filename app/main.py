@@ -1,13 +1,19 @@
+import hashlib
+import json
 import logging
 import os
+import time
 from datetime import datetime, timedelta
-from typing import List, Annotated, Union
+from typing import List, Annotated, Optional, Union
 
 from dotenv import load_dotenv
 from fastapi import Request, FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
 from jose import JWTError, jwt
+from strawberry.fastapi import GraphQLRouter
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
@@ -18,7 +24,11 @@ from shared.models.group import Group
 from shared.models.message import Message
 from shared.models.media import Media
 from shared.exceptions.database_exception import DatabaseException
+from shared.exceptions.overloaded_exception import OverloadedException
 from shared.services.authen import AuthService
+from shared.services.cache import Lru_cache
+from shared.services import serializer
+from shared.services.graphql_schema import schema, Graphql_loaders
 
 # FastAPI instance
 app = FastAPI()
@@ -45,8 +55,26 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM = os.getenv('ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES')
 
+# Verified token claims, indexed by the digest of the token
+token_cache = Lru_cache(int(os.getenv('TOKEN_CACHE_SIZE', '10000')))
+TOKEN_CACHE_MAX_TTL = float(os.getenv('TOKEN_CACHE_MAX_TTL', '300'))
+
+# Largest key accepted and size of the chunks keys are sent in, in bytes
+KEY_MAX_SIZE = int(os.getenv('KEY_MAX_SIZE', str(16 * 1024 * 1024)))
+KEY_CHUNK_SIZE = int(os.getenv('KEY_CHUNK_SIZE', str(64 * 1024)))
+
 active_connections: set = set()
 
+# Function to create the context of a GraphQL request, with its own loaders
+async def get_graphql_context():
+    return {"loaders": Graphql_loaders(bdd_service)}
+
+# GraphQL API, the lookups of a request are batched by its loaders
+app.include_router(
+        GraphQLRouter(schema, context_getter = get_graphql_context),
+        prefix = "/graphql"
+        )
+
 # Function to create JWT tokens
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -97,12 +125,12 @@ async def auth_account(
         password: Annotated[str, Body()]
         ):
     try:
-        successful, statusOrId = auth_service.login(email, password)
+        successful, statusOrId = await auth_service.login(email, password)
         if not(successful):
             res = {"error": statusOrId}
         else:
             res = {"auth_id": statusOrId}
-    except DatabaseException as e:
+    except (DatabaseException, OverloadedException) as e:
         res = {"error": str(e)}
     return res
 
@@ -124,12 +152,15 @@ async def create_account(
         password: Annotated[str, Body()]
         ):
     try:
-        successful, statusOrId = auth_service.create_account(email, password)
+        successful, statusOrId = await auth_service.create_account(
+                email,
+                password
+                )
         if not(successful):
             res = {"error": statusOrId}
         else:
             res = {"auth_id": statusOrId}
-    except DatabaseException as e:
+    except (DatabaseException, OverloadedException) as e:
         res = {"error": str(e)}
     return res
 
@@ -140,15 +171,109 @@ async def change_account(
         password: Annotated[str, Body()]
         ):
     try:
-        successful, statusOrId = auth_service.change_account(old_email, email, password)
+        successful, statusOrId = await auth_service.change_account(
+                old_email,
+                email,
+                password
+                )
         if not(successful):
             res = {"error": statusOrId}
         else:
             res = {"email": email}
-    except DatabaseException as e:
+    except (DatabaseException, OverloadedException) as e:
         res = {"error": str(e)}
     return res
 
+# Function to read the "fields" query parameter, a comma separated list of
+# attributes to return, None to return them all
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+# Function to serialize only the requested attributes of a model, the id is
+# always kept
+def select_fields(model, fields: Optional[list]) -> dict:
+    attributes = model.to_dict()
+    if fields is None:
+        return attributes
+    return {
+            field: attributes[field]
+            for field in ['id'] + fields
+            if field in attributes
+            }
+
+
+# Response encoding its content with the fast serializer, the content can
+# contain models, for the routes returning lists
+class Fast_json_response(JSONResponse):
+    def render(self, content) -> bytes:
+        return serializer.dumps(content)
+
+
+# Function to check if the client asked for a stream of json lines
+def wants_ndjson(request: Request) -> bool:
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+# Function to check if the client asked for raw binary content
+def wants_binary(request: Request) -> bool:
+    return "application/octet-stream" in request.headers.get("accept", "")
+
+
+# Function to encode models as json lines while they are read from the
+# database, an error after the first line is sent as a last line
+def ndjson_lines(models, fields: Optional[list]):
+    try:
+        for model in models:
+            yield serializer.dumps(select_fields(model, fields)) + b"\n"
+    except DatabaseException as e:
+        yield serializer.dumps({"error": str(e)}) + b"\n"
+
+
+# Function to stream models as a NDJSON response
+def ndjson_response(models, fields: Optional[list]) -> StreamingResponse:
+    return StreamingResponse(
+            ndjson_lines(models, fields),
+            media_type = "application/x-ndjson"
+            )
+
+
+# Function to read a key from the body of a request as it arrives
+async def read_key(request: Request) -> memoryview:
+    key = bytearray()
+    async for chunk in request.stream():
+        key += chunk
+        if len(key) > KEY_MAX_SIZE:
+            raise ValueError(f"Key larger than {KEY_MAX_SIZE} bytes.")
+    return memoryview(key)
+
+
+# Function to send a key as it is stored, by slices of its buffer (copied to
+# bytes, the only binary chunks a StreamingResponse sends as is)
+async def key_chunks(key: memoryview):
+    for start in range(0, len(key), KEY_CHUNK_SIZE):
+        yield bytes(key[start:start + KEY_CHUNK_SIZE])
+
+
+# Function to decode a token, reusing the claims of a token already verified
+# until it expires
+def decode_token(token: str) -> dict:
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        # The cached claims are shared, callers get their own copy
+        return dict(payload)
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = TOKEN_CACHE_MAX_TTL
+    expiration = payload.get("exp")
+    if expiration is not None:
+        ttl = min(ttl, expiration - time.time())
+    token_cache.set(digest, dict(payload), ttl)
+    return payload
+
+
 # Function to get the current user from the token
 def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -157,7 +282,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
             )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -166,6 +291,14 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     return username
 
 
+# API Route for the counters of the token cache
+@app.get("/token/cache/stats")
+async def get_token_cache_stats(
+        current_user: str = Depends(get_current_user)
+        ):
+    return {"token_cache": token_cache.stats()}
+
+
 # API Route for protected data
 @app.get("/protected-data")
 async def get_protected_data(current_user: str = Depends(get_current_user)):
@@ -207,6 +340,15 @@ async def message_ws(websocket: WebSocket, group_id: str):
         await websocket.close()
 
 
+# Function to send a message to every socket opened on its group
+async def broadcast_message(message: Message):
+    data = json.dumps(message.to_dict())
+    group_id = str(message.get_receiver_group_id())
+    for connection, connection_group_id in active_connections.copy():
+        if connection_group_id == group_id:
+            await connection.send_text(data)
+
+
 # RESTful API routes
 
 
@@ -218,7 +360,7 @@ def create_group(name: Annotated[str, Body()]):
         logging.info("Création d'un groupe.")
         group = Group(name)
         group_id = bdd_service.create_group(group)
-        res = {"id": group_id, "group": vars(group)}
+        res = {"id": group_id, "group": group.to_dict()}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
@@ -262,62 +404,171 @@ def add_user_to_group(group_id: str, user_id: str):
     return res
 
 
+@app.post("/group/add_users/{group_id}")
+def add_users_to_group(
+        group_id: str,
+        user_ids: Annotated[List[Union[str, int]], Body(embed=True)]
+        ):
+    try:
+        logging.info(
+                f"Ajout de {len(user_ids)} utilisateurs au groupe ID: {group_id}."
+                )
+        added = bdd_service.add_users_to_group(user_ids, group_id)
+        res = {"users_added": added, "group": group_id}
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return res
+
+@app.post("/group/remove_users/{group_id}")
+def remove_users_from_group(
+        group_id: str,
+        user_ids: Annotated[List[Union[str, int]], Body(embed=True)]
+        ):
+    try:
+        logging.info(
+                f"Suppression de {len(user_ids)} utilisateurs "
+                f"du groupe ID: {group_id}."
+                )
+        removed = bdd_service.remove_users_from_group(user_ids, group_id)
+        res = {"users_removed": removed, "group": group_id}
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return res
+
+
 @app.get("/group/{group_id}")
-def get_group(group_id: str):
+def get_group(group_id: str, fields: Optional[str] = None):
     try:
         logging.info(f"Récupération du groupe ID: {group_id}.")
-        group_or_none = bdd_service.get_group(group_id)
+        fields = parse_fields(fields)
+        group_or_none = bdd_service.get_group(group_id, fields)
         if (group_or_none == None):
             return {}
-        res = {"group": vars(group_or_none)}
+        res = {"group": select_fields(group_or_none, fields)}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
 
-@app.get("/group/get_by_user/{user_id}")
-def get_groups_by_user(user_id: str):
+@app.get("/group/get_by_user/{user_id}", response_class = Fast_json_response)
+def get_groups_by_user(
+        request: Request,
+        user_id: str,
+        fields: Optional[str] = None
+        ):
     try:
         logging.info(f"Récupération des groupes de l'utilisateur ID: {user_id}.")
+        fields = parse_fields(fields)
+        if wants_ndjson(request):
+            return ndjson_response(
+                    bdd_service.stream_groups_user(user_id, fields),
+                    fields
+                    )
         res = {
                 "user": user_id,
                 "groups": {
-                    element.id: vars(element)
-                    for element in bdd_service.get_groups_user(user_id)
+                    element.id: select_fields(element, fields)
+                    for element in bdd_service.get_groups_user(user_id, fields)
                     }
                 }
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
+
+@app.get(
+        "/group/get_by_user_with_users/{user_id}",
+        response_class = Fast_json_response
+        )
+def get_groups_with_users_by_user(user_id: str):
+    try:
+        logging.info(
+                f"Récupération des groupes et de leurs membres "
+                f"de l'utilisateur ID: {user_id}."
+                )
+        groups = bdd_service.get_groups_with_users_user(user_id)
+        res = {
+                "user": user_id,
+                "groups": {
+                    group.id: {
+                        "id": group.id,
+                        "name": group.name,
+                        "users": [user.id for user in group.get_users()],
+                        }
+                    for group in groups
+                    },
+                "users": {
+                    user.id: user.to_dict()
+                    for group in groups
+                    for user in group.get_users()
+                    }
+                }
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return Fast_json_response(res)
 
-@app.get("/group/get_users/{group_id}")
-def get_users_in_group(group_id: str):
+@app.get("/group/summary/{user_id}", response_class = Fast_json_response)
+def get_group_summaries(user_id: str):
+    try:
+        logging.info(f"Récupération du résumé des groupes de l'utilisateur ID: {user_id}.")
+        res = {
+                "user": user_id,
+                "groups": [
+                    element.to_dict()
+                    for element in bdd_service.get_group_summaries_user(user_id)
+                    ]
+                }
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return Fast_json_response(res)
+
+@app.get("/group/get_users/{group_id}", response_class = Fast_json_response)
+def get_users_in_group(group_id: str, fields: Optional[str] = None):
     try:
         logging.info(f"Récupération des utilisateurs dans le groupe ID: {group_id}.")
+        fields = parse_fields(fields)
         res = {
                 "group": group_id,
                 "users": [
-                    vars(element)
-                    for element in bdd_service.get_users_in_group(group_id)
+                    select_fields(element, fields)
+                    for element in bdd_service.get_users_in_group(group_id, fields)
                     ]
                 }
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
 
 # User Routes
 @app.get("/user/get/{user_id}")
-async def get_user(user_id: str):
+async def get_user(user_id: str, fields: Optional[str] = None):
     try:
-        user_or_none = bdd_service.get_user(user_id)
+        fields = parse_fields(fields)
+        user_or_none = bdd_service.get_user(user_id, fields)
         if (user_or_none == None):
             return {}
-        res = {"user": vars(user_or_none)}
+        res = {"user": select_fields(user_or_none, fields)}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
 
+@app.post("/user/get_many", response_class = Fast_json_response)
+def get_users(
+        ids: Annotated[List[Union[str, int]], Body(embed=True)],
+        fields: Optional[str] = None
+        ):
+    try:
+        fields = parse_fields(fields)
+        res = {
+                "users": {
+                    user_id: select_fields(user, fields)
+                    for user_id, user in bdd_service.get_users(ids, fields).items()
+                    }
+                }
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return Fast_json_response(res)
+
+
 @app.get("/user/from_auth/{auth_id}")
 async def get_user_auth(auth_id: str):
     try:
@@ -326,7 +577,7 @@ async def get_user_auth(auth_id: str):
             return {"auth": auth_id}
         res = {
                 "auth": auth_id,
-                "user": vars(user_or_none)
+                "user": user_or_none.to_dict()
                 }
     except DatabaseException as e:
         res = {"error": str(e)}
@@ -349,7 +600,7 @@ def create_user(name: Annotated[str, Body()],
                 auth_id = auth_id
                 )
         user_id = bdd_service.create_user(user)
-        res = {"id": user_id, "user": vars(user)}
+        res = {"id": user_id, "user": user.to_dict()}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
@@ -384,14 +635,14 @@ def delete_user(user_id: str):
         res = {"error": str(e)}
     return res
 
-@app.get("/user/get_by_name/{name}")
+@app.get("/user/get_by_name/{name}", response_class = Fast_json_response)
 def get_by_name(name: str):
     try:
         user_or_none = bdd_service.get_user_name(name)
-        res = {"users": [vars(i) for i in user_or_none]}
+        res = {"users": [i.to_dict() for i in user_or_none]}
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
 
 @app.get("/user/get_by_email/{email}")
 def get_by_email(email: str):
@@ -399,19 +650,25 @@ def get_by_email(email: str):
         user_or_none = bdd_service.get_user_email(email)
         if (user_or_none == None):
             return {}
-        res = {"user": vars(user_or_none)}
+        res = {"user": user_or_none.to_dict()}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
 
-@app.get("/user/get_all")
-def get_all_users():
+@app.get("/user/get_all", response_class = Fast_json_response)
+def get_all_users(request: Request, fields: Optional[str] = None):
     try:
-        res = {"users": [vars(element) for element in bdd_service.get_all_users()]}
+        fields = parse_fields(fields)
+        if wants_ndjson(request):
+            return ndjson_response(bdd_service.stream_all_users(fields), fields)
+        res = {"users": [
+            select_fields(element, fields)
+            for element in bdd_service.get_all_users(fields)
+            ]}
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
 
 # Message Routes
 
@@ -427,28 +684,79 @@ def delete_message(message_id: str):
 
 
 @app.get("/message/get/{message_id}")
-def get_message(message_id: str):
+def get_message(message_id: str, fields: Optional[str] = None):
     try:
-        message_or_none = bdd_service.get_message(message_id)
+        fields = parse_fields(fields)
+        message_or_none = bdd_service.get_message(message_id, fields)
         if (message_or_none == None):
             return {}
         logging.info(f"Récupération du message ID: {message_id}.")
-        res = {"message": vars(message_or_none)}
+        res = {"message": select_fields(message_or_none, fields)}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
-@app.get("/message/get/group/{group_id}")
-def get_all_message_group(group_id: str):
+@app.get("/message/get/group/{group_id}", response_class = Fast_json_response)
+def get_all_message_group(
+        request: Request,
+        group_id: str,
+        hydrate: bool = False,
+        fields: Optional[str] = None
+        ):
     try:
         logging.info(f"Récupération des messages du group {group_id}.")
-        res = {"message": [
-            vars(message)
-            for message in bdd_service.get_all_messages_group(group_id)
-            ]}
+        fields = parse_fields(fields)
+        if not(hydrate):
+            if wants_ndjson(request):
+                return ndjson_response(
+                        bdd_service.stream_messages_group(group_id, fields),
+                        fields
+                        )
+            res = {"message": [
+                select_fields(message, fields)
+                for message in bdd_service.get_all_messages_group(
+                    group_id,
+                    fields
+                    )
+                ]}
+        else:
+            messages, users, group, medias = bdd_service.get_history_group(
+                    group_id,
+                    fields
+                    )
+            res = {
+                    "message": [
+                        select_fields(message, fields) for message in messages
+                        ],
+                    "users": {
+                        user_id: user.to_dict()
+                        for user_id, user in users.items()
+                        },
+                    "group": None if group is None else group.to_dict(),
+                    "medias": {
+                        message_id: [media.to_dict() for media in message_medias]
+                        for message_id, message_medias in medias.items()
+                        },
+                    }
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
+
+@app.get("/message/page/group/{group_id}")
+def get_message_page_group(
+        request: Request,
+        group_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+        ):
+    try:
+        logging.info(f"Récupération de la page de messages du group {group_id}.")
+        page = bdd_service.get_message_page_group(group_id, offset, limit)
+    except (DatabaseException, ValueError) as e:
+        return {"error": str(e)}
+    if wants_binary(request):
+        return Response(page.to_bytes(), media_type = "application/octet-stream")
+    return Response(page.to_json(), media_type = "application/json")
 
 @app.post("/message/create")
 def create_message(
@@ -466,7 +774,33 @@ def create_message(
                 date
                 )
         message_id = bdd_service.create_message(message)
-        res = {"message_id": message_id, "message": vars(message)}
+        res = {"message_id": message_id, "message": message.to_dict()}
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return res
+
+@app.post("/message/create_many")
+async def create_messages(messages: Annotated[List[dict], Body(embed=True)]):
+    try:
+        logging.info(f"Création de {len(messages)} nouveaux messages.")
+        new_messages = [
+                Message(
+                    element["content"],
+                    element["sender_id"],
+                    element["receiver_group_id"],
+                    element["date"]
+                    )
+                for element in messages
+                ]
+        message_ids = await run_in_threadpool(
+                bdd_service.create_messages,
+                new_messages
+                )
+        for message in new_messages:
+            await broadcast_message(message)
+        res = {"message_ids": message_ids}
+    except KeyError as e:
+        res = {"error": f"Missing field {e} in a message."}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
@@ -478,45 +812,94 @@ def get_media(media_id: str):
         media_or_none = bdd_service.get_media(media_id)
         if (media_or_none == None):
             return {}
-        res = {"media": vars(media_or_none)}
+        res = {"media": media_or_none.to_dict()}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
-@app.get("/media/get_by_message/{message_id}")
+@app.get(
+        "/media/get_by_message/{message_id}",
+        response_class = Fast_json_response
+        )
 def get_media_by_message(message_id: str):
     try:
         logging.info(f"Récupération du média pour le message ID: {message_id}.")
         res = {
                 "message_id": message_id,
                 "medias": [
-                    vars(element)
+                    element.to_dict()
                     for element in bdd_service.get_medias_message(message_id)
                     ]
                 }
     except DatabaseException as e:
         res = {"error": str(e)}
-    return res
+    return Fast_json_response(res)
+
+@app.post("/media/get_by_messages", response_class = Fast_json_response)
+def get_media_by_messages(
+        message_ids: Annotated[List[Union[str, int]], Body(embed=True)]
+        ):
+    try:
+        logging.info(f"Récupération des médias de {len(message_ids)} messages.")
+        res = {
+                "medias": {
+                    message_id: [media.to_dict() for media in medias]
+                    for message_id, medias
+                    in bdd_service.get_medias_messages(message_ids).items()
+                    }
+                }
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return Fast_json_response(res)
 
 @app.get("/key/public/get/{group_id}/{user_id}")
-def get_public_key(group_id: str, user_id: str):
+def get_public_key(request: Request, group_id: str, user_id: str):
     try:
         logging.info(
                 f"Récupération de la clé public du "
                 f"group {group_id} user {user_id}"
                 )
+        if wants_binary(request):
+            return StreamingResponse(
+                    key_chunks(
+                        bdd_service.get_public_key_buffer(group_id, user_id)
+                        ),
+                    media_type = "application/octet-stream"
+                    )
         res = {"key": bdd_service.get_public_key(group_id, user_id)}
     except DatabaseException as e:
         res = {"error": str(e)}
     return res
 
+@app.get(
+        "/key/public/get_group/{group_id}",
+        response_class = Fast_json_response
+        )
+def get_public_keys_group(group_id: str):
+    try:
+        logging.info(f"Récupération des clés publiques du group {group_id}")
+        res = {
+                "group": group_id,
+                "keys": bdd_service.get_public_keys_group(group_id)
+                }
+    except DatabaseException as e:
+        res = {"error": str(e)}
+    return Fast_json_response(res)
+
 @app.get("/key/private/get/{group_id}/{user_id}")
-def get_private_key(group_id: str, user_id: str):
+def get_private_key(request: Request, group_id: str, user_id: str):
     try:
         logging.info(
                 f"Récupération de la clé privée du "
                 f"group {group_id} user {user_id}"
                 )
+        if wants_binary(request):
+            return StreamingResponse(
+                    key_chunks(
+                        bdd_service.get_private_key_buffer(group_id, user_id)
+                        ),
+                    media_type = "application/octet-stream"
+                    )
         res = {"key": bdd_service.get_private_key(group_id, user_id)}
     except DatabaseException as e:
         res = {"error": str(e)}
@@ -532,10 +915,10 @@ async def store_private_key(
         logging.info(
                 "Stockage de la clé privée de group {group_id} user {user_id}"
                 )
-        key = await request.body()
+        key = await read_key(request)
         bdd_service.store_private_key(group_id, user_id, key)
         res = {}
-    except DatabaseException as e:
+    except (DatabaseException, ValueError) as e:
         res = {"error": str(e)}
     return res
 
@@ -549,10 +932,10 @@ async def store_public_key(
         logging.info(
                 "Stockage de la clé public de group {group_id} user {user_id}"
                 )
-        key = await request.body()
+        key = await read_key(request)
         bdd_service.store_public_key(group_id, user_id, key)
         res = {}
-    except DatabaseException as e:
+    except (DatabaseException, ValueError) as e:
         res = {"error": str(e)}
     return res
 
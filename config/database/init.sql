@@ -24,17 +24,94 @@ CREATE TABLE IF NOT EXISTS "Group" (
 CREATE TABLE IF NOT EXISTS "UserInGroup" (
     id SERIAL PRIMARY KEY,
     user_id INT REFERENCES "UserApp" (id) ON DELETE CASCADE,
-    group_id INT REFERENCES "Group" (id) ON DELETE CASCADE
+    group_id INT REFERENCES "Group" (id) ON DELETE CASCADE,
+    UNIQUE (user_id, group_id)
 );
 
+-- Databases created before the constraint: drop the duplicated memberships,
+-- then add the constraint under the name CREATE TABLE gives it
+DELETE FROM "UserInGroup" AS duplicate
+    USING "UserInGroup" AS kept
+    WHERE duplicate.user_id = kept.user_id
+    AND duplicate.group_id = kept.group_id
+    AND duplicate.id > kept.id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = '"UserInGroup"'::regclass
+        AND conname = 'UserInGroup_user_id_group_id_key'
+    ) THEN
+        ALTER TABLE "UserInGroup" ADD CONSTRAINT
+            "UserInGroup_user_id_group_id_key" UNIQUE (user_id, group_id);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS "UserInGroup_group_id_idx"
+    ON "UserInGroup" (group_id);
+
 CREATE TABLE IF NOT EXISTS "Message" (
     id SERIAL PRIMARY KEY,
-    content TEXT NOT NULL,
+    -- Either the text or, for a content compressed by Content_codec, the
+    -- compressed bytes and the name of the codec
+    content TEXT,
+    content_compressed BYTEA,
+    content_codec VARCHAR(16),
     sender_id INT REFERENCES "UserApp" (id) ON DELETE CASCADE,
     receiver_group_id INT REFERENCES "Group" (id) ON DELETE CASCADE,
     date_ BIGINT
 );
 
+ALTER TABLE "Message" ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE "Message" ADD COLUMN IF NOT EXISTS content_compressed BYTEA;
+ALTER TABLE "Message" ADD COLUMN IF NOT EXISTS content_codec VARCHAR(16);
+
+CREATE INDEX IF NOT EXISTS "Message_receiver_group_id_date_idx"
+    ON "Message" (receiver_group_id, date_);
+
+-- Maintained by Service_bdd.create_message(s) on inserts and by the
+-- "Message_delete_summary" trigger on deletes, cascades included
+CREATE TABLE IF NOT EXISTS "GroupSummary" (
+    group_id INT PRIMARY KEY REFERENCES "Group" (id) ON DELETE CASCADE,
+    last_message_id INT REFERENCES "Message" (id) ON DELETE SET NULL,
+    message_count INT NOT NULL DEFAULT 0,
+    last_activity BIGINT
+);
+
+-- Summaries of the groups whose messages were written before the table
+INSERT INTO "GroupSummary"
+    (group_id, last_message_id, message_count, last_activity)
+    SELECT DISTINCT ON (receiver_group_id)
+        receiver_group_id, id,
+        COUNT(*) OVER (PARTITION BY receiver_group_id), date_
+    FROM "Message"
+    WHERE receiver_group_id IS NOT NULL
+    ORDER BY receiver_group_id, date_ DESC, id DESC
+    ON CONFLICT (group_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION "GroupSummary_after_delete"() RETURNS trigger AS $$
+BEGIN
+    UPDATE "GroupSummary" SET
+        message_count = "GroupSummary".message_count - removed.count,
+        (last_message_id, last_activity) = (
+            SELECT "Message".id, "Message".date_ FROM "Message"
+            WHERE "Message".receiver_group_id = "GroupSummary".group_id
+            ORDER BY "Message".date_ DESC, "Message".id DESC
+            LIMIT 1)
+    FROM (
+        SELECT receiver_group_id, COUNT(*) AS count FROM deleted
+        GROUP BY receiver_group_id
+    ) AS removed
+    WHERE "GroupSummary".group_id = removed.receiver_group_id;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "Message_delete_summary" ON "Message";
+CREATE TRIGGER "Message_delete_summary" AFTER DELETE ON "Message"
+    REFERENCING OLD TABLE AS deleted
+    FOR EACH STATEMENT EXECUTE FUNCTION "GroupSummary_after_delete"();
+
 CREATE TABLE IF NOT EXISTS "Media" (
     id SERIAL PRIMARY KEY,
     type_ VARCHAR(50) NOT NULL,
@@ -46,12 +123,35 @@ CREATE TABLE IF NOT EXISTS "PublicKey" (
     id SERIAL PRIMARY KEY,
     group_id VARCHAR(255) NOT NULL,
     user_id VARCHAR(255) NOT NULL,
-    key TEXT NOT NULL
+    key BYTEA NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS "PublicKey_group_id_user_id_idx"
+    ON "PublicKey" (group_id, user_id);
+
 CREATE TABLE IF NOT EXISTS "PrivateKey" (
     id SERIAL PRIMARY KEY,
     group_id VARCHAR(255) NOT NULL,
     user_id VARCHAR(255) NOT NULL,
-    key TEXT NOT NULL
+    key BYTEA NOT NULL
 );
+
+CREATE INDEX IF NOT EXISTS "PrivateKey_group_id_user_id_idx"
+    ON "PrivateKey" (group_id, user_id);
+
+-- Databases created when the keys were stored as TEXT
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'PublicKey' AND column_name = 'key') <> 'bytea'
+    THEN
+        ALTER TABLE "PublicKey"
+            ALTER COLUMN key TYPE BYTEA USING convert_to(key, 'UTF8');
+    END IF;
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'PrivateKey' AND column_name = 'key') <> 'bytea'
+    THEN
+        ALTER TABLE "PrivateKey"
+            ALTER COLUMN key TYPE BYTEA USING convert_to(key, 'UTF8');
+    END IF;
+END $$;
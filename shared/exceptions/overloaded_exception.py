@@ -0,0 +1,4 @@
+class OverloadedException(Exception):
+    """ Raised when a bounded queue of work is full.
+    """
+    pass
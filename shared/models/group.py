@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Type
 import json
+from shared.services.serializer import loads_many
 from shared.models.user import User
 
 class Group:
@@ -9,7 +10,9 @@ class Group:
     Attributes:
         id (Optional[str]): Id of the group in the database.
         name (str): Name of the group.
-        l_users (list[User]): List of users in the group.
+        users (dict[Hashable, User]): Users in the group indexed by their id
+        (or by their attributes while they have no id), in the order they
+        were added.
     ---
     Methods:
         __eq__(Self, Other) -> bool: Check for equality between two groups.
@@ -17,10 +20,13 @@ class Group:
         __repr__(Self) -> str: Convert the instance to a displayable string.
         __str__(Self) -> str: Convert the instance to a string.
         from_json(str) -> Self: Convert a json string to a new goup.
+        from_json_many(Union[bytes, str]) -> list[Self]: Converts a json
+        array or newline delimited json to new groups.
         get_id(Self) -> Optional[str]: Returns the id of the current group.
         get_name(Self) -> str: Returns the name of the current group.
         get_id(Self, Optional[str]): Modify the id of the current group.
         get_name(Self, str): Modify the name of the current group.
+        to_dict(Self) -> dict: Converts the current instance to a dictionary.
         to_json(Self) -> str: Convert a group to a json string.
         add_user(Self, User): Adds a new user in the group.
         contains_user(Self, User) -> bool: Check if the given user is in the
@@ -29,10 +35,18 @@ class Group:
         of the current group.
         remove_user(Self, User) -> bool: Remove the given user from the group
         and return True iff the user was found.
-        set_users(Self, list[User]): Modify the list of user with a copy of the
-        given list.
+        set_users(Self, list[User]): Replace the users of the group with the
+        users of the given list.
+        user_key(User) -> Hashable: Returns the key of a user in the
+        membership of a group.
     """
 
+    __slots__ = (
+            'id',
+            'name',
+            'users',
+            )
+
     def __init__(
             self: Self,
             name: str,
@@ -56,7 +70,8 @@ class Group:
         """
         self.id = id
         self.name = name
-        self.l_users = l_users[:]
+        self.users = {}
+        self.set_users(l_users)
 
     def __eq__(self: Self, other: Group) -> bool:
         """ Check for equality between two instances.
@@ -159,6 +174,28 @@ class Group:
         """
         return self.name
 
+    def to_dict(self: Self) -> dict:
+        """ Converts the current instance to a dictionary of its attributes.
+        The users are converted to dictionaries too.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict): Attributes of the current instance.
+        ---
+        Example:
+        ```python
+        group = Group('my_group', id = '5')
+        assert(group.to_dict() == {"id": "5", "name": "my_group", "l_users": []})
+        ```
+        """
+        return {
+                "id": self.id,
+                "name": self.name,
+                "l_users": [user.to_dict() for user in self.users.values()],
+                }
+
     def to_json(self: Self) -> str:
         """ Convert the current instance to a json string.
         The id field is absent if None.
@@ -185,11 +222,11 @@ class Group:
             id_part = ''
         else:
             id_part =  f'"id": "{self.id}", '
-        if self.l_users == []:
+        if not(self.users):
             users_part = ''
         else:
             users_part =  f', "l_users": ' \
-                    f'"{[user.to_json() for user in self.l_users]}"'
+                    f'"{[user.to_json() for user in self.users.values()]}"'
         return f'{{{id_part}"name": "{self.name}"{users_part}}}'
 
     def __repr__(self: Self) -> str:
@@ -253,6 +290,53 @@ class Group:
         attributes = json.loads(json_string)
         return Group(**attributes)
 
+    @staticmethod
+    def from_json_many(data: Union[bytes, str]) -> list[Self]:
+        """ Creates new instances from a json array or newline delimited json
+        of groups, decoded in a single parse.
+        ---
+        Parameters:
+            data (Union[bytes, str]): Json array or newline delimited json of
+            objects with the attributes of each group.
+        ---
+        Returns:
+            (list[Self]): New groups, in order.
+        ---
+        Raises:
+            (ValueError): If the data is not valid json.
+        ---
+        Example:
+        ```python
+        groups = Group.from_json_many(
+                '{"name": "my_group"}\\n'
+                '{"id": "5", "name": "my_group"}\\n'
+                )
+        assert(groups == [Group('my_group'), Group('my_group', id = '5')])
+        ```
+        """
+        return [Group(**attributes) for attributes in loads_many(data)]
+
+    @staticmethod
+    def user_key(user: User) -> Hashable:
+        """ Returns the key of a user in the membership of a group.
+        ---
+        Parameters:
+            user (User): User to get the key of.
+        ---
+        Returns:
+            (Hashable): Id of the user, or the attributes compared by
+            User.__eq__ if the user has no id yet.
+        ---
+        Example:
+        ```python
+        user = User('name', 'first_name', 'email', 0, id = '5')
+        assert(Group.user_key(user) == '5')
+        ```
+        """
+        if user.id is not None:
+            return user.id
+        return (user.name, user.first_name, user.email, user.join_date)
+
     def get_users(self: Self) -> Iterator[User]:
         """ Returns an iterator over the users of the group.
         ---
@@ -269,11 +353,11 @@ class Group:
         assert(list(group.get_users()) == [user])
         ```
         """
-        return iter(self.l_users)
+        return iter(self.users.values())
 
     def set_users(self: Self, new_l_users: list[User]):
-        """ Empty the list of users and copy the users of the given list into
-        the new users list.
+        """ Replace the users of the group with the users of the given list,
+        indexed by their key.
         ---
         Parameters:
             self (Self): Current instance.
@@ -288,10 +372,11 @@ class Group:
         assert(list(group.get_users()) == [user])
         ```
         """
-        self.l_users = new_l_users[:]
+        self.users = {self.user_key(user): user for user in new_l_users}
 
     def add_user(self: Self, user: User):
-        """ Add the given user to the current group.
+        """ Add the given user to the current group, in constant time.
+        A user already in the group is replaced and keeps its position.
         ---
         Parameters:
             self (Self): Current instance.
@@ -306,10 +391,11 @@ class Group:
         assert(list(group.get_users()) == [user])
         ```
         """
-        self.l_users.append(user)
+        self.users[self.user_key(user)] = user
 
     def remove_user(self: Self, user: User) -> bool:
-        """ Remove the given user from the current group.
+        """ Remove the given user from the current group, in constant time.
+        The user is found by its key, see user_key.
         ---
         Parameters:
             self (Self): Current instance.
@@ -329,14 +415,12 @@ class Group:
         assert(not(group.remove_user(user)))
         ```
         """
-        try:
-            self.l_users.remove(user)
-        except ValueError:
-            return False
-        return True
+        return self.users.pop(self.user_key(user), None) is not None
 
     def contains_user(self:  Self, user: User) -> bool:
-        """ Checks if the given user is in the current group.
+        """ Checks if the given user is in the current group, in constant
+        time.
+        The user is found by its key, see user_key.
         ---
         Parameters:
             self (Self): Current instance.
@@ -354,4 +438,4 @@ class Group:
         assert(group.contains_user(user))
         ```
         """
-        return user in self.l_users
+        return self.user_key(user) in self.users
@@ -0,0 +1,294 @@
+from __future__ import annotations
+from typing import Type
+import json
+
+class GroupSummary:
+    """ Represents the activity of a group as shown in the conversation list.
+    ---
+    Attributes:
+        group_id (str): Id of the group.
+        group_name (str): Name of the group.
+        message_count (int): Number of messages sent in the group.
+        last_activity (Optional[int]): Date of the last message of the group.
+        last_message_id (Optional[str]): Id of the last message of the group.
+        last_message_content (Optional[str]): Content of the last message of
+        the group.
+        last_message_sender_id (Optional[str]): Id of the user who sent the
+        last message of the group.
+    ---
+    Methods:
+        __eq__(Self, GroupSummary) -> bool: Checks for equality between two
+        instances.
+        __init__(Self, str, str, int, Optional[int], Optional[str],
+        Optional[str], Optional[str]): Creates a new summary.
+        __repr__(Self) -> str: Converts the summary to a displayable string.
+        __str__(Self) -> str: Converts the summary to a string.
+        from_json(str) -> Self: Creates a new instance from a json string.
+        to_dict(Self) -> dict: Converts the current instance to a dictionary.
+        to_json(Self) -> str: Converts the current instance to a json string.
+        get_group_id(Self) -> str: Returns the id of the group.
+        get_group_name(Self) -> str: Returns the name of the group.
+        get_message_count(Self) -> int: Returns the number of messages of the
+        group.
+        get_last_activity(Self) -> Optional[int]: Returns the date of the last
+        message of the group.
+        get_last_message_id(Self) -> Optional[str]: Returns the id of the last
+        message of the group.
+        get_last_message_content(Self) -> Optional[str]: Returns the content
+        of the last message of the group.
+        get_last_message_sender_id(Self) -> Optional[str]: Returns the id of
+        the user who sent the last message of the group.
+    """
+
+    __slots__ = (
+            'group_id',
+            'group_name',
+            'message_count',
+            'last_activity',
+            'last_message_id',
+            'last_message_content',
+            'last_message_sender_id',
+            )
+
+    def __init__(
+            self: Self,
+            group_id: str,
+            group_name: str,
+            message_count: int = 0,
+            last_activity: Optional[int] = None,
+            last_message_id: Optional[str] = None,
+            last_message_content: Optional[str] = None,
+            last_message_sender_id: Optional[str] = None
+            ):
+        """ Creates a new summary.
+        The last message fields are None for a group without messages.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            group_name (str): Name of the group.
+            message_count (int): Number of messages sent in the group.
+            last_activity (Optional[int]): Date of the last message.
+            last_message_id (Optional[str]): Id of the last message.
+            last_message_content (Optional[str]): Content of the last message.
+            last_message_sender_id (Optional[str]): Id of the user who sent
+            the last message.
+        ---
+        Example:
+        ```python
+        summary = GroupSummary('3', 'my_group', 2, 1706873888, '5', 'Hi', '1')
+        ```
+        """
+        self.group_id = group_id
+        self.group_name = group_name
+        self.message_count = message_count
+        self.last_activity = last_activity
+        self.last_message_id = last_message_id
+        self.last_message_content = last_message_content
+        self.last_message_sender_id = last_message_sender_id
+
+    def __eq__(self: Self, other: GroupSummary) -> bool:
+        """ Check for equality between two instances.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            other (GroupSummary): Instance to compare to.
+        ---
+        Returns:
+            (bool): True iff the two instances have the same attributes.
+        ---
+        Example:
+        ```python
+        summary1 = GroupSummary('3', 'my_group')
+        summary2 = GroupSummary('3', 'my_group')
+        summary3 = GroupSummary('3', 'my_group', 1, 1706873888, '5', 'Hi', '1')
+        assert(summary1 == summary2)
+        assert(summary1 != summary3)
+        ```
+        """
+        if not(isinstance(other, GroupSummary)):
+            return False
+        return (self.group_id == other.group_id and
+                self.group_name == other.group_name and
+                self.message_count == other.message_count and
+                self.last_activity == other.last_activity and
+                self.last_message_id == other.last_message_id and
+                self.last_message_content == other.last_message_content and
+                self.last_message_sender_id == other.last_message_sender_id)
+
+    @staticmethod
+    def from_json(json_string: str) -> Self:
+        """ Create a new instance with the attributes given in a json formatted
+        string.
+        ---
+        Parameters:
+            json_string (str): Json string that contains the values of the
+            attributes of a new summary.
+        ---
+        Returns:
+            (Self): New summary with the values of the given json.
+        ---
+        Example:
+        ```python
+        summary = GroupSummary.from_json(
+                '{"group_id": "3", "group_name": "my_group"}'
+                )
+        assert(summary == GroupSummary('3', 'my_group'))
+        ```
+        """
+        attributes = json.loads(json_string)
+        return GroupSummary(**attributes)
+
+    def to_dict(self: Self) -> dict:
+        """ Converts the current instance to a dictionary of its attributes.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict): Attributes of the current instance.
+        ---
+        Example:
+        ```python
+        summary = GroupSummary('3', 'my_group')
+        assert(summary.to_dict()["group_name"] == 'my_group')
+        ```
+        """
+        return {
+                "group_id": self.group_id,
+                "group_name": self.group_name,
+                "message_count": self.message_count,
+                "last_activity": self.last_activity,
+                "last_message_id": self.last_message_id,
+                "last_message_content": self.last_message_content,
+                "last_message_sender_id": self.last_message_sender_id,
+                }
+
+    def to_json(self: Self) -> str:
+        """ Converts the current instance to a json string.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Json string containing the attributes of the current
+            instance.
+        ---
+        Example:
+        ```python
+        summary = GroupSummary('3', 'my_group')
+        assert(summary.to_json() == '{' \\
+                '"group_id": "3", ' \\
+                '"group_name": "my_group", ' \\
+                '"message_count": 0, ' \\
+                '"last_activity": null, ' \\
+                '"last_message_id": null, ' \\
+                '"last_message_content": null, ' \\
+                '"last_message_sender_id": null}'
+                )
+        ```
+        """
+        return json.dumps(self.to_dict())
+
+    def __repr__(self: Self) -> str:
+        """ Convert the current instance to a displayable string.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Attributes of the current instance in a json-formatted
+            string.
+        """
+        return self.to_json()
+
+    def __str__(self: Self) -> str:
+        """ Convert the current instance to a json string.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Attributes of the current instance in a json-formatted
+            string.
+        """
+        return self.to_json()
+
+    def get_group_id(self: Self) -> str:
+        """ Returns the id of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Id of the group.
+        """
+        return self.group_id
+
+    def get_group_name(self: Self) -> str:
+        """ Returns the name of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Name of the group.
+        """
+        return self.group_name
+
+    def get_message_count(self: Self) -> int:
+        """ Returns the number of messages sent in the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (int): Number of messages of the group.
+        """
+        return self.message_count
+
+    def get_last_activity(self: Self) -> Optional[int]:
+        """ Returns the date of the last message of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Optional[int]): Date of the last message, None without messages.
+        """
+        return self.last_activity
+
+    def get_last_message_id(self: Self) -> Optional[str]:
+        """ Returns the id of the last message of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Optional[str]): Id of the last message, None without messages.
+        """
+        return self.last_message_id
+
+    def get_last_message_content(self: Self) -> Optional[str]:
+        """ Returns the content of the last message of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Optional[str]): Content of the last message, None without
+            messages.
+        """
+        return self.last_message_content
+
+    def get_last_message_sender_id(self: Self) -> Optional[str]:
+        """ Returns the id of the user who sent the last message of the group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Optional[str]): Id of the sender of the last message, None without
+            messages.
+        """
+        return self.last_message_sender_id
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Type
 import json
+from shared.services.serializer import loads_many
 
 class Media:
     """ Represents a media sent with a message.
@@ -19,6 +20,11 @@ class Media:
         __repr__(Self) -> str: Converts the media to a displayable string.
         __str__(Self) -> str: Converts the media to a string.
         from_json(str) -> Self: Converts a json string to a new media.
+        from_json_many(Union[bytes, str]) -> list[Self]: Converts a json
+        array or newline delimited json to new medias.
+        from_row(tuple[int, str, str, int]) -> Self: Converts a row of the
+        Media table to a new media.
+        to_dict(Self) -> dict: Converts the current instance to a dictionary.
         to_json(Self) -> str: Converts the current instance to a json string.
         get_id(Self) -> Optional[str]: Returns the id of the current media.
         get_link(Self) -> str: Returns the link to the current media.
@@ -35,6 +41,14 @@ class Media:
         set_type(Self, str): Changes the type of media of the current instance.
     """
 
+    __slots__ = (
+            'name',
+            'type_',
+            'link',
+            'message_id',
+            'id',
+            )
+
     def __init__(
             self: Self,
             name: str,
@@ -119,6 +133,83 @@ class Media:
         attributes = json.loads(json_string)
         return Media(**attributes)
 
+    @staticmethod
+    def from_json_many(data: Union[bytes, str]) -> list[Self]:
+        """ Creates new instances from a json array or newline delimited json
+        of medias, decoded in a single parse.
+        ---
+        Parameters:
+            data (Union[bytes, str]): Json array or newline delimited json of
+            objects with the attributes of each media.
+        ---
+        Returns:
+            (list[Self]): New medias, in order.
+        ---
+        Raises:
+            (ValueError): If the data is not valid json.
+        ---
+        Example:
+        ```python
+        medias = Media.from_json_many(
+                '[{"name": "mon_image", "type_": "img", '
+                '"link": "link/to/image.png", "message_id": "3"}]'
+                )
+        assert(medias == [
+            Media('mon_image', 'img', 'link/to/image.png', '3')
+            ])
+        ```
+        """
+        return [Media(**attributes) for attributes in loads_many(data)]
+
+    @staticmethod
+    def from_row(row: tuple[int, str, str, int]) -> Self:
+        """ Creates a new instance from a row of the Media table, which has no
+        name column.
+        ---
+        Parameters:
+            row (tuple[int, str, str, int]): Id, type, link and message id of
+            the media.
+        ---
+        Returns:
+            (Self): New media without a name.
+        ---
+        Example:
+        ```python
+        media = Media.from_row((4, 'img', 'link/to/image.png', 3))
+        assert(media == Media(None, 'img', 'link/to/image.png', 3, id = 4))
+        ```
+        """
+        return Media(None, row[1], row[2], row[3], id = row[0])
+
+    def to_dict(self: Self) -> dict:
+        """ Converts the current instance to a dictionary of its attributes.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict): Attributes of the current instance.
+        ---
+        Example:
+        ```python
+        media = Media('mon_image', 'img', 'link/to/image.png', '3', id = '4')
+        assert(media.to_dict() == {
+            "name": "mon_image",
+            "type_": "img",
+            "link": "link/to/image.png",
+            "message_id": "3",
+            "id": "4"
+        })
+        ```
+        """
+        return {
+                "name": self.name,
+                "type_": self.type_,
+                "link": self.link,
+                "message_id": self.message_id,
+                "id": self.id,
+                }
+
     def to_json(self: Self) -> str:
         """ Converts the current instance to a json string.
         ---
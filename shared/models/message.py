@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Type
 import json
+from shared.services.serializer import loads_many
 
 class Message:
     """ Represents a message that a user send in a group.
@@ -22,6 +23,9 @@ class Message:
         string.
         __str__(Self) -> str: Converts the current message to a string.
         from_json(str) -> Self: Creates a new instance from a json string.
+        from_json_many(Union[bytes, str]) -> list[Self]: Creates new
+        instances from a json array or newline delimited json.
+        to_dict(Self) -> dict: Converts the current instance to a dictionary.
         to_json(Self) -> str: Converts the current instance to a json string.
         get_content(Self) -> str: Returns the content of the current message.
         get_date(Self) -> int: Returns the date the current message was sent at.
@@ -40,6 +44,14 @@ class Message:
         current message.
     """
 
+    __slots__ = (
+            'id',
+            'content',
+            'sender_id',
+            'receiver_group_id',
+            'date',
+            )
+
     def __init__(
             self: Self,
             content: str,
@@ -128,6 +140,66 @@ class Message:
         attributes = json.loads(json_string)
         return Message(**attributes)
 
+    @staticmethod
+    def from_json_many(data: Union[bytes, str]) -> list[Self]:
+        """ Creates new instances from a json array or newline delimited json
+        of messages, decoded in a single parse.
+        ---
+        Parameters:
+            data (Union[bytes, str]): Json array or newline delimited json of
+            objects with the attributes of each message.
+        ---
+        Returns:
+            (list[Self]): New messages, in order.
+        ---
+        Raises:
+            (ValueError): If the data is not valid json.
+        ---
+        Example:
+        ```python
+        messages = Message.from_json_many(
+                '{"content": "Hello", "sender_id": "1", '
+                '"receiver_group_id": "2", "date": 1706873888}\\n'
+                '{"content": "world!", "sender_id": "1", '
+                '"receiver_group_id": "2", "date": 1706873889}\\n'
+                )
+        assert(messages == [
+            Message('Hello', '1', '2', 1706873888),
+            Message('world!', '1', '2', 1706873889)
+            ])
+        ```
+        """
+        return [Message(**attributes) for attributes in loads_many(data)]
+
+    def to_dict(self: Self) -> dict:
+        """ Converts the current instance to a dictionary of its attributes.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict): Attributes of the current instance.
+        ---
+        Example:
+        ```python
+        message = Message('Hello world!', '1', '2', 1706873888, id = '3')
+        assert(message.to_dict() == {
+            "id": "3",
+            "content": "Hello world!",
+            "sender_id": "1",
+            "receiver_group_id": "2",
+            "date": 1706873888
+        })
+        ```
+        """
+        return {
+                "id": self.id,
+                "content": self.content,
+                "sender_id": self.sender_id,
+                "receiver_group_id": self.receiver_group_id,
+                "date": self.date,
+                }
+
     def to_json(self: Self) -> str:
         """ Converts the current instance to a json string.
         ---
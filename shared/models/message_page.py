@@ -0,0 +1,529 @@
+from __future__ import annotations
+from typing import Type
+from array import array
+import json
+import struct
+import sys
+from shared.models.message import Message
+from shared.services.serializer import loads_many
+
+class MessagePage:
+    """ Represents a page of the history of a group, stored by columns.
+    The ids, senders and dates are arrays of 64 bits integers and the contents
+    are concatenated in a single utf-8 buffer, the content of the i-th message
+    being content[offsets[i]:offsets[i + 1]]. Slicing a page shares these
+    buffers instead of copying them.
+    ---
+    Attributes:
+        receiver_group_id (int): Id of the group the messages were sent in.
+        ids (memoryview): Ids of the messages.
+        sender_ids (memoryview): Ids of the users who sent the messages.
+        dates (memoryview): Dates the messages were sent at.
+        content (memoryview): Contents of the messages encoded in utf-8, one
+        after the other.
+        offsets (memoryview): Start of the content of each message in the
+        content buffer, followed by the end of the last one.
+    ---
+    Methods:
+        __eq__(Self, MessagePage) -> bool: Checks for equality between two
+        pages.
+        __getitem__(Self, Union[int, slice]) -> Union[Message, MessagePage]:
+        Returns a message of the page or a page sharing the buffers of the
+        current one.
+        __init__(Self, int, Buffer, Buffer, Buffer, Buffer, Buffer): Creates a
+        new page from its columns.
+        __iter__(Self) -> Iterator[Message]: Iterates over the messages of the
+        page.
+        __len__(Self) -> int: Returns the number of messages of the page.
+        __repr__(Self) -> str: Converts the page to a displayable string.
+        __str__(Self) -> str: Converts the page to a string.
+        from_rows(int, Iterable[tuple[int, str, int, int]]) -> Self: Creates
+        a page from database rows.
+        from_messages(int, Iterable[Message]) -> Self: Creates a page from
+        messages.
+        from_json(str) -> Self: Creates a page from a json string.
+        from_json_many(int, Union[bytes, str]) -> Self: Creates a page from a
+        json array or newline delimited json of messages.
+        from_bytes(Buffer) -> Self: Creates a page from its binary form.
+        contents(Self) -> list[str]: Returns the contents of the messages of
+        the page.
+        get_content(Self, int) -> str: Returns the content of a message of the
+        page.
+        to_json(Self) -> str: Converts the page to a json string.
+        to_bytes(Self) -> bytes: Converts the page to its binary form.
+    """
+
+    __slots__ = (
+            'receiver_group_id',
+            'ids',
+            'sender_ids',
+            'dates',
+            'content',
+            'offsets',
+            )
+
+    # Magic, number of messages and id of the group of the binary form
+    HEADER = struct.Struct('<4sIq')
+    MAGIC = b'MPG1'
+
+    def __init__(
+            self: Self,
+            receiver_group_id: int,
+            ids: Buffer,
+            sender_ids: Buffer,
+            dates: Buffer,
+            content: Buffer,
+            offsets: Buffer
+            ):
+        """ Creates a new page from its columns.
+        The buffers are not copied.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            receiver_group_id (int): Id of the group of the messages.
+            ids (Buffer): 64 bits integers, ids of the messages.
+            sender_ids (Buffer): 64 bits integers, ids of the senders.
+            dates (Buffer): 64 bits integers, dates of the messages.
+            content (Buffer): Contents of the messages encoded in utf-8.
+            offsets (Buffer): 64 bits integers, one more than the messages,
+            bounds of each content in the content buffer.
+        ---
+        Raises:
+            (ValueError): If the columns do not have matching lengths.
+        ---
+        Example:
+        ```python
+        page = MessagePage(
+                3,
+                array('q', [1, 2]),
+                array('q', [5, 6]),
+                array('q', [1706873888, 1706873889]),
+                b'HiHello',
+                array('q', [0, 2, 7])
+                )
+        ```
+        """
+        self.receiver_group_id = receiver_group_id
+        self.ids = memoryview(ids).cast('B').cast('q')
+        self.sender_ids = memoryview(sender_ids).cast('B').cast('q')
+        self.dates = memoryview(dates).cast('B').cast('q')
+        self.content = memoryview(content).cast('B')
+        self.offsets = memoryview(offsets).cast('B').cast('q')
+        count = len(self.ids)
+        if (len(self.sender_ids) != count or len(self.dates) != count or
+                len(self.offsets) != count + 1):
+            raise ValueError('The columns of a page must have the same length.')
+
+    @staticmethod
+    def from_rows(
+            receiver_group_id: int,
+            rows: Iterable[tuple[int, str, int, int]]
+            ) -> Self:
+        """ Creates a page from database rows.
+        ---
+        Parameters:
+            receiver_group_id (int): Id of the group of the messages.
+            rows (Iterable[tuple[int, str, int, int]]): Id, content, sender id
+            and date of each message, in the order of the page.
+        ---
+        Returns:
+            (Self): New page holding the rows.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(page.get_content(0) == 'Hi')
+        ```
+        """
+        ids = array('q')
+        sender_ids = array('q')
+        dates = array('q')
+        content = bytearray()
+        offsets = array('q', [0])
+        for row in rows:
+            ids.append(row[0])
+            content += row[1].encode('utf-8')
+            offsets.append(len(content))
+            sender_ids.append(row[2])
+            dates.append(row[3])
+        return MessagePage(
+                receiver_group_id,
+                ids,
+                sender_ids,
+                dates,
+                content,
+                offsets
+                )
+
+    @staticmethod
+    def from_messages(
+            receiver_group_id: int,
+            messages: Iterable[Message]
+            ) -> Self:
+        """ Creates a page from messages.
+        ---
+        Parameters:
+            receiver_group_id (int): Id of the group of the messages.
+            messages (Iterable[Message]): Messages of the page, their ids,
+            sender ids and dates must be integers.
+        ---
+        Returns:
+            (Self): New page holding the messages.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_messages(
+                3,
+                [Message('Hi', 5, 3, 1706873888, id = 1)]
+                )
+        ```
+        """
+        return MessagePage.from_rows(
+                receiver_group_id,
+                (
+                    (int(message.id), message.content, int(message.sender_id),
+                     int(message.date))
+                    for message in messages
+                    )
+                )
+
+    def __len__(self: Self) -> int:
+        """ Returns the number of messages of the page.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (int): Number of messages.
+        """
+        return len(self.ids)
+
+    def get_content(self: Self, index: int) -> str:
+        """ Returns the content of a message of the page.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            index (int): Position of the message in the page.
+        ---
+        Returns:
+            (str): Content of the message.
+        ---
+        Raises:
+            (IndexError): If the index is out of the page.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(page.get_content(0) == 'Hi')
+        ```
+        """
+        return str(
+                self.content[self.offsets[index]:self.offsets[index + 1]],
+                'utf-8'
+                )
+
+    def __getitem__(
+            self: Self,
+            index: Union[int, slice]
+            ) -> Union[Message, MessagePage]:
+        """ Returns a message of the page, or for a slice a page sharing the
+        buffers of the current one.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            index (Union[int, slice]): Position of the message, or contiguous
+            slice of the messages.
+        ---
+        Returns:
+            (Union[Message, MessagePage]): Message at the given position, or
+            page of the sliced messages.
+        ---
+        Raises:
+            (IndexError): If the index is out of the page.
+            (ValueError): If the slice has a step other than 1.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, rows)
+        first_page = page[0:50]
+        message = page[0]
+        ```
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('A page can only be sliced contiguously.')
+            stop = max(start, stop)
+            return MessagePage(
+                    self.receiver_group_id,
+                    self.ids[start:stop],
+                    self.sender_ids[start:stop],
+                    self.dates[start:stop],
+                    self.content,
+                    self.offsets[start:stop + 1]
+                    )
+        if index < 0:
+            index += len(self)
+        if not(0 <= index < len(self)):
+            raise IndexError('Message index out of the page.')
+        return Message(
+                self.get_content(index),
+                self.sender_ids[index],
+                self.receiver_group_id,
+                self.dates[index],
+                id = self.ids[index]
+                )
+
+    def __iter__(self: Self) -> Iterator[Message]:
+        """ Iterates over the messages of the page.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Iterator[Message]): Messages of the page, in order.
+        """
+        return (self[index] for index in range(len(self)))
+
+    def __eq__(self: Self, other: MessagePage) -> bool:
+        """ Check for equality between two pages.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            other (MessagePage): Page to compare to.
+        ---
+        Returns:
+            (bool): True iff the two pages hold the same messages.
+        ---
+        Example:
+        ```python
+        page1 = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        page2 = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(page1 == page2)
+        ```
+        """
+        if not(isinstance(other, MessagePage)):
+            return False
+        return (self.receiver_group_id == other.receiver_group_id and
+                self.ids == other.ids and
+                self.sender_ids == other.sender_ids and
+                self.dates == other.dates and
+                self.contents() == other.contents())
+
+    def contents(self: Self) -> list[str]:
+        """ Returns the contents of the messages of the page.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (list[str]): Content of each message, in order.
+        """
+        return [self.get_content(index) for index in range(len(self))]
+
+    def to_json(self: Self) -> str:
+        """ Converts the page to a json string holding one list per column.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Json string of the page.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(page.to_json() == '{' \\
+                '"receiver_group_id": 3, ' \\
+                '"id": [1], ' \\
+                '"sender_id": [5], ' \\
+                '"date": [1706873888], ' \\
+                '"content": ["Hi"]}'
+                )
+        ```
+        """
+        return json.dumps({
+            "receiver_group_id": self.receiver_group_id,
+            "id": self.ids.tolist(),
+            "sender_id": self.sender_ids.tolist(),
+            "date": self.dates.tolist(),
+            "content": self.contents(),
+            })
+
+    @staticmethod
+    def from_json(json_string: str) -> Self:
+        """ Creates a page from a json string made by to_json.
+        ---
+        Parameters:
+            json_string (str): Json string of a page.
+        ---
+        Returns:
+            (Self): New page with the values of the given json.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(MessagePage.from_json(page.to_json()) == page)
+        ```
+        """
+        attributes = json.loads(json_string)
+        return MessagePage.from_rows(
+                attributes["receiver_group_id"],
+                zip(
+                    attributes["id"],
+                    attributes["content"],
+                    attributes["sender_id"],
+                    attributes["date"]
+                    )
+                )
+
+    @staticmethod
+    def from_json_many(
+            receiver_group_id: int,
+            data: Union[bytes, str]
+            ) -> Self:
+        """ Creates a page from a json array or newline delimited json of
+        messages, as made by Message.to_json, decoded in a single parse and
+        without creating the messages.
+        ---
+        Parameters:
+            receiver_group_id (int): Id of the group of the messages.
+            data (Union[bytes, str]): Json array or newline delimited json of
+            messages, their ids, sender ids and dates must be integers or
+            strings of integers.
+        ---
+        Returns:
+            (Self): New page holding the messages, in order.
+        ---
+        Raises:
+            (ValueError): If the data is not valid json or a message was sent
+            in another group.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_json_many(
+                3,
+                '{"id": "1", "content": "Hi", "sender_id": "5", '
+                '"receiver_group_id": "3", "date": 1706873888}\\n'
+                )
+        assert(page == MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)]))
+        ```
+        """
+        records = loads_many(data)
+        group_ids = {
+                int(record["receiver_group_id"])
+                for record in records
+                if record.get("receiver_group_id") is not None
+                }
+        if group_ids - {int(receiver_group_id)}:
+            raise ValueError(f'Messages of groups {sorted(group_ids)} can not '
+                             f'be stored in a page of group '
+                             f'{receiver_group_id}.')
+        return MessagePage.from_rows(
+                receiver_group_id,
+                (
+                    (int(record["id"]), record["content"],
+                     int(record["sender_id"]), int(record["date"]))
+                    for record in records
+                    )
+                )
+
+    def to_bytes(self: Self) -> bytes:
+        """ Converts the page to its binary form.
+        A header (magic, number of messages, id of the group) is followed by
+        the ids, sender ids, dates and offsets as little-endian 64 bits
+        integers, then by the contents.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (bytes): Binary form of the page.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(MessagePage.from_bytes(page.to_bytes()) == page)
+        ```
+        """
+        start = self.offsets[0] if len(self.offsets) else 0
+        offsets = self.offsets
+        if start != 0:
+            offsets = array('q', (offset - start for offset in offsets))
+        columns = [self.ids, self.sender_ids, self.dates, offsets]
+        if sys.byteorder == 'big':
+            columns = [array('q', column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        return b''.join([
+            self.HEADER.pack(self.MAGIC, len(self), self.receiver_group_id),
+            *(bytes(column) for column in columns),
+            self.content[start:self.offsets[-1]],
+            ])
+
+    @staticmethod
+    def from_bytes(data: Buffer) -> Self:
+        """ Creates a page from its binary form, made by to_bytes.
+        The columns are views on the given buffer, which is not copied.
+        ---
+        Parameters:
+            data (Buffer): Binary form of a page.
+        ---
+        Returns:
+            (Self): New page.
+        ---
+        Raises:
+            (ValueError): If the data is not the binary form of a page.
+        ---
+        Example:
+        ```python
+        page = MessagePage.from_rows(3, [(1, 'Hi', 5, 1706873888)])
+        assert(MessagePage.from_bytes(page.to_bytes()) == page)
+        ```
+        """
+        data = memoryview(data).cast('B')
+        header = MessagePage.HEADER
+        if len(data) < header.size:
+            raise ValueError('Data too short to hold a page.')
+        magic, count, receiver_group_id = header.unpack(data[:header.size])
+        if magic != MessagePage.MAGIC:
+            raise ValueError('Data is not the binary form of a page.')
+        bounds = [header.size + 8 * count * i for i in range(4)]
+        bounds.append(bounds[3] + 8 * (count + 1))
+        if len(data) < bounds[4]:
+            raise ValueError('Data too short to hold the page.')
+        columns = [
+                data[bounds[i]:bounds[i + 1]].cast('q') for i in range(4)
+                ]
+        if sys.byteorder == 'big':
+            columns = [array('q', column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        return MessagePage(
+                receiver_group_id,
+                *columns[:3],
+                data[bounds[4]:],
+                columns[3]
+                )
+
+    def __repr__(self: Self) -> str:
+        """ Convert the current instance to a displayable string.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Columns of the page in a json-formatted string.
+        """
+        return self.to_json()
+
+    def __str__(self: Self) -> str:
+        """ Convert the current instance to a json string.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (str): Columns of the page in a json-formatted string.
+        """
+        return self.to_json()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Type
 import json
+from shared.services.serializer import loads_many
 
 class User:
     """ Represents a user of the application.
@@ -21,6 +22,9 @@ class User:
         __str__(Self) -> str: Convert the instance to a string.
         from_json(str) -> Self: Create a new instance with the values of a json
         string.
+        from_json_many(Union[bytes, str]) -> list[Self]: Creates new
+        instances from a json array or newline delimited json.
+        to_dict(Self) -> dict: Converts the current instance to a dictionary.
         to_json(Self) -> str: Converts the current instance to a json string.
         get_auth_id(Self) -> Optional[str]: Returns the id of the user for the
         authentification service.
@@ -37,6 +41,15 @@ class User:
         set_name(Self, str): Modify the name of the current user.
     """
 
+    __slots__ = (
+            'name',
+            'first_name',
+            'email',
+            'join_date',
+            'id',
+            'auth_id',
+            )
+
     def __init__(
         self: Self,
         name: str,
@@ -176,6 +189,37 @@ class User:
         """
         return self.to_json()
 
+    def to_dict(self: Self) -> dict:
+        """ Converts the current instance to a dictionary of its attributes.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict): Attributes of the current instance.
+        ---
+        Example:
+        ```python
+        user = User('my_name', 'my_first_name', 'my_email', 1706873888, id = '5')
+        assert(user.to_dict() == {
+            "name": "my_name",
+            "first_name": "my_first_name",
+            "email": "my_email",
+            "join_date": 1706873888,
+            "id": "5",
+            "auth_id": None
+        })
+        ```
+        """
+        return {
+                "name": self.name,
+                "first_name": self.first_name,
+                "email": self.email,
+                "join_date": self.join_date,
+                "id": self.id,
+                "auth_id": self.auth_id,
+                }
+
     def to_json(self: Self) -> str:
         """ Converts the current instance to a json string.
         ---
@@ -298,6 +342,34 @@ class User:
         """
         attributes = json.loads(json_string)
         return User(**attributes)
+
+    @staticmethod
+    def from_json_many(data: Union[bytes, str]) -> list[Self]:
+        """ Creates new instances from a json array or newline delimited json
+        of users, decoded in a single parse.
+        ---
+        Parameters:
+            data (Union[bytes, str]): Json array or newline delimited json of
+            objects with the attributes of each user.
+        ---
+        Returns:
+            (list[Self]): New users, in order.
+        ---
+        Raises:
+            (ValueError): If the data is not valid json.
+        ---
+        Example:
+        ```python
+        users = User.from_json_many(
+                '[{"name": "my_name", "first_name": "my_first_name", '
+                '"email": "my_email", "join_date": 1706873888}]'
+                )
+        assert(users == [
+            User("my_name", "my_first_name", "my_email", 1706873888)
+            ])
+        ```
+        """
+        return [User(**attributes) for attributes in loads_many(data)]
     
     def get_name(self: Self) -> str:
         """ Returns the name of the current user.
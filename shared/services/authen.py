@@ -1,14 +1,29 @@
 import psycopg2
 import hashlib
 from pyotp import TOTP
-from shared.services.messaging import send_email
+from shared.services.messaging import email_queue_from_env
+from shared.services.connection_pool import Connection_pool
+from shared.services.password_hasher import password_hasher_from_env
+from shared.exceptions.overloaded_exception import OverloadedException
+import asyncio
 import os
-import bcrypt
 from uuid import uuid4
 
 class AuthService:
     def __init__(self):
-        pass
+        # Connexions à la base d'authentification, réutilisées entre les appels
+        self.pool = Connection_pool(
+                self.connect_db,
+                max_size = int(os.getenv("AUTH_POOL_SIZE", '10')),
+                timeout = float(os.getenv("AUTH_POOL_TIMEOUT", '5')),
+                check_interval = float(
+                    os.getenv("AUTH_POOL_CHECK_INTERVAL", '30')
+                    )
+                )
+        # Processus dédiés au hachage des mots de passe
+        self.password_hasher = password_hasher_from_env()
+        # File d'envoi des emails, avec une session SMTP persistante
+        self.email_queue = email_queue_from_env()
 
     def connect_db(self):
         """Établit une connexion à la base de données."""
@@ -20,17 +35,31 @@ class AuthService:
                 port = int(os.getenv("AUTH_PORT", '5432')),
                 )
 
-    def create_account(self, email: str, password: str):
+    async def create_account(self, email: str, password: str):
         """Crée un nouveau compte utilisateur avec un email et un mot de passe.
+        Le mot de passe est haché par un processus de password_hasher.
         """
-        with self.connect_db() as conn:
+        try:
+            # Hash le mot de passe hors de la boucle d'événements
+            hashed_password = await self.password_hasher.hash(password)
+        except OverloadedException:
+            raise
+        except Exception as e:
+            return False, f"Failed to create account: {e}"
+        return await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.insert_account,
+                email,
+                hashed_password
+                )
+
+    def insert_account(self, email: str, hashed_password: bytes):
+        """Insère un compte dont le mot de passe est déjà haché.
+        """
+        with self.pool.connection() as conn:
             with conn.cursor() as cur:
                 try:
-                    # Hash le mot de passe et convertit l'UUID en chaîne
-                    hashed_password = bcrypt.hashpw(
-                            password.encode('utf-8'),
-                            bcrypt.gensalt()
-                            )
+                    # Convertit l'UUID en chaîne
                     auth_id = str(uuid4())
                     # Insère le nouvel utilisateur dans la base de données
                     cur.execute(
@@ -47,22 +76,43 @@ class AuthService:
                     conn.rollback()
                     return False, f"Failed to create account: {e}"
 
-    def change_account(
+    async def change_account(
             self,
             email: str,
             new_email: str = None,
             new_password: str = None
             ):
         """Modifie l'email ou le mot de passe d'un compte utilisateur existant.
+        Le nouveau mot de passe est haché par un processus de password_hasher.
+        """
+        hashed_password = None
+        if new_password:
+            try:
+                hashed_password = await self.password_hasher.hash(new_password)
+            except OverloadedException:
+                raise
+            except Exception as e:
+                return False, f"Failed to update account: {e}"
+        return await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.update_account,
+                email,
+                new_email,
+                hashed_password
+                )
+
+    def update_account(
+            self,
+            email: str,
+            new_email: str = None,
+            hashed_password: bytes = None
+            ):
+        """Modifie l'email ou le mot de passe déjà haché d'un compte.
         """
-        with self.connect_db() as conn:
+        with self.pool.connection() as conn:
             with conn.cursor() as cur:
                 try:
-                    if new_password:
-                        hashed_password = bcrypt.hashpw(
-                                new_password.encode('utf-8'),
-                                bcrypt.gensalt()
-                                )
+                    if hashed_password:
                         cur.execute(
                                 "UPDATE MyUser "
                                 "SET password = %s WHERE email = %s",
@@ -80,33 +130,42 @@ class AuthService:
                     conn.rollback()
                     return False, f"Failed to update account: {e}"
 
-    def login(self, email: str, password: str):
+    async def login(self, email: str, password: str):
         """Vérifie les identifiants d'un utilisateur et permet la connexion.
+        Le mot de passe est vérifié par un processus de password_hasher.
+        """
+        user_record = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.find_account,
+                email
+                )
+        if user_record:
+            if user_record[0].startswith('\\x'):
+                hashed_password = bytes.fromhex(user_record[0][2:])
+            else:
+                hashed_password = user_record[0].encode('utf-8')
+
+            if await self.password_hasher.check(password, hashed_password):
+                if (email == "arthur2klein@laposte.net"):
+                    # Envoyé par le thread de la file, sans attendre
+                    self.email_queue.enqueue_totp(email, TOTP("secret4").now())
+                return True, user_record[1]
+            else:
+                return False, "Invalid email or password."
+        else:
+            return False, "Invalid email or password."
+
+    def find_account(self, email: str):
+        """Retourne le mot de passe haché et l'auth_id d'un compte, None s'il
+        n'existe pas.
         """
-        with self.connect_db() as conn:
+        with self.pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                         "SELECT password, auth_id FROM MyUser WHERE email = %s",
                         (email,)
                         )
-                user_record = cur.fetchone()
-                if user_record:
-                    if user_record[0].startswith('\\x'):
-                        hashed_password = bytes.fromhex(user_record[0][2:])
-                    else:
-                        hashed_password = user_record[0].encode('utf-8')
-
-                    if bcrypt.checkpw(
-                            password.encode('utf-8'),
-                            hashed_password
-                            ):
-                        if (email == "arthur2klein@laposte.net"):
-                            send_email(email, TOTP("secret4").now())
-                        return True, user_record[1]
-                    else:
-                        return False, "Invalid email or password."
-                else:
-                    return False, "Invalid email or password."
+                return cur.fetchone()
 
     def verify_totp(self, email, totp_code):
         totp = TOTP("secret4")
@@ -115,7 +174,7 @@ class AuthService:
     def delete_account(self, email: str):
         """Supprime un compte utilisateur de la base de données.
         """
-        with self.connect_db() as conn:
+        with self.pool.connection() as conn:
             with conn.cursor() as cur:
                 try:
                     # Exécute la commande de suppression
@@ -0,0 +1,398 @@
+from __future__ import annotations
+from typing import Type
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+import logging
+import os
+import threading
+import time
+
+class Cache(ABC):
+    """ Interface of the key-value caches used by the services.
+    ---
+    Methods:
+        get(Self,Hashable,Any=None) -> Any: Returns the value stored for the
+          given key.
+        set(Self,Hashable,Any,Optional[float]=None): Stores a value for the
+          given key.
+        delete(Self,Hashable): Removes the given key.
+        clear(Self): Removes every key.
+    """
+
+    @abstractmethod
+    def get(self: Self, key: Hashable, default: Any = None) -> Any:
+        """ Returns the value stored for the given key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Key to look for.
+            default (Any): Value returned if the key is absent or expired.
+        ---
+        Returns:
+            (Any): Value stored for the key or default.
+        """
+
+    @abstractmethod
+    def set(self: Self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """ Stores a value for the given key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Key to store the value at.
+            value (Any): Value to store.
+            ttl (Optional[float]): Number of seconds the value stays valid,
+            forever if None.
+        """
+
+    @abstractmethod
+    def delete(self: Self, key: Hashable):
+        """ Removes the given key, does nothing if it is absent.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Key to remove.
+        """
+
+    @abstractmethod
+    def clear(self: Self):
+        """ Removes every key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        """
+
+
+class Lru_cache(Cache):
+    """ In-process cache that drops the least recently used keys when full.
+    ---
+    Attributes:
+        max_size (int): Maximum number of keys stored at once.
+        entries (OrderedDict[Hashable, tuple[Any, Optional[float]]]): Value
+        and expiration time of each key, least recently used first.
+        lock (threading.Lock): Lock protecting the entries.
+        hits (int): Number of lookups that found a value.
+        misses (int): Number of lookups that found nothing.
+    ---
+    Methods:
+        __init__(Self,int): Creates a new cache.
+        __len__(Self) -> int: Returns the number of keys stored.
+        get(Self,Hashable,Any=None) -> Any: Returns the value stored for the
+          given key.
+        set(Self,Hashable,Any,Optional[float]=None): Stores a value for the
+          given key.
+        delete(Self,Hashable): Removes the given key.
+        clear(Self): Removes every key.
+        clear_namespace(Self,str): Removes the keys of a namespace.
+        stats(Self) -> dict[str, int]: Returns the counters of the cache.
+    """
+
+    def __init__(self: Self, max_size: int = 10000):
+        """ Creates a new cache.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            max_size (int): Maximum number of keys stored at once.
+        ---
+        Example:
+        ```python
+        cache = Lru_cache(max_size = 2)
+        cache.set('a', 1)
+        assert(cache.get('a') == 1)
+        ```
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self: Self) -> int:
+        """ Returns the number of keys stored, including expired ones not yet
+        removed.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (int): Number of keys stored.
+        """
+        return len(self.entries)
+
+    def get(self: Self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            try:
+                value, expiration = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expiration is not None and expiration <= time.monotonic():
+                del self.entries[key]
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self: Self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if ttl is None:
+            expiration = None
+        elif ttl <= 0:
+            self.delete(key)
+            return
+        else:
+            expiration = time.monotonic() + ttl
+        with self.lock:
+            self.entries[key] = (value, expiration)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last = False)
+
+    def delete(self: Self, key: Hashable):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self: Self):
+        with self.lock:
+            self.entries.clear()
+
+    def clear_namespace(self: Self, namespace: str):
+        """ Removes the keys of a namespace, the (namespace, key) tuples
+        stored by Shared_cache.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            namespace (str): Namespace of the keys to remove.
+        ---
+        Example:
+        ```python
+        cache = Lru_cache()
+        cache.set(('negative', 'a'), 1)
+        cache.set(('tokens', 'a'), 2)
+        cache.clear_namespace('negative')
+        assert(cache.get(('tokens', 'a')) == 2)
+        ```
+        """
+        with self.lock:
+            keys = [
+                    key for key in self.entries
+                    if isinstance(key, tuple) and key and key[0] == namespace
+                    ]
+            for key in keys:
+                del self.entries[key]
+
+    def stats(self: Self) -> dict[str, int]:
+        """ Returns the counters of the cache.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (dict[str, int]): Number of hits, misses and stored keys.
+        ---
+        Example:
+        ```python
+        cache = Lru_cache()
+        cache.get('a')
+        assert(cache.stats()['misses'] == 1)
+        ```
+        """
+        with self.lock:
+            return {
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "size": len(self.entries),
+                    }
+
+
+class Cache_client_manager(BaseManager):
+    """ Manager used by the workers to reach the cache server.
+    """
+    pass
+
+Cache_client_manager.register('get_cache')
+
+
+class Shared_cache(Cache):
+    """ Cache shared by every worker process of the host.
+    The values live in a single Lru_cache held by the cache server (see
+    serve_cache), so a key deleted by a worker is immediately absent for the
+    others. Keys are prefixed by a namespace so several caches can share the
+    same server.
+    ---
+    Attributes:
+        namespace (str): Prefix of the keys of this cache.
+        manager (Cache_client_manager): Connection to the cache server.
+        proxy (multiprocessing.managers.BaseProxy): Proxy to the Lru_cache of
+        the server.
+    ---
+    Methods:
+        __init__(Self,str,Union[str,tuple[str,int]],bytes): Connects to the
+          cache server.
+        get(Self,Hashable,Any=None) -> Any: Returns the value stored for the
+          given key.
+        set(Self,Hashable,Any,Optional[float]=None): Stores a value for the
+          given key.
+        delete(Self,Hashable): Removes the given key.
+        clear(Self): Removes every key of this namespace.
+    """
+
+    def __init__(
+            self: Self,
+            namespace: str,
+            address: Union[str, tuple[str, int]],
+            authkey: bytes
+            ):
+        """ Connects to the cache server.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            namespace (str): Prefix of the keys of this cache.
+            address (Union[str, tuple[str, int]]): Path of the unix socket or
+            host and port of the cache server.
+            authkey (bytes): Secret shared with the cache server.
+        ---
+        Raises:
+            (ConnectionError): If the server can not be reached.
+            (ValueError): If the secret is empty.
+        ---
+        Example:
+        ```python
+        cache = Shared_cache('negative', ('127.0.0.1', 50000), b'secret')
+        ```
+        """
+        if not(authkey):
+            raise ValueError('The shared cache needs a secret.')
+        self.namespace = namespace
+        self.manager = Cache_client_manager(
+                address = address,
+                authkey = authkey
+                )
+        self.manager.connect()
+        self.proxy = self.manager.get_cache()
+
+    def get(self: Self, key: Hashable, default: Any = None) -> Any:
+        try:
+            return self.proxy.get((self.namespace, key), default)
+        except (OSError, EOFError) as e:
+            logging.warning(f'Shared cache unreachable on get: {e}')
+            return default
+
+    def set(self: Self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        try:
+            self.proxy.set((self.namespace, key), value, ttl)
+        except (OSError, EOFError) as e:
+            logging.warning(f'Shared cache unreachable on set: {e}')
+
+    def delete(self: Self, key: Hashable):
+        try:
+            self.proxy.delete((self.namespace, key))
+        except (OSError, EOFError) as e:
+            logging.error(f'Shared cache unreachable on delete: {e}')
+
+    def clear(self: Self):
+        try:
+            self.proxy.clear_namespace(self.namespace)
+        except (OSError, EOFError) as e:
+            logging.error(f'Shared cache unreachable on clear: {e}')
+
+
+def cache_address() -> Union[str, tuple[str, int]]:
+    """ Returns the address of the cache server from CACHE_ADDRESS.
+    A value with a colon is a host and a port, anything else is the path of a
+    unix socket.
+    ---
+    Returns:
+        (Union[str, tuple[str, int]]): Address of the cache server.
+    """
+    address = os.getenv("CACHE_ADDRESS", '127.0.0.1:50000')
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        return (host, int(port))
+    return address
+
+
+def cache_authkey() -> bytes:
+    """ Returns the secret shared with the cache server from CACHE_AUTHKEY.
+    There is no default: the server runs the pickles of anyone knowing it.
+    ---
+    Returns:
+        (bytes): Secret shared with the cache server.
+    ---
+    Raises:
+        (ValueError): If CACHE_AUTHKEY is unset or empty.
+    """
+    authkey = os.getenv("CACHE_AUTHKEY")
+    if not(authkey):
+        raise ValueError('CACHE_AUTHKEY must be set to use the shared cache.')
+    return authkey.encode('utf-8')
+
+
+def create_cache(namespace: str, max_size: int = 10000) -> Cache:
+    """ Creates the cache selected by CACHE_BACKEND.
+    'local' (default) gives an Lru_cache private to the process, 'shared' a
+    Shared_cache on the server at CACHE_ADDRESS. If the server can not be
+    reached, a local cache is used instead.
+    ---
+    Parameters:
+        namespace (str): Prefix of the keys of the cache.
+        max_size (int): Maximum number of keys of a local cache.
+    ---
+    Returns:
+        (Cache): New cache.
+    ---
+    Example:
+    ```python
+    cache = create_cache('negative')
+    ```
+    """
+    if os.getenv("CACHE_BACKEND", 'local') == 'shared':
+        try:
+            return Shared_cache(namespace, cache_address(), cache_authkey())
+        except Exception as e:
+            logging.error(
+                    f'Could not reach the cache server, '
+                    f'using a local cache for {namespace}: {e}'
+                    )
+    return Lru_cache(max_size)
+
+
+def serve_cache(
+        address: Union[str, tuple[str, int]],
+        authkey: bytes,
+        max_size: int = 100000
+        ):
+    """ Runs the cache server used by Shared_cache until interrupted.
+    ---
+    Parameters:
+        address (Union[str, tuple[str, int]]): Path of the unix socket or host
+        and port to listen to.
+        authkey (bytes): Secret shared with the workers.
+        max_size (int): Maximum number of keys stored by the server.
+    ---
+    Raises:
+        (ValueError): If the secret is empty.
+    ---
+    Example:
+    ```bash
+    CACHE_ADDRESS=127.0.0.1:50000 CACHE_AUTHKEY=... python -m shared.services.cache
+    ```
+    """
+    if not(authkey):
+        raise ValueError('The cache server needs a secret.')
+    store = Lru_cache(max_size)
+
+    class Cache_server_manager(BaseManager):
+        pass
+
+    Cache_server_manager.register('get_cache', callable = lambda: store)
+    manager = Cache_server_manager(address = address, authkey = authkey)
+    manager.get_server().serve_forever()
+
+
+if __name__ == '__main__':
+    serve_cache(
+            cache_address(),
+            cache_authkey(),
+            int(os.getenv("CACHE_MAX_SIZE", '100000'))
+            )
@@ -0,0 +1,233 @@
+from __future__ import annotations
+from typing import Type
+from contextlib import contextmanager
+import threading
+import time
+from shared.exceptions.database_exception import DatabaseException
+
+class Connection_pool:
+    """ Bounded pool of database connections.
+    At most max_size connections are open at a time, the callers asking for
+    more wait until one is released. A connection that stayed idle longer than
+    check_interval is checked before being handed out again, and replaced if
+    it is closed or broken.
+    ---
+    Attributes:
+        connect (Callable[[], Any]): Opens a new connection.
+        max_size (int): Maximum number of connections open at a time.
+        timeout (float): Seconds to wait for a connection before failing.
+        check_interval (float): Idle seconds after which a connection is
+        checked before being used.
+        idle (list[tuple[Any, float]]): Idle connections with the time they
+        were released at, the most recent last.
+        lock (threading.Lock): Lock protecting the idle connections.
+        slots (threading.BoundedSemaphore): Connections that can still be
+        handed out.
+    ---
+    Methods:
+        __init__(Self,Callable[[],Any],int,float,float): Creates a new pool.
+        acquire(Self) -> Any: Returns a healthy connection, waiting for one if
+          they are all used.
+        release(Self,Any): Gives a connection back to the pool.
+        connection(Self) -> Iterator[Any]: Context manager holding a
+          connection of the pool.
+        is_healthy(Self,Any,float) -> bool: Checks that an idle connection can
+          still be used.
+        discard(Any): Closes a connection without failing.
+        close(Self): Closes the idle connections.
+    """
+
+    def __init__(
+            self: Self,
+            connect: Callable[[], Any],
+            max_size: int = 10,
+            timeout: float = 5.0,
+            check_interval: float = 30.0
+            ):
+        """ Creates a new pool, no connection is opened before it is needed.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            connect (Callable[[], Any]): Opens a new connection.
+            max_size (int): Maximum number of connections open at a time.
+            timeout (float): Seconds to wait for a connection before failing.
+            check_interval (float): Idle seconds after which a connection is
+            checked before being used.
+        ---
+        Example:
+        ```python
+        pool = Connection_pool(Service_bdd.connect, max_size = 5)
+        ```
+        """
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self: Self) -> Any:
+        """ Returns a healthy connection, reusing the most recently released
+        one if any, waiting for one if they are all used.
+        It must be given back with release.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Any): Connection to the database.
+        ---
+        Raises:
+            (DatabaseException): If no connection is released within timeout
+            seconds or a new connection can not be opened.
+        ---
+        Example:
+        ```python
+        connection = pool.acquire()
+        try:
+            ...
+        finally:
+            pool.release(connection)
+        ```
+        """
+        if not(self.slots.acquire(timeout = self.timeout)):
+            raise DatabaseException(
+                    f'No database connection available after '
+                    f'{self.timeout} seconds.'
+                    )
+        try:
+            while True:
+                with self.lock:
+                    if not(self.idle):
+                        break
+                    connection, released_at = self.idle.pop()
+                if self.is_healthy(connection, released_at):
+                    return connection
+                self.discard(connection)
+            return self.connect()
+        except Exception as e:
+            self.slots.release()
+            raise DatabaseException(f'Could not connect to the database: {e}')
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self: Self, connection: Any):
+        """ Gives a connection back to the pool.
+        A transaction left open is rolled back, a closed or broken connection
+        is dropped.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            connection (Any): Connection returned by acquire.
+        ---
+        Example:
+        ```python
+        connection = pool.acquire()
+        pool.release(connection)
+        ```
+        """
+        try:
+            if connection.closed:
+                return
+            try:
+                connection.rollback()
+            except Exception:
+                self.discard(connection)
+                return
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def connection(self: Self) -> Iterator[Any]:
+        """ Context manager holding a connection of the pool.
+        Changes that were not committed are rolled back when it exits.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Iterator[Any]): Connection to the database.
+        ---
+        Raises:
+            (DatabaseException): If no connection can be acquired.
+        ---
+        Example:
+        ```python
+        with pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        ```
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def is_healthy(self: Self, connection: Any, released_at: float) -> bool:
+        """ Checks that an idle connection can still be used.
+        Connections released less than check_interval seconds ago are trusted,
+        the others run a trivial query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            connection (Any): Idle connection.
+            released_at (float): Time the connection was released at, from
+            time.monotonic.
+        ---
+        Returns:
+            (bool): False if the connection is closed or fails the query.
+        ---
+        Example:
+        ```python
+        assert(pool.is_healthy(connection, time.monotonic()))
+        ```
+        """
+        if connection.closed:
+            return False
+        if time.monotonic() - released_at < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def discard(connection: Any):
+        """ Closes a connection without failing.
+        ---
+        Parameters:
+            connection (Any): Connection to close.
+        ---
+        Example:
+        ```python
+        Connection_pool.discard(connection)
+        ```
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self: Self):
+        """ Closes the idle connections.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        pool.close()
+        ```
+        """
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from typing import Type
+import os
+import zlib
+
+# Compression and decompression functions of each codec, by the tag stored
+# with the compressed contents
+CODECS = {
+        'zlib': (zlib.compress, zlib.decompress),
+        }
+
+class Content_codec:
+    """ Chooses how the contents of the messages are stored.
+    Contents whose utf-8 encoding reaches the threshold are compressed into
+    bytes tagged with the name of the codec, the others are stored as text.
+    ---
+    Attributes:
+        codec (Optional[str]): Name of the codec used to compress, None to
+        store every content as text.
+        threshold (int): Size in bytes from which contents are compressed.
+        level (int): Compression level given to the codec.
+    ---
+    Methods:
+        __init__(Self, Optional[str], int, int): Creates a new codec.
+        encode(Self, str) -> tuple[Optional[str], Optional[bytes],
+          Optional[str]]: Returns the text, compressed bytes and codec tag
+          to store for a content.
+    """
+
+    def __init__(
+            self: Self,
+            codec: Optional[str] = 'zlib',
+            threshold: int = 1024,
+            level: int = 6
+            ):
+        """ Creates a new codec.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            codec (Optional[str]): Name of the codec used to compress, None to
+            store every content as text.
+            threshold (int): Size in bytes from which contents are compressed.
+            level (int): Compression level given to the codec.
+        ---
+        Raises:
+            (ValueError): If the codec is unknown.
+        ---
+        Example:
+        ```python
+        content_codec = Content_codec('zlib', threshold = 512)
+        ```
+        """
+        if codec is not None and codec not in CODECS:
+            raise ValueError(f'Unknown content codec {codec}, expected one of '
+                             f'{list(CODECS)}.')
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+
+    def encode(
+            self: Self,
+            content: str
+            ) -> tuple[Optional[str], Optional[bytes], Optional[str]]:
+        """ Returns how a content must be stored.
+        A content is only compressed if the compressed bytes are smaller.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            content (str): Content of a message.
+        ---
+        Returns:
+            (tuple[Optional[str], Optional[bytes], Optional[str]]): Text,
+            compressed bytes and codec tag to store, either the text or the
+            bytes and tag are None.
+        ---
+        Example:
+        ```python
+        content_codec = Content_codec('zlib', threshold = 4)
+        text, compressed, codec = content_codec.encode('Hello ' * 100)
+        assert(text == None and codec == 'zlib')
+        assert(decode(text, compressed, codec) == 'Hello ' * 100)
+        ```
+        """
+        if self.codec is None or content is None:
+            return (content, None, None)
+        data = content.encode('utf-8')
+        if len(data) < self.threshold:
+            return (content, None, None)
+        compressed = CODECS[self.codec][0](data, self.level)
+        if len(compressed) >= len(data):
+            return (content, None, None)
+        return (None, compressed, self.codec)
+
+def decode(
+        content: Optional[str],
+        compressed: Optional[Buffer],
+        codec: Optional[str]
+        ) -> Optional[str]:
+    """ Returns the content of a message from what was stored by
+    Content_codec.encode.
+    ---
+    Parameters:
+        content (Optional[str]): Stored text.
+        compressed (Optional[Buffer]): Stored compressed bytes.
+        codec (Optional[str]): Stored codec tag, None for a text.
+    ---
+    Returns:
+        (Optional[str]): Content of the message.
+    ---
+    Raises:
+        (ValueError): If the codec is unknown or the bytes are invalid.
+    ---
+    Example:
+    ```python
+    assert(decode('Hello', None, None) == 'Hello')
+    ```
+    """
+    if codec is None:
+        return content
+    if codec not in CODECS:
+        raise ValueError(f'Unknown content codec {codec}.')
+    try:
+        return str(CODECS[codec][1](compressed), 'utf-8')
+    except (zlib.error, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid content compressed with {codec}: {e}')
+
+def content_codec_from_env() -> Content_codec:
+    """ Returns the codec configured by the environment.
+    CONTENT_CODEC names the codec ('zlib' by default, 'none' to store texts
+    only), CONTENT_COMPRESSION_THRESHOLD the size in bytes from which contents
+    are compressed (1024 by default) and CONTENT_COMPRESSION_LEVEL the level
+    of compression (6 by default).
+    ---
+    Returns:
+        (Content_codec): Configured codec.
+    ---
+    Raises:
+        (ValueError): If the configuration is invalid.
+    ---
+    Example:
+    ```python
+    content_codec = content_codec_from_env()
+    ```
+    """
+    codec = os.getenv('CONTENT_CODEC', 'zlib')
+    return Content_codec(
+            None if codec == 'none' else codec,
+            int(os.getenv('CONTENT_COMPRESSION_THRESHOLD', '1024')),
+            int(os.getenv('CONTENT_COMPRESSION_LEVEL', '6'))
+            )
@@ -1,14 +1,69 @@
 from __future__ import annotations
 from typing import Type
 import os
+import time
+import logging
 from shared.models.message import Message
 from shared.models.media import Media
 from shared.models.group import Group
 from shared.models.user import User
+from shared.models.group_summary import GroupSummary
+from shared.models.message_page import MessagePage
 from shared.services.message_iterator import Message_iterator
+from shared.services.negative_cache import Negative_cache
+from shared.services.cache import create_cache
+from shared.services.single_flight import Single_flight
+from shared.services.content_codec import content_codec_from_env
+from shared.services.content_codec import decode as decode_content
 from shared.exceptions.database_exception import DatabaseException
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# Attributes of each model, with the column they are stored in. A tuple holds
+# the text, compressed bytes and codec tag columns of a content stored by a
+# Content_codec.
+USER_COLUMNS = {
+        'id': 'id',
+        'name': 'name',
+        'first_name': 'first_name',
+        'email': 'email',
+        'join_date': 'join_date',
+        'auth_id': 'auth_id',
+        }
+GROUP_COLUMNS = {
+        'id': 'id',
+        'name': 'name',
+        }
+MESSAGE_COLUMNS = {
+        'id': 'id',
+        'content': ('content', 'content_compressed', 'content_codec'),
+        'sender_id': 'sender_id',
+        'receiver_group_id': 'receiver_group_id',
+        'date': 'date_',
+        }
+
+# Adds the rows of an "inserted" CTE of messages to the summaries of their
+# groups, in the same statement as the insertion.
+GROUP_SUMMARY_UPSERT = (
+        'INSERT INTO "GroupSummary" '
+        '("group_id", "last_message_id", "message_count", "last_activity") '
+        'SELECT DISTINCT ON ("receiver_group_id") '
+        '"receiver_group_id", "id", '
+        'COUNT(*) OVER (PARTITION BY "receiver_group_id"), "date_" '
+        'FROM inserted '
+        'ORDER BY "receiver_group_id", "date_" DESC, "id" DESC '
+        'ON CONFLICT ("group_id") DO UPDATE SET '
+        '"message_count" = '
+        '"GroupSummary"."message_count" + EXCLUDED."message_count", '
+        '"last_message_id" = CASE '
+        'WHEN "GroupSummary"."last_activity" IS NULL '
+        'OR EXCLUDED."last_activity" >= "GroupSummary"."last_activity" '
+        'THEN EXCLUDED."last_message_id" '
+        'ELSE "GroupSummary"."last_message_id" END, '
+        '"last_activity" = GREATEST('
+        '"GroupSummary"."last_activity", EXCLUDED."last_activity")'
+        )
 
 class Service_bdd:
     """ Gives access to the database for the rest of the program.
@@ -16,9 +71,21 @@ class Service_bdd:
     Attributes:
         connection (psycopg2.extensions.connection): Connection to the database.
         cursor (psycopg2.extensions.cursor): Cursor in the database.
+        negative_cache (Negative_cache): Recent lookups of users, groups and
+        keys that found no row, shared between the workers when
+        CACHE_BACKEND is 'shared'.
+        single_flight (Single_flight): Coalesces identical concurrent reads of
+        groups, members and messages.
+        stream_batch_size (int): Number of rows fetched at a time by the
+        server-side cursors of stream_query.
+        content_codec (Content_codec): Compresses the contents of the new
+        messages, configured by CONTENT_CODEC,
+        CONTENT_COMPRESSION_THRESHOLD and CONTENT_COMPRESSION_LEVEL.
     ---
     Methods:
         - __init__(Self): Creates a new database access service.
+        - connect() -> psycopg2.extensions.connection: Opens a new connection
+          to the database.
         - fetch_query(Self,str,list[Any]=None) -> list[tuple[Any]]: Executes
           the given query on the database to fetch data.
         - change_query(Self,str,list[Any]=None) -> list[tuple[Any]]: Executes
@@ -26,11 +93,30 @@ class Service_bdd:
         - change_and_return_query(self,query,params) -> list[tuple[Any]]:
           Executes the given query on the database to change data and return
           columns.
+        - change_and_return_many_query(self,query,rows) -> list[tuple[Any]]:
+          Executes the given query with a multi-row VALUES list to change data
+          and return columns.
+        - stream_query(Self,str,list[Any]=None) -> Iterator[tuple[Any]]:
+          Executes the given query with a server-side cursor and yields its
+          rows a batch at a time.
+        - projection(Self,str,dict[str,str],Optional[list[str]]) ->
+          tuple[sql.Composable, list[str]]: Returns the columns to select to
+          read the given fields of a model.
+        - row_to_model(Type,dict[str,str],list[str],tuple[Any]) -> Any:
+          Creates a model from a row read with a projection.
         - close_connection(self): Close the connection to the database.
         - __del__(Self): Deletes the current instance.
         - get_all_messages_group(Self,str) ->
           list[Message]: Returns every messages of the
           given group.
+        - stream_messages_group(Self,str) -> Iterator[Message]: Yields every
+          messages of the given group from a server-side cursor.
+        - get_message_page_group(Self,str,int,Optional[int]) -> MessagePage:
+          Returns messages of the given group as a columnar page.
+        - get_history_group(Self,str,Optional[list[str]]) ->
+          tuple[list[Message], dict[str, User], Optional[Group],
+          dict[str, list[Media]]]: Returns every messages of the given group
+          with their senders, the group and the medias.
         - iter_message_first(Self,str) -> Message: Returns the first message to
           load for a given group.
         - oldest_message(Self,str) -> Message: Returns the oldest message to
@@ -42,21 +128,46 @@ class Service_bdd:
           given group.
         - add_user_to_group(Self,str,str): Adds the given user to the given
           group.
+        - add_users_to_group(Self,list[str],str) -> list[str]: Adds the given
+          users to the given group in one statement.
+        - remove_users_from_group(Self,list[str],str) -> list[str]: Removes
+          the given users from the given group in one statement.
         - create_group(Self,Group) -> str: Creates the given group in the
           database.
         - get_group(Self,str) -> Group: Returns the group with the given id.
         - get_groups_user(Self,str) -> list[Group]: Returns all the group of a
           given user.
+        - stream_groups_user(Self,str) -> Iterator[Group]: Yields all the
+          groups of a given user from a server-side cursor.
+        - get_groups_with_users_user(Self,str) -> list[Group]: Returns all the
+          groups of a given user with their members.
+        - get_groups(Self,list[str]) -> dict[str, Group]: Returns the groups
+          with the given ids.
+        - get_groups_users(Self,list[str]) -> dict[str, list[Group]]: Returns
+          the groups of each of the given users.
+        - get_member_ids_groups(Self,list[str]) -> dict[str, list[str]]:
+          Returns the ids of the members of each of the given groups.
+        - get_group_summaries_user(Self,str) -> list[GroupSummary]: Returns the
+          summaries of the groups of a user, most recently active first.
         - create_message(Self,Message) -> str: Create a new message in the
           database.
+        - create_messages(Self,list[Message]) -> list[str]: Creates several
+          messages in the database in one transaction.
+        - reencode_messages(Self,int,float) -> int: Stores the contents of the
+          existing messages with the current content codec.
         - create_message_with_medias(Self,Message,list[Media]) -> str: Creates
           a message and its medias in the database.
         - get_message_user_iterator(Self,str) -> Message_iterator: Returns an
           iterator for the messages of a group.
         - get_medias_message(Self,str) -> list[Media]: Returns the medias
           attached to a given message.
+        - get_medias_messages(Self,list[str]) -> dict[str, list[Media]]:
+          Returns the medias attached to each of the given messages.
         - get_message(Self,str) -> Message:: Returns the message with the given
           id.
+        - get_last_messages_groups(Self,list[str],int) -> dict[str,
+          list[Message]]: Returns the last messages of each of the given
+          groups.
         - delete_message(Self,str): Deletes the message with the given id.
         - get_media(Self,str) -> Media:: Returns the media with the given id.
         - create_media(Self,Media,str) -> str: Creates a new media in the
@@ -67,6 +178,8 @@ class Service_bdd:
           database.
         - delete_user(Self,str): Delete the given user.
         - get_user(Self,str) -> User:: Returns the user with the given id.
+        - get_users(Self,list[str]) -> dict[str, User]: Returns the users with
+          the given ids.
         - get_user_auth(Self,str) -> User:: Returns the user with the given id
           in the authentification database.
         - get_user_email(Self,str) -> User:: Returns the user with the given
@@ -74,12 +187,30 @@ class Service_bdd:
         - set_user(Self,str,User): Changes the given user.
         - get_all_users(Self) -> list[User]: Returns all the users of the
           database.
+        - stream_all_users(Self) -> Iterator[User]: Yields all the users of the
+          database from a server-side cursor.
         - get_users_in_group(Self,str) -> list[User]: Returns the users of a
           group.
         - init_user_iterator(Self) -> Iterator[User]: Returns an iterator over
           all the users.
         - get_next_user(Self,Iterator[User]) -> Optional[User]: Returns the
           next user of the given iterator.
+        - store_public_key(Self,str,str,bytes): Stores the public key of a
+          user in a group.
+        - store_private_key(Self,str,str,bytes): Stores the private key of a
+          user in a group.
+        - get_public_key(Self,str,str) -> str: Returns the public key of a
+          user in a group as text.
+        - get_public_key_buffer(Self,str,str) -> memoryview: Returns the public
+          key of a user in a group as stored.
+        - get_public_keys_group(Self,str) -> dict[str, str]: Returns the public
+          keys of every member of a group.
+        - get_public_keys_groups(Self,list[str]) -> dict[str, dict[str, str]]:
+          Returns the public keys of the members of each of the given groups.
+        - get_private_key(Self,str,str) -> str: Returns the private key of a
+          user in a group as text.
+        - get_private_key_buffer(Self,str,str) -> memoryview: Returns the
+          private key of a user in a group as stored.
     """
 
     def __init__(self: Self):
@@ -94,18 +225,44 @@ class Service_bdd:
         ```
         """
         try:
-            self.connection = psycopg2.connect(
-                    dbname = os.getenv("DATABASE", 'pfe_database'),
-                    user = os.getenv("USER", 'my_user'),
-                    password = os.getenv("PASSWORD", 'my_password'),
-                    host = os.getenv("HOST", 'postgres'),
-                    port = int(os.getenv("PORT", '5432')),
-                    )
+            self.connection = self.connect()
             self.cursor = self.connection.cursor()
         except Exception as e:
             raise DatabaseException(
                     f'Failed to instanciate the database service: {e}'
                     )
+        self.negative_cache = Negative_cache(
+                ttl = float(os.getenv("NEGATIVE_CACHE_TTL", '5')),
+                cache = create_cache('negative')
+                )
+        self.single_flight = Single_flight()
+        self.stream_batch_size = int(os.getenv("STREAM_BATCH_SIZE", '1000'))
+        self.content_codec = content_codec_from_env()
+
+    @staticmethod
+    def connect() -> psycopg2.extensions.connection:
+        """ Opens a new connection to the database described by the
+        environment.
+        ---
+        Returns:
+            (psycopg2.extensions.connection): New connection.
+        ---
+        Raises:
+            (psycopg2.Error): If the connection fails.
+        ---
+        Example:
+        ```python
+        connection = Service_bdd.connect()
+        connection.close()
+        ```
+        """
+        return psycopg2.connect(
+                dbname = os.getenv("DATABASE", 'pfe_database'),
+                user = os.getenv("USER", 'my_user'),
+                password = os.getenv("PASSWORD", 'my_password'),
+                host = os.getenv("HOST", 'postgres'),
+                port = int(os.getenv("PORT", '5432')),
+                )
 
     def fetch_query( self: Self, query: str, params: list[Any]=None) -> list[tuple[Any]]:
         """ Executes the given query on the database to fetch data.
@@ -130,14 +287,172 @@ class Service_bdd:
                 )
         ```
         """
+        if not(isinstance(query, sql.Composable)):
+            query = sql.SQL(query)
         try:
-            self.cursor.execute(sql.SQL(query), params)
+            self.cursor.execute(query, params)
             res = self.cursor.fetchall()
         except Exception as e:
             self.connection.rollback()
             raise DatabaseException(f'Failed to execute query {query}: {e}')
         return res
 
+    def stream_query(
+            self: Self,
+            query: str,
+            params: list[Any] = None
+            ) -> Iterator[tuple[Any]]:
+        """ Executes the given query with a server-side cursor and yields its
+        rows.
+        The query runs on a dedicated connection, opened at the first row and
+        closed once the rows are exhausted or the generator is closed, and
+        only stream_batch_size rows are held in memory at a time.
+        ---
+        Parameters:
+            query (str): Query to execute, parameters use %s placeholders.
+            params (list[Any]): Parameters of the query.
+        ---
+        Returns:
+            (Iterator[tuple[Any]]): Rows returned by the database.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for row in service_bdd.stream_query('SELECT * FROM "UserApp"'):
+            print(row)
+        ```
+        """
+        if not(isinstance(query, sql.Composable)):
+            query = sql.SQL(query)
+        try:
+            connection = self.connect()
+        except Exception as e:
+            raise DatabaseException(
+                    f'Failed to open a connection to stream query {query}: {e}'
+                    )
+        try:
+            with connection:
+                with connection.cursor(name = 'stream') as cursor:
+                    cursor.itersize = self.stream_batch_size
+                    cursor.execute(query, params)
+                    while (rows := cursor.fetchmany(self.stream_batch_size)):
+                        yield from rows
+        except Exception as e:
+            raise DatabaseException(f'Failed to stream query {query}: {e}')
+        finally:
+            connection.close()
+
+    def projection(
+            self: Self,
+            table: str,
+            columns: dict[str, str],
+            fields: Optional[list[str]] = None
+            ) -> tuple[sql.Composable, list[str]]:
+        """ Returns the columns to select to read the given fields of a model.
+        The id is always read.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            table (str): Table the model is stored in.
+            columns (dict[str, Union[str, tuple[str]]]): Column(s) of each
+            attribute of the model.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (tuple[sql.Composable, list[str]]): Qualified columns to put in
+            the SELECT clause and attributes they hold, in the same order.
+        ---
+        Raises:
+            (DatabaseException): If a field is not an attribute of the model.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        columns, attributes = service_bdd.projection(
+                'UserApp',
+                USER_COLUMNS,
+                ['name']
+                )
+        assert(attributes == ['id', 'name'])
+        ```
+        """
+        if fields is None:
+            attributes = list(columns)
+        else:
+            unknown = [field for field in fields if field not in columns]
+            if unknown:
+                raise DatabaseException(
+                        f'Unknown fields {unknown} for {table}, expected '
+                        f'some of {list(columns)}.'
+                        )
+            attributes = ['id'] + [
+                    field for field in dict.fromkeys(fields) if field != 'id'
+                    ]
+        identifiers = []
+        for attribute in attributes:
+            column = columns[attribute]
+            for name in (column if isinstance(column, tuple) else (column,)):
+                identifiers.append(sql.Identifier(table, name))
+        return (sql.SQL(', ').join(identifiers), attributes)
+
+    @staticmethod
+    def row_to_model(
+            model: Type,
+            columns: dict[str, str],
+            attributes: list[str],
+            row: tuple[Any]
+            ) -> Any:
+        """ Creates a model from a row read with a projection.
+        Attributes that were not read are None, contents stored in several
+        columns are decoded.
+        ---
+        Parameters:
+            model (Type): Class of the model (User, Group or Message).
+            columns (dict[str, Union[str, tuple[str]]]): Column(s) of each
+            attribute of the model.
+            attributes (list[str]): Attributes held by the row.
+            row (tuple[Any]): Row returned by the database.
+        ---
+        Returns:
+            (Any): New instance of the model.
+        ---
+        Raises:
+            (DatabaseException): If a stored content can not be decoded.
+        ---
+        Example:
+        ```python
+        user = Service_bdd.row_to_model(
+                User,
+                USER_COLUMNS,
+                ['id', 'name'],
+                (5, 'name')
+                )
+        assert(user.get_email() == None)
+        ```
+        """
+        values = dict.fromkeys(columns)
+        position = 0
+        for attribute in attributes:
+            column = columns[attribute]
+            if isinstance(column, tuple):
+                try:
+                    values[attribute] = decode_content(
+                            *row[position:position + len(column)]
+                            )
+                except ValueError as e:
+                    raise DatabaseException(
+                            f'Could not decode the {attribute} of row '
+                            f'{row[0]}: {e}'
+                            )
+                position += len(column)
+            else:
+                values[attribute] = row[position]
+                position += 1
+        return model(**values)
+
     def change_query(
             self: Self,
             query: str,
@@ -205,6 +520,50 @@ class Service_bdd:
             raise DatabaseException(f'Failed to execute query {query}: {e}')
         return res
 
+    def change_and_return_many_query(
+            self: Self,
+            query: str,
+            rows: list[tuple[Any]]
+            ) -> list[tuple[Any]]:
+        """ Executes the given query with a multi-row VALUES list to change
+        data and return columns.
+        Every row is sent in a single statement and committed once.
+        ---
+        Parameters:
+            query (str): Query to execute, with a single %s placeholder for
+            the VALUES list.
+            rows (list[tuple[Any]]): Values of each row.
+        ---
+        Returns:
+            (list[typle[Any]]): List of the rows returned by the database for
+            the given query.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        service_bdd.change_and_return_many_query(
+                'INSERT INTO "Group" (name) VALUES %s RETURNING id',
+                [('group1',), ('group2',)]
+                )
+        ```
+        """
+        try:
+            res = execute_values(
+                    self.cursor,
+                    query,
+                    rows,
+                    page_size = max(len(rows), 1),
+                    fetch = True
+                    )
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            raise DatabaseException(f'Failed to execute query {query}: {e}')
+        return res
+
     def close_connection(self):
         """ Close the connection to the database.
         ---
@@ -234,12 +593,17 @@ class Service_bdd:
         """
         self.close_connection()
 
-    def get_all_messages_group(self: Self, group_id: str) -> list[Message]:
+    def get_all_messages_group(
+            self: Self,
+            group_id: str,
+            fields: Optional[list[str]] = None
+            ) -> list[Message]:
         """ Returns every messages of the given group.
         ---
         Parameters:
             self (Self): Current instance.
             group_id (str): Id of the group to get the messages of.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
             (list[Message]): List of all the messages of the given group.
@@ -253,11 +617,36 @@ class Service_bdd:
         message = service_bdd.get_all_messages_group('group_id')
         ```
         """
+        columns, attributes = self.projection(
+                'Message',
+                MESSAGE_COLUMNS,
+                fields
+                )
+        return list(self.single_flight.do(
+                ('messages_group', str(group_id), tuple(attributes)),
+                lambda: self._fetch_all_messages_group(
+                    group_id,
+                    columns,
+                    attributes
+                    )
+                ))
+
+    def _fetch_all_messages_group(
+            self: Self,
+            group_id: str,
+            columns: sql.Composable,
+            attributes: list[str]
+            ) -> list[Message]:
+        """ Queries every messages of the given group, see
+        get_all_messages_group.
+        """
         try:
             query_result = self.fetch_query(
-                    'SELECT * FROM "Message" '
-                    'WHERE "receiver_group_id" = %s '
-                    'ORDER BY "date_" ASC',
+                    sql.SQL(
+                        'SELECT {} FROM "Message" '
+                        'WHERE "receiver_group_id" = %s '
+                        'ORDER BY "date_" ASC'
+                        ).format(columns),
                     [group_id]
                     )
         except Exception as e:
@@ -265,7 +654,179 @@ class Service_bdd:
                     f'Could not execute the query to get all the messages for '
                     f'{group_id=}: {e}'
                     )
-        return [Message(*res[1:], id = res[0]) for res in query_result]
+        return [
+                self.row_to_model(Message, MESSAGE_COLUMNS, attributes, res)
+                for res in query_result
+                ]
+
+    def get_message_page_group(
+            self: Self,
+            group_id: str,
+            offset: int = 0,
+            limit: Optional[int] = None
+            ) -> MessagePage:
+        """ Returns messages of the given group, oldest first, as a columnar
+        page filled directly from the rows. Only the limit messages after the
+        first offset ones are read.
+        Concurrent reads of the same page share a single query, the page must
+        not be modified (slicing it is fine, slices share its buffers).
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group to get the messages of.
+            offset (int): Number of messages to skip.
+            limit (Optional[int]): Maximum number of messages, None for all.
+        ---
+        Returns:
+            (MessagePage): Messages of the group.
+        ---
+        Raises:
+            (ValueError): If offset or limit is negative.
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        page = service_bdd.get_message_page_group('3', offset = 50, limit = 50)
+        ```
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError(
+                    f'Invalid message page {offset=} {limit=} of {group_id=}.'
+                    )
+        return self.single_flight.do(
+                ('message_page_group', str(group_id), offset, limit),
+                lambda: self._fetch_message_page_group(group_id, offset, limit)
+                )
+
+    def _fetch_message_page_group(
+            self: Self,
+            group_id: str,
+            offset: int,
+            limit: Optional[int]
+            ) -> MessagePage:
+        """ Queries a page of the messages of the given group, see
+        get_message_page_group.
+        """
+        try:
+            query_result = self.fetch_query(
+                    'SELECT "id", "content", "content_compressed", '
+                    '"content_codec", COALESCE("sender_id", 0), '
+                    'COALESCE("date_", 0) FROM "Message" '
+                    'WHERE "receiver_group_id" = %s '
+                    'ORDER BY "date_" ASC, "id" ASC '
+                    'LIMIT %s OFFSET %s',
+                    [group_id, limit, offset]
+                    )
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the message page of {group_id=}: {e}'
+                    )
+        try:
+            return MessagePage.from_rows(
+                    int(group_id),
+                    (
+                        (line[0], decode_content(*line[1:4]), line[4], line[5])
+                        for line in query_result
+                        )
+                    )
+        except ValueError as e:
+            raise DatabaseException(
+                    f'Could not decode the message page of {group_id=}: {e}'
+                    )
+
+    def stream_messages_group(
+            self: Self,
+            group_id: str,
+            fields: Optional[list[str]] = None
+            ) -> Iterator[Message]:
+        """ Yields every messages of the given group, oldest first, from a
+        server-side cursor.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group to get the messages of.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (Iterator[Message]): Messages of the group.
+        ---
+        Raises:
+            (DatabaseException): If a field is unknown or the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for message in service_bdd.stream_messages_group('3'):
+            print(message)
+        ```
+        """
+        columns, attributes = self.projection(
+                'Message',
+                MESSAGE_COLUMNS,
+                fields
+                )
+        query = sql.SQL(
+                'SELECT {} FROM "Message" '
+                'WHERE "receiver_group_id" = %s '
+                'ORDER BY "date_" ASC'
+                ).format(columns)
+        return (
+                self.row_to_model(Message, MESSAGE_COLUMNS, attributes, row)
+                for row in self.stream_query(query, [group_id])
+                )
+
+    def get_history_group(
+            self: Self,
+            group_id: str,
+            fields: Optional[list[str]] = None
+            ) -> tuple[
+                    list[Message],
+                    dict[str, User],
+                    Optional[Group],
+                    dict[str, list[Media]]
+                    ]:
+        """ Returns every messages of the given group with their senders, the
+        group and the attached medias, so that a page of history can be
+        rendered without looking up each sender or media.
+        The distinct senders and the medias are each fetched in a single
+        query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group to get the messages of.
+            fields (Optional[list[str]]): Attributes of the messages to read,
+            all if None. The sender id is always read to find the senders.
+        ---
+        Returns:
+            (tuple[list[Message], dict[str, User], Optional[Group],
+            dict[str, list[Media]]]): Messages of the group, senders of these
+            messages indexed by id, group and medias indexed by message id.
+        ---
+        Raises:
+            (DatabaseException): If a query fails or a field is not an
+            attribute of Message.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        messages, users, group, medias = service_bdd.get_history_group(
+                'group_id'
+                )
+        for message in messages:
+            print(users[message.get_sender_id()], message)
+        ```
+        """
+        if fields is not None:
+            fields = fields + ['sender_id']
+        messages = self.get_all_messages_group(group_id, fields)
+        users = self.get_users(
+                {message.get_sender_id() for message in messages}
+                )
+        medias = self.get_medias_messages(
+                message.get_id() for message in messages
+                )
+        return messages, users, self.get_group(group_id), medias
 
     def verify_tables(self: Self) -> list[string]:
         try:
@@ -322,11 +883,14 @@ class Service_bdd:
         message = service_bdd.oldest_message('3')
         ```
         """
+        columns, attributes = self.projection('Message', MESSAGE_COLUMNS)
         try:
             query_result = self.fetch_query(
-                    'SELECT * FROM "Message" '
-                    'WHERE "receiver_group_id" = %s '
-                    'ORDER BY "date_" ASC Limit 1',
+                    sql.SQL(
+                        'SELECT {} FROM "Message" '
+                        'WHERE "receiver_group_id" = %s '
+                        'ORDER BY "date_" ASC Limit 1'
+                        ).format(columns),
                     [group_id]
                     )
         except Exception as e:
@@ -338,7 +902,7 @@ class Service_bdd:
             res = query_result[0]
         except IndexError:
             raise StopIteration('No message found for the given group.')
-        return Message(*res[1:], id = res[0])
+        return self.row_to_model(Message, MESSAGE_COLUMNS, attributes, res)
 
     def iter_message_next(self: Self, current: Message) -> Message:
         """ Returns the message which should be loaded after the given message.
@@ -363,12 +927,15 @@ class Service_bdd:
         """
         group_id = current.receiver_group_id
         date = current.date
+        columns, attributes = self.projection('Message', MESSAGE_COLUMNS)
         try:
             query_result = self.fetch_query(
-                    'SELECT * FROM "Message" '
-                    'WHERE "receiver_group_id" = %s '
-                    'AND "date_" > %s '
-                    'ORDER BY "date_" ASC Limit 1',
+                    sql.SQL(
+                        'SELECT {} FROM "Message" '
+                        'WHERE "receiver_group_id" = %s '
+                        'AND "date_" > %s '
+                        'ORDER BY "date_" ASC Limit 1'
+                        ).format(columns),
                     [group_id, date]
                     )
         except Exception as e:
@@ -380,7 +947,7 @@ class Service_bdd:
             res = query_result[0]
         except IndexError:
             raise StopIteration('No next message found for the given group.')
-        return Message(*res[1:], id = res[0])
+        return self.row_to_model(Message, MESSAGE_COLUMNS, attributes, res)
 
     def rename_group(
             self: Self,
@@ -471,6 +1038,88 @@ class Service_bdd:
                     f'{group_id}: {e}'
                     )
 
+    def add_users_to_group(
+            self: Self,
+            user_ids: Iterable[str],
+            group_id: str
+            ) -> list[str]:
+        """ Adds the given users to the given group in one statement.
+        Users already in the group are skipped.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_ids (Iterable[str]): Users to add to the group.
+            group_id (str): Group to add the users to.
+        ---
+        Returns:
+            (list[str]): Ids of the users that were not already in the group.
+        ---
+        Raises:
+            (DatabaseException): If the query fails, in which case no user is
+            added.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        added = service_bdd.add_users_to_group(['1', '2'], 'group_id')
+        ```
+        """
+        user_ids = list({str(user_id) for user_id in user_ids})
+        if not(user_ids):
+            return []
+        query = ('INSERT INTO "UserInGroup" ("user_id", "group_id") '
+                 'SELECT UNNEST(%s::int[]), %s '
+                 'ON CONFLICT ("user_id", "group_id") DO NOTHING '
+                 'RETURNING "user_id"')
+        try:
+            lines = self.change_and_return_query(query, [user_ids, group_id])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Failed to add the users {user_ids} to the group '
+                    f'{group_id}: {e}'
+                    )
+        return [line[0] for line in lines]
+
+    def remove_users_from_group(
+            self: Self,
+            user_ids: Iterable[str],
+            group_id: str
+            ) -> list[str]:
+        """ Removes the given users from the given group in one statement.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_ids (Iterable[str]): Users to remove from the group.
+            group_id (str): Group to remove the users from.
+        ---
+        Returns:
+            (list[str]): Ids of the users that were in the group.
+        ---
+        Raises:
+            (DatabaseException): If the query fails, in which case no user is
+            removed.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        removed = service_bdd.remove_users_from_group(['1', '2'], 'group_id')
+        ```
+        """
+        user_ids = list({str(user_id) for user_id in user_ids})
+        if not(user_ids):
+            return []
+        query = ('DELETE FROM "UserInGroup" '
+                 'WHERE "group_id" = %s AND "user_id" = ANY(%s::int[]) '
+                 'RETURNING "user_id"')
+        try:
+            lines = self.change_and_return_query(query, [group_id, user_ids])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Failed to remove the users {user_ids} from the group '
+                    f'{group_id}: {e}'
+                    )
+        return [line[0] for line in lines]
+
     def create_group(self: Self, group: Group) -> str:
         """ Creates the given group in the database.
         Does not add the user in the group in the database.
@@ -496,21 +1145,28 @@ class Service_bdd:
         try:
             group_id = self.change_and_return_query(query, [group.get_name()])[0][0]
             group.set_id(group_id)
+            self.negative_cache.discard('group', group_id)
         except Exception as e:
             raise DatabaseException(
                     f'Failed to create the group {group}: {e}'
                     )
         return group_id
 
-    def get_group(self: Self, group_id: str) -> Group:
+    def get_group(
+            self: Self,
+            group_id: str,
+            fields: Optional[list[str]] = None
+            ) -> Group:
         """ Returns the group with the given id.
         ---
         Parameters:
             self (Self): Current instance.
             group_id (str): Id of the group to get.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
-            (Optional[Group]): Group with the given id.
+            (Optional[Group]): Group with the given id, None if no group was
+            found (misses are remembered for a few seconds).
         ---
         Raises:
             (DatabaseException): If the querry fails.
@@ -523,21 +1179,53 @@ class Service_bdd:
         assert(my_group == service_bdd.get_group(my_group_id))
         ```
         """
-        query = 'SELECT * FROM "Group" WHERE "id" = %s'
+        if self.negative_cache.contains('group', group_id):
+            return None
+        columns, attributes = self.projection('Group', GROUP_COLUMNS, fields)
+        group = self.single_flight.do(
+                ('group', str(group_id), tuple(attributes)),
+                lambda: self._fetch_group(group_id, columns, attributes)
+                )
+        if group is None:
+            return None
+        # Coalesced callers share the fetched group, each gets its own copy
+        return Group(
+                group.get_name(),
+                id = group.get_id(),
+                l_users = list(group.get_users())
+                )
+
+    def _fetch_group(
+            self: Self,
+            group_id: str,
+            columns: sql.Composable,
+            attributes: list[str]
+            ) -> Optional[Group]:
+        """ Queries the group with the given id, see get_group.
+        """
+        query = sql.SQL('SELECT {} FROM "Group" WHERE "id" = %s').format(
+                columns
+                )
         try:
             group = self.fetch_query(query, [group_id])[0]
         except IndexError:
+            self.negative_cache.add('group', group_id)
             return None
         except Exception as e:
             raise DatabaseException(f'Could not get the group {group_id}: {e}')
-        return Group(*group[1:], id = group[0])
+        return self.row_to_model(Group, GROUP_COLUMNS, attributes, group)
 
-    def get_groups_user(self: Self, user_id: str) -> list[Group]:
+    def get_groups_user(
+            self: Self,
+            user_id: str,
+            fields: Optional[list[str]] = None
+            ) -> list[Group]:
         """ Returns all the group of a given user.
         ---
         Parameters:
             self (Self): Current instance.
             user_id (str): Id of the user to get the groups of.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
             (list[Group]): Groups of the given user.
@@ -551,19 +1239,314 @@ class Service_bdd:
         groups = service_bdd.get_groups_user('user_id')
         ```
         """
-        query = ('SELECT "Group".* FROM "Group" '
-                 'JOIN "UserInGroup" ON "Group"."id" = "UserInGroup"."group_id" '
-                 'WHERE "UserInGroup"."user_id" = %s')
+        columns, attributes = self.projection('Group', GROUP_COLUMNS, fields)
+        query = sql.SQL(
+                'SELECT {} FROM "Group" '
+                'JOIN "UserInGroup" ON "Group"."id" = "UserInGroup"."group_id" '
+                'WHERE "UserInGroup"."user_id" = %s'
+                ).format(columns)
         try:
             groups = self.fetch_query(query, [user_id])
         except Exception as e:
             raise DatabaseException(
                     f'Could not get the groups of user {user_id}: {e}'
                     )
-        return [Group(*line[1:], id = line[0]) for line in groups]
+        return [
+                self.row_to_model(Group, GROUP_COLUMNS, attributes, line)
+                for line in groups
+                ]
+
+    def stream_groups_user(
+            self: Self,
+            user_id: str,
+            fields: Optional[list[str]] = None
+            ) -> Iterator[Group]:
+        """ Yields all the groups of a given user from a server-side cursor.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_id (str): Id of the user to get the groups of.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (Iterator[Group]): Groups of the given user.
+        ---
+        Raises:
+            (DatabaseException): If a field is unknown or the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for group in service_bdd.stream_groups_user('user_id'):
+            print(group)
+        ```
+        """
+        columns, attributes = self.projection('Group', GROUP_COLUMNS, fields)
+        query = sql.SQL(
+                'SELECT {} FROM "Group" '
+                'JOIN "UserInGroup" ON "Group"."id" = "UserInGroup"."group_id" '
+                'WHERE "UserInGroup"."user_id" = %s'
+                ).format(columns)
+        return (
+                self.row_to_model(Group, GROUP_COLUMNS, attributes, row)
+                for row in self.stream_query(query, [user_id])
+                )
+
+    def get_groups_with_users_user(self: Self, user_id: str) -> list[Group]:
+        """ Returns all the groups of a given user with their members.
+        The memberships of every group are read in one set-based query and
+        the distinct members in a second one, whatever the number of groups.
+        A user appearing in several groups is a single shared instance.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_id (str): Id of the user to get the groups of.
+        ---
+        Returns:
+            (list[Group]): Groups of the given user, their users set.
+        ---
+        Raises:
+            (DatabaseException): If a query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for group in service_bdd.get_groups_with_users_user('user_id'):
+            print(group, list(group.get_users()))
+        ```
+        """
+        query = ('SELECT "Group"."id", "Group"."name", '
+                 'COALESCE(ARRAY_AGG(DISTINCT "Member"."user_id") '
+                 'FILTER (WHERE "Member"."user_id" IS NOT NULL), \'{}\') '
+                 'FROM "UserInGroup" AS "Mine" '
+                 'JOIN "Group" ON "Group"."id" = "Mine"."group_id" '
+                 'LEFT JOIN "UserInGroup" AS "Member" '
+                 'ON "Member"."group_id" = "Group"."id" '
+                 'WHERE "Mine"."user_id" = %s '
+                 'GROUP BY "Group"."id", "Group"."name" '
+                 'ORDER BY "Group"."id"')
+        try:
+            lines = self.fetch_query(query, [user_id])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the groups and members of user '
+                    f'{user_id}: {e}'
+                    )
+        users = self.get_users(
+                {member_id for line in lines for member_id in line[2]}
+                )
+        return [
+                Group(
+                    line[1],
+                    id = line[0],
+                    l_users = [
+                        users[member_id] for member_id in line[2]
+                        if member_id in users
+                        ]
+                    )
+                for line in lines
+                ]
+
+    def get_groups(
+            self: Self,
+            group_ids: Iterable[str],
+            fields: Optional[list[str]] = None
+            ) -> dict[str, Group]:
+        """ Returns the groups with the given ids.
+        The groups are fetched in a single query, ids recently found missing
+        are skipped and the new misses are remembered.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_ids (Iterable[str]): Ids of the groups to return.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (dict[str, Group]): Groups found, indexed by id. Missing ids are
+            absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        groups = service_bdd.get_groups(['1', '2'])
+        ```
+        """
+        wanted = {
+                str(group_id) for group_id in group_ids
+                if not(self.negative_cache.contains('group', group_id))
+                }
+        if not(wanted):
+            return {}
+        columns, attributes = self.projection('Group', GROUP_COLUMNS, fields)
+        query = sql.SQL(
+                'SELECT {} FROM "Group" WHERE "id" = ANY(%s::int[])'
+                ).format(columns)
+        try:
+            lines = self.fetch_query(query, [list(wanted)])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the groups {sorted(wanted)}: {e}'
+                    )
+        groups = {
+                line[0]: self.row_to_model(Group, GROUP_COLUMNS, attributes, line)
+                for line in lines
+                }
+        for group_id in wanted.difference(str(group_id) for group_id in groups):
+            self.negative_cache.add('group', group_id)
+        return groups
+
+    def get_groups_users(
+            self: Self,
+            user_ids: Iterable[str]
+            ) -> dict[str, list[Group]]:
+        """ Returns the groups of each of the given users.
+        The groups of every user are read in a single query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_ids (Iterable[str]): Ids of the users to get the groups of.
+        ---
+        Returns:
+            (dict[str, list[Group]]): Groups indexed by the id of their
+            member. Users without groups are absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for group in service_bdd.get_groups_users(['1', '2']).get(1, []):
+            print(group)
+        ```
+        """
+        user_ids = list({str(user_id) for user_id in user_ids})
+        if not(user_ids):
+            return {}
+        query = ('SELECT "UserInGroup"."user_id", "Group"."id", "Group"."name" '
+                 'FROM "UserInGroup" '
+                 'JOIN "Group" ON "Group"."id" = "UserInGroup"."group_id" '
+                 'WHERE "UserInGroup"."user_id" = ANY(%s::int[]) '
+                 'ORDER BY "UserInGroup"."user_id", "Group"."id"')
+        try:
+            lines = self.fetch_query(query, [user_ids])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the groups of the users {user_ids}: {e}'
+                    )
+        groups = {}
+        for line in lines:
+            groups.setdefault(line[0], []).append(Group(line[2], id = line[1]))
+        return groups
+
+    def get_member_ids_groups(
+            self: Self,
+            group_ids: Iterable[str]
+            ) -> dict[str, list[str]]:
+        """ Returns the ids of the members of each of the given groups.
+        The members of every group are read in a single query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_ids (Iterable[str]): Ids of the groups to get the members of.
+        ---
+        Returns:
+            (dict[str, list[str]]): Ids of the members indexed by the id of
+            their group. Groups without members are absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        members = service_bdd.get_member_ids_groups(['1', '2'])
+        users = service_bdd.get_users(members.get(1, []))
+        ```
+        """
+        group_ids = list({str(group_id) for group_id in group_ids})
+        if not(group_ids):
+            return {}
+        query = ('SELECT "group_id", "user_id" FROM "UserInGroup" '
+                 'WHERE "group_id" = ANY(%s::int[]) '
+                 'ORDER BY "group_id", "user_id"')
+        try:
+            lines = self.fetch_query(query, [group_ids])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the members of the groups {group_ids}: {e}'
+                    )
+        members = {}
+        for line in lines:
+            members.setdefault(line[0], []).append(line[1])
+        return members
+
+    def get_group_summaries_user(
+            self: Self,
+            user_id: str
+            ) -> list[GroupSummary]:
+        """ Returns the summaries of the groups of a user, most recently
+        active first.
+        Groups without messages come last.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_id (str): Id of the user to get the groups of.
+        ---
+        Returns:
+            (list[GroupSummary]): Summaries of the groups of the user.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        summaries = service_bdd.get_group_summaries_user('user_id')
+        ```
+        """
+        query = ('SELECT "Group"."id", "Group"."name", '
+                 'COALESCE("GroupSummary"."message_count", 0), '
+                 '"GroupSummary"."last_activity", '
+                 '"Message"."id", "Message"."content", '
+                 '"Message"."content_compressed", "Message"."content_codec", '
+                 '"Message"."sender_id" '
+                 'FROM "UserInGroup" '
+                 'JOIN "Group" ON "Group"."id" = "UserInGroup"."group_id" '
+                 'LEFT JOIN "GroupSummary" '
+                 'ON "GroupSummary"."group_id" = "Group"."id" '
+                 'LEFT JOIN "Message" '
+                 'ON "Message"."id" = "GroupSummary"."last_message_id" '
+                 'WHERE "UserInGroup"."user_id" = %s '
+                 'ORDER BY "GroupSummary"."last_activity" DESC NULLS LAST, '
+                 '"Group"."id"')
+        try:
+            lines = self.fetch_query(query, [user_id])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the group summaries of user {user_id}: {e}'
+                    )
+        try:
+            return [
+                    GroupSummary(
+                        *line[:5],
+                        decode_content(*line[5:8]),
+                        line[8]
+                        )
+                    for line in lines
+                    ]
+        except ValueError as e:
+            raise DatabaseException(
+                    f'Could not decode the last messages of the groups of '
+                    f'user {user_id}: {e}'
+                    )
 
     def create_message(self: Self, message: Message) -> str:
         """ Create a new Message in the database.
+        The summary of the group is updated in the same statement.
         ---
         Parameters:
             self (Self): Current instance.
@@ -589,17 +1572,22 @@ class Service_bdd:
         message_id = service_bdd.create_message(my_message)
         ```
         """
-        query = ('INSERT INTO "Message" '
-                 '(content, sender_id, receiver_group_id, date_) '
-                 'VALUES (%s, %s, %s, %s) RETURNING id')
+        query = ('WITH inserted AS ('
+                 'INSERT INTO "Message" '
+                 '(content, content_compressed, content_codec, '
+                 'sender_id, receiver_group_id, date_) '
+                 'VALUES (%s, %s, %s, %s, %s, %s) '
+                 'RETURNING "id", "receiver_group_id", "date_"), '
+                 f'summary AS ({GROUP_SUMMARY_UPSERT}) '
+                 'SELECT "id" FROM inserted')
         try:
             message_id = self.change_and_return_query(
                     query,
-                    [message.get_content(),
+                    [*self.content_codec.encode(message.get_content()),
                      message.get_sender_id(),
                      message.get_receiver_group_id(),
                      message.get_date()]
-                    )
+                    )[0][0]
             message.set_id(message_id)
         except Exception as e:
             raise DatabaseException(
@@ -607,6 +1595,160 @@ class Service_bdd:
                     )
         return message_id
 
+    def create_messages(self: Self, messages: list[Message]) -> list[str]:
+        """ Creates several messages in the database in one transaction.
+        The messages are stored with a single multi-row insert which also
+        updates the summaries of their groups.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            messages (list[Message]): Messages to add to the database, each
+            will receive its id.
+        ---
+        Returns:
+            (list[str]): Ids of the messages, in the order of the given list.
+        ---
+        Raises:
+            (DatabaseException): If the query fails, in which case no message
+            is created.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        message_ids = service_bdd.create_messages([
+                Message('Hello', '1', '2', 1706873888),
+                Message('World', '1', '2', 1706873889),
+                ])
+        ```
+        """
+        if not(messages):
+            return []
+        # The ids are drawn before the insert and returned with the position
+        # of their message, the order of RETURNING is not guaranteed.
+        query = ('WITH "rows" AS ('
+                 'SELECT nextval(pg_get_serial_sequence(\'"Message"\', '
+                 '\'id\')) AS "id", v.* FROM (VALUES %s) AS v '
+                 '("ord", "content", "content_compressed", "content_codec", '
+                 '"sender_id", "receiver_group_id", "date_")), '
+                 'inserted AS ('
+                 'INSERT INTO "Message" '
+                 '(id, content, content_compressed, content_codec, '
+                 'sender_id, receiver_group_id, date_) '
+                 'SELECT "id", "content"::text, "content_compressed"::bytea, '
+                 '"content_codec"::varchar, "sender_id"::int, '
+                 '"receiver_group_id"::int, "date_"::bigint FROM "rows" '
+                 'RETURNING "id", "receiver_group_id", "date_"), '
+                 f'summary AS ({GROUP_SUMMARY_UPSERT}) '
+                 'SELECT "ord", "id" FROM "rows"')
+        try:
+            lines = self.change_and_return_many_query(
+                    query,
+                    [(position,
+                      *self.content_codec.encode(message.get_content()),
+                      message.get_sender_id(),
+                      message.get_receiver_group_id(),
+                      message.get_date())
+                     for position, message in enumerate(messages)]
+                    )
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not create the {len(messages)} messages: {e}'
+                    )
+        message_ids = [None] * len(messages)
+        for position, message_id in lines:
+            message_ids[position] = message_id
+        for message, message_id in zip(messages, message_ids):
+            message.set_id(message_id)
+        return message_ids
+
+    def reencode_messages(
+            self: Self,
+            batch_size: int = 1000,
+            pause: float = 0.0
+            ) -> int:
+        """ Stores the contents of the existing messages with the current
+        content codec, compressing the long texts and decompressing the
+        contents of a codec that is no longer used.
+        The messages are walked by id, batch_size at a time, and each batch is
+        committed on its own so the tool can be stopped and started again.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            batch_size (int): Number of messages read and updated at a time.
+            pause (float): Seconds to wait between two batches, to leave room
+            to the other queries.
+        ---
+        Returns:
+            (int): Number of messages whose storage changed.
+        ---
+        Raises:
+            (DatabaseException): If a query fails or a content can not be
+            decoded, the batches already committed stay re-encoded.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        count = service_bdd.reencode_messages(batch_size = 500, pause = 0.1)
+        ```
+        """
+        codec = self.content_codec.codec
+        select = ('SELECT "id", "content", "content_compressed", '
+                  '"content_codec" FROM "Message" WHERE "id" > %s '
+                  'AND ("content_codec" IS DISTINCT FROM %s '
+                  'OR octet_length("content") >= %s) '
+                  'ORDER BY "id" LIMIT %s')
+        update = ('UPDATE "Message" SET "content" = v."content", '
+                  '"content_compressed" = v."content_compressed"::bytea, '
+                  '"content_codec" = v."content_codec" '
+                  'FROM (VALUES %s) '
+                  'AS v ("id", "content", "content_compressed", "content_codec") '
+                  'WHERE "Message"."id" = v."id" '
+                  'RETURNING "Message"."id"')
+        count = 0
+        last_id = 0
+        while True:
+            try:
+                lines = self.fetch_query(
+                        select,
+                        [
+                            last_id,
+                            codec,
+                            self.content_codec.threshold,
+                            batch_size
+                            ]
+                        )
+            except Exception as e:
+                raise DatabaseException(
+                        f'Could not read the messages after {last_id} to '
+                        f're-encode them: {e}'
+                        )
+            if not(lines):
+                return count
+            last_id = lines[-1][0]
+            rows = []
+            for line in lines:
+                try:
+                    content = decode_content(*line[1:])
+                except ValueError as e:
+                    raise DatabaseException(
+                            f'Could not decode the content of message '
+                            f'{line[0]}: {e}'
+                            )
+                stored = self.content_codec.encode(content)
+                compressed = None if line[2] is None else bytes(line[2])
+                if stored != (line[1], compressed, line[3]):
+                    rows.append((line[0], *stored))
+            if rows:
+                try:
+                    count += len(self.change_and_return_many_query(update, rows))
+                except Exception as e:
+                    raise DatabaseException(
+                            f'Could not re-encode the messages up to {last_id}: '
+                            f'{e}'
+                            )
+            if pause > 0:
+                time.sleep(pause)
+
     def create_message_with_medias(
             self: Self,
             message: Message,
@@ -688,29 +1830,121 @@ class Service_bdd:
         Example:
         ```python
         service_bdd = Service_bdd()
-        for media in service_bdd.get_medias_message('message_id'):
-            print(media)
+        for media in service_bdd.get_medias_message('message_id'):
+            print(media)
+        ```
+        """
+        query = 'SELECT * FROM "Media" WHERE "message_id" = %s'
+        try:
+            medias = self.fetch_query(query, [message_id])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the medias for '
+                    f'the message {message_id}: {e}'
+                    )
+        return [Media.from_row(line) for line in medias]
+
+    def get_medias_messages(
+            self: Self,
+            message_ids: Iterable[str]
+            ) -> dict[str, list[Media]]:
+        """ Returns the medias attached to each of the given messages.
+        The medias of every message are fetched in a single query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            message_ids (Iterable[str]): Ids of the messages to get the medias
+            of.
+        ---
+        Returns:
+            (dict[str, list[Media]]): Medias indexed by the id of their
+            message. Messages without medias are absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        medias = service_bdd.get_medias_messages(['1', '2'])
+        for media in medias.get(1, []):
+            print(media)
+        ```
+        """
+        message_ids = list({str(message_id) for message_id in message_ids})
+        if not(message_ids):
+            return {}
+        query = ('SELECT * FROM "Media" WHERE "message_id" = ANY(%s::int[]) '
+                 'ORDER BY "message_id", "id"')
+        try:
+            lines = self.fetch_query(query, [message_ids])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the medias of the messages '
+                    f'{message_ids}: {e}'
+                    )
+        medias = {}
+        for line in lines:
+            medias.setdefault(line[3], []).append(Media.from_row(line))
+        return medias
+
+    def get_message(
+            self: Self,
+            message_id: str,
+            fields: Optional[list[str]] = None
+            ) -> Message:
+        """ Returns the message with the given id.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            message_id (str): Id of the message to get.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (Optional[Message]): Message with the given id.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        message = service_bdd.get_message('message_id')
         ```
         """
-        query = 'SELECT * FROM "Media" WHERE "message_id" = %s'
+        columns, attributes = self.projection('Message', MESSAGE_COLUMNS, fields)
+        query = sql.SQL('SELECT {} FROM "Message" WHERE "id" = %s').format(
+                columns
+                )
         try:
-            medias = self.fetch_query(query, [message_id])
+            message = self.fetch_query(query, [message_id])[0]
+        except IndexError:
+            return None
         except Exception as e:
             raise DatabaseException(
-                    f'Could not get the medias for '
-                    f'the message {message_id}: {e}'
+                    f'Could not get the message {message_id}: {e}'
                     )
-        return [Media(*line[1:], id = line[0]) for line in medias]
+        return self.row_to_model(Message, MESSAGE_COLUMNS, attributes, message)
 
-    def get_message(self: Self, message_id: str) -> Message:
-        """ Returns the message with the given id.
+    def get_last_messages_groups(
+            self: Self,
+            group_ids: Iterable[str],
+            limit: int
+            ) -> dict[str, list[Message]]:
+        """ Returns the last messages of each of the given groups, oldest
+        first.
+        The messages of every group are read in a single query, each group
+        being cut to its own limit.
         ---
         Parameters:
             self (Self): Current instance.
-            message_id (str): Id of the message to get.
+            group_ids (Iterable[str]): Ids of the groups to get the messages
+            of.
+            limit (int): Maximum number of messages returned for each group.
         ---
         Returns:
-            (Optional[Message]): Message with the given id.
+            (dict[str, list[Message]]): Messages indexed by the id of their
+            group. Groups without messages are absent.
         ---
         Raises:
             (DatabaseException): If the query fails.
@@ -718,22 +1952,43 @@ class Service_bdd:
         Example:
         ```python
         service_bdd = Service_bdd()
-        message = service_bdd.get_message('message_id')
+        messages = service_bdd.get_last_messages_groups(['1', '2'], 50)
+        for message in messages.get(1, []):
+            print(message)
         ```
         """
-        query = 'SELECT * FROM "Message" WHERE "id" = %s'
+        group_ids = list({str(group_id) for group_id in group_ids})
+        if not(group_ids) or limit <= 0:
+            return {}
+        columns, attributes = self.projection('Message', MESSAGE_COLUMNS)
+        query = sql.SQL(
+                'SELECT {} FROM ('
+                'SELECT *, ROW_NUMBER() OVER ('
+                'PARTITION BY "receiver_group_id" '
+                'ORDER BY "date_" DESC, "id" DESC) AS "rank" '
+                'FROM "Message" '
+                'WHERE "receiver_group_id" = ANY(%s::int[])'
+                ') AS "Message" '
+                'WHERE "rank" <= %s '
+                'ORDER BY "receiver_group_id", "date_", "id"'
+                ).format(columns)
         try:
-            message = self.fetch_query(query, [message_id])[0]
-        except IndexError:
-            return None
+            lines = self.fetch_query(query, [group_ids, limit])
         except Exception as e:
             raise DatabaseException(
-                    f'Could not get the message {message_id}: {e}'
+                    f'Could not get the last messages of the groups '
+                    f'{group_ids}: {e}'
                     )
-        return Message(*message[1:], id = message[0])
+        messages = {}
+        for line in lines:
+            message = self.row_to_model(Message, MESSAGE_COLUMNS, attributes, line)
+            messages.setdefault(message.receiver_group_id, []).append(message)
+        return messages
 
     def delete_message(self: Self, message_id: str):
         """ Deletes the message with the given id.
+        The summary of the group is updated by the "Message_delete_summary"
+        trigger, as for the messages deleted by a cascade.
         ---
         Parameters:
             self (Self): Current instance.
@@ -784,7 +2039,7 @@ class Service_bdd:
             raise DatabaseException(
                     f'Could not get the media {media_id}: {e}'
                     )
-        return Media(*media[1:], id = media[0])
+        return Media.from_row(media)
 
     def create_media(
             self: Self,
@@ -856,7 +2111,7 @@ class Service_bdd:
             raise DatabaseException(
                     f'Could not get the media {media_id}: {e}'
                     )
-        return Media(*line[1:], id = line[0])
+        return Media.from_row(line)
 
     def delete_media(self: Self, media_id: str):
         """ Deleted the given media from the database.
@@ -925,6 +2180,7 @@ class Service_bdd:
                      user.get_auth_id()]
                     )[0][0]
             user.set_id(user_id)
+            self.negative_cache.discard('user', user_id)
         except Exception as error:
             raise DatabaseException(
                     f'Could not create the user {user}: {str(error)}'
@@ -963,15 +2219,21 @@ class Service_bdd:
                     f'Could not delete the user {user_id}: {e}.'
                     )
 
-    def get_user(self: Self, user_id: str) -> User:
+    def get_user(
+            self: Self,
+            user_id: str,
+            fields: Optional[list[str]] = None
+            ) -> User:
         """ Returns the user with the given id.
         ---
         Parameters:
             self (Self): Current instance.
             user_id (str): Id of the user to return.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
-            (User): User with the given id.
+            (Optional[User]): User with the given id, None if no user was found
+            (misses are remembered for a few seconds).
         ---
         Raises:
             (DatabaseException): If the query fails.
@@ -990,16 +2252,73 @@ class Service_bdd:
         assert(my_user == service_bdd.get_user(user_id))
         ```
         """
-        query = 'SELECT * FROM "UserApp" WHERE "id" = %s'
+        if self.negative_cache.contains('user', user_id):
+            return None
+        columns, attributes = self.projection('UserApp', USER_COLUMNS, fields)
+        query = sql.SQL('SELECT {} FROM "UserApp" WHERE "id" = %s').format(
+                columns
+                )
         try:
             line = self.fetch_query(query, [user_id])[0]
         except IndexError:
+            self.negative_cache.add('user', user_id)
             return None
         except Exception as e:
             raise DatabaseException(
                     f'Could not get the user {user_id}: {e}'
                     )
-        return User(*line[1:], id = line[0])
+        return self.row_to_model(User, USER_COLUMNS, attributes, line)
+
+    def get_users(
+            self: Self,
+            user_ids: Iterable[str],
+            fields: Optional[list[str]] = None
+            ) -> dict[str, User]:
+        """ Returns the users with the given ids.
+        The users are fetched in a single query, ids recently found missing
+        are skipped and the new misses are remembered.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            user_ids (Iterable[str]): Ids of the users to return.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (dict[str, User]): Users found, indexed by id. Missing ids are
+            absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        users = service_bdd.get_users(['1', '2'])
+        ```
+        """
+        wanted = {
+                str(user_id) for user_id in user_ids
+                if not(self.negative_cache.contains('user', user_id))
+                }
+        if not(wanted):
+            return {}
+        columns, attributes = self.projection('UserApp', USER_COLUMNS, fields)
+        query = sql.SQL(
+                'SELECT {} FROM "UserApp" WHERE "id" = ANY(%s::int[])'
+                ).format(columns)
+        try:
+            lines = self.fetch_query(query, [list(wanted)])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the users {sorted(wanted)}: {e}'
+                    )
+        users = {
+                line[0]: self.row_to_model(User, USER_COLUMNS, attributes, line)
+                for line in lines
+                }
+        for user_id in wanted.difference(str(user_id) for user_id in users):
+            self.negative_cache.add('user', user_id)
+        return users
 
     def get_user_auth(self: Self, auth_id: str) -> User:
         """ Returns the user with the given id in the authentification database.
@@ -1138,11 +2457,15 @@ class Service_bdd:
                     f'Error coud not modify the user {user_id} to {user}: {e}.'
                     )
 
-    def get_all_users(self: Self) -> list[User]:
+    def get_all_users(
+            self: Self,
+            fields: Optional[list[str]] = None
+            ) -> list[User]:
         """ Returns all the users of the database.
         ---
         Parameters:
             self (Self): Current instance.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
             (list[User]): List of all the users of the database.
@@ -1156,20 +2479,58 @@ class Service_bdd:
         all_users = service_bdd.get_all_users()
         ```
         """
-        query = 'SELECT * FROM "UserApp"'
+        columns, attributes = self.projection('UserApp', USER_COLUMNS, fields)
+        query = sql.SQL('SELECT {} FROM "UserApp"').format(columns)
         try:
             lines = self.fetch_query(query)
         except Exception as e:
             raise DatabaseException(f'Could not get all the users: {e}.')
-        print(lines)
-        return [User(*line[1:], id = line[0]) for line in lines]
+        return [
+                self.row_to_model(User, USER_COLUMNS, attributes, line)
+                for line in lines
+                ]
+
+    def stream_all_users(
+            self: Self,
+            fields: Optional[list[str]] = None
+            ) -> Iterator[User]:
+        """ Yields all the users of the database from a server-side cursor.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            fields (Optional[list[str]]): Attributes to read, all if None.
+        ---
+        Returns:
+            (Iterator[User]): Users of the database.
+        ---
+        Raises:
+            (DatabaseException): If a field is unknown or the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for user in service_bdd.stream_all_users(['name']):
+            print(user)
+        ```
+        """
+        columns, attributes = self.projection('UserApp', USER_COLUMNS, fields)
+        query = sql.SQL('SELECT {} FROM "UserApp" ORDER BY "id"').format(columns)
+        return (
+                self.row_to_model(User, USER_COLUMNS, attributes, row)
+                for row in self.stream_query(query)
+                )
 
-    def get_users_in_group(self: Self, group_id: str) -> list[User]:
+    def get_users_in_group(
+            self: Self,
+            group_id: str,
+            fields: Optional[list[str]] = None
+            ) -> list[User]:
         """ Returns the users of a group.
         ---
         Parameters:
             self (Self): Current instance.
             group_id (str): Id of the group to get the users of.
+            fields (Optional[list[str]]): Attributes to read, all if None.
         ---
         Returns:
             (list[User]): List of the users of the given group.
@@ -1183,16 +2544,39 @@ class Service_bdd:
         users = service_bdd.get_users_in_group('group_id')
         ```
         """
-        query = ('SELECT "UserApp".* FROM "UserApp" '
-                 'JOIN "UserInGroup" ON "UserApp"."id" = "UserInGroup"."user_id" '
-                 'WHERE "UserInGroup"."group_id" = %s')
+        columns, attributes = self.projection('UserApp', USER_COLUMNS, fields)
+        return list(self.single_flight.do(
+                ('users_group', str(group_id), tuple(attributes)),
+                lambda: self._fetch_users_in_group(
+                    group_id,
+                    columns,
+                    attributes
+                    )
+                ))
+
+    def _fetch_users_in_group(
+            self: Self,
+            group_id: str,
+            columns: sql.Composable,
+            attributes: list[str]
+            ) -> list[User]:
+        """ Queries the users of a group, see get_users_in_group.
+        """
+        query = sql.SQL(
+                'SELECT {} FROM "UserApp" '
+                'JOIN "UserInGroup" ON "UserApp"."id" = "UserInGroup"."user_id" '
+                'WHERE "UserInGroup"."group_id" = %s'
+                ).format(columns)
         try:
             lines = self.fetch_query(query, [group_id])
         except Exception as e:
             raise DatabaseException(
                     f'Could not get all the users of group {group_id}: {e}.'
                     )
-        return [User(*line[1:], id = line[0]) for line in lines]
+        return [
+                self.row_to_model(User, USER_COLUMNS, attributes, line)
+                for line in lines
+                ]
 
     def init_user_iterator(self: Self) -> Iterator[User]:
         """ Returns an iterator over all the users.
@@ -1213,7 +2597,7 @@ class Service_bdd:
             print(user)
         ```
         """
-        return iter(self.get_all_users())
+        return self.stream_all_users()
 
     def get_next_user(
             self: Self,
@@ -1246,8 +2630,29 @@ class Service_bdd:
             self: Self,
             group_id: str,
             user_id: str,
-            key: str
+            key: Union[str, bytes, bytearray, memoryview]
             ):
+        """ Stores the public key of a user in a group.
+        The key is stored as binary, a string is encoded in utf-8 and a buffer
+        is sent to the database without being copied.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+            key (Union[str, bytes, bytearray, memoryview]): Key to store.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        service_bdd.store_public_key('3', '5', b'-----BEGIN KEY-----...')
+        ```
+        """
+        if isinstance(key, str):
+            key = key.encode('utf-8')
         query = ('INSERT INTO "PublicKey" (group_id, user_id, key) '
                  'VALUES (%s, %s, %s)')
         try:
@@ -1257,13 +2662,35 @@ class Service_bdd:
                     f'Could not store the key group {group_id} '
                     f'user {user_id}: {e}.'
                     )
+        self.negative_cache.discard('public_key', (group_id, user_id))
 
     def store_private_key(
             self: Self,
             group_id: str,
             user_id: str,
-            key: str
+            key: Union[str, bytes, bytearray, memoryview]
             ):
+        """ Stores the private key of a user in a group.
+        The key is stored as binary, a string is encoded in utf-8 and a buffer
+        is sent to the database without being copied.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+            key (Union[str, bytes, bytearray, memoryview]): Key to store.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        service_bdd.store_private_key('3', '5', b'-----BEGIN KEY-----...')
+        ```
+        """
+        if isinstance(key, str):
+            key = key.encode('utf-8')
         query = ('INSERT INTO "PrivateKey" (group_id, user_id, key) '
                  'VALUES (%s, %s, %s)')
         try:
@@ -1273,12 +2700,88 @@ class Service_bdd:
                     f'Could not store the key group {group_id} '
                     f'user {user_id}: {e}.'
                     )
+        self.negative_cache.discard('private_key', (group_id, user_id))
 
     def get_public_key(
             self: Self,
             group_id: str,
             user_id: str,
             ) -> str:
+        """ Returns the public key of a user in a group as text.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+        ---
+        Returns:
+            (str): Key decoded from utf-8.
+        ---
+        Raises:
+            (DatabaseException): If no key is stored, if it is not utf-8 text
+            or if the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        key = service_bdd.get_public_key('3', '5')
+        ```
+        """
+        if self.negative_cache.contains('public_key', (group_id, user_id)):
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
+        try:
+            query_result = self.fetch_query(
+                    'SELECT convert_from("key", \'UTF8\') FROM "PublicKey" '
+                    'WHERE "group_id" = %s '
+                    'AND "user_id" = %s ',
+                    [group_id, user_id]
+                    )
+            return query_result[0][0]
+        except IndexError:
+            self.negative_cache.add('public_key', (group_id, user_id))
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: {e}.'
+                    )
+
+    def get_public_key_buffer(
+            self: Self,
+            group_id: str,
+            user_id: str,
+            ) -> memoryview:
+        """ Returns the public key of a user in a group as stored.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+        ---
+        Returns:
+            (memoryview): Buffer of the key read from the database, not
+            copied.
+        ---
+        Raises:
+            (DatabaseException): If no key is stored or if the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        key = service_bdd.get_public_key_buffer('3', '5')
+        ```
+        """
+        if self.negative_cache.contains('public_key', (group_id, user_id)):
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
         try:
             query_result = self.fetch_query(
                     'SELECT key FROM "PublicKey" '
@@ -1287,17 +2790,183 @@ class Service_bdd:
                     [group_id, user_id]
                     )
             return query_result[0][0]
+        except IndexError:
+            self.negative_cache.add('public_key', (group_id, user_id))
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
         except Exception as e:
             raise DatabaseException(
                     f'Could not get the key group {group_id} '
                     f'user {user_id}: {e}.'
                     )
 
+    def get_public_keys_group(self: Self, group_id: str) -> dict[str, str]:
+        """ Returns the public keys of every member of a group.
+        The keys are read in a single query joining the members of the group
+        to their keys.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group to get the keys of.
+        ---
+        Returns:
+            (dict[str, str]): Public keys indexed by the id of their user.
+            Members without a key are absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        for user_id, key in service_bdd.get_public_keys_group('3').items():
+            print(user_id, key)
+        ```
+        """
+        query = ('SELECT "UserInGroup"."user_id", '
+                 'convert_from("PublicKey"."key", \'UTF8\') '
+                 'FROM "UserInGroup" '
+                 'JOIN "PublicKey" '
+                 'ON "PublicKey"."group_id" = "UserInGroup"."group_id"::text '
+                 'AND "PublicKey"."user_id" = "UserInGroup"."user_id"::text '
+                 'WHERE "UserInGroup"."group_id" = %s')
+        try:
+            lines = self.fetch_query(query, [group_id])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the keys of the group {group_id}: {e}.'
+                    )
+        return {line[0]: line[1] for line in lines}
+
+    def get_public_keys_groups(
+            self: Self,
+            group_ids: Iterable[str]
+            ) -> dict[str, dict[str, str]]:
+        """ Returns the public keys of the members of each of the given
+        groups.
+        The keys of every group are read in a single query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_ids (Iterable[str]): Ids of the groups to get the keys of.
+        ---
+        Returns:
+            (dict[str, dict[str, str]]): Public keys indexed by the id of their
+            group, then by the id of their user. Groups without keys are
+            absent.
+        ---
+        Raises:
+            (DatabaseException): If the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        keys = service_bdd.get_public_keys_groups(['1', '2'])
+        ```
+        """
+        group_ids = list({str(group_id) for group_id in group_ids})
+        if not(group_ids):
+            return {}
+        query = ('SELECT "UserInGroup"."group_id", "UserInGroup"."user_id", '
+                 'convert_from("PublicKey"."key", \'UTF8\') '
+                 'FROM "UserInGroup" '
+                 'JOIN "PublicKey" '
+                 'ON "PublicKey"."group_id" = "UserInGroup"."group_id"::text '
+                 'AND "PublicKey"."user_id" = "UserInGroup"."user_id"::text '
+                 'WHERE "UserInGroup"."group_id" = ANY(%s::int[])')
+        try:
+            lines = self.fetch_query(query, [group_ids])
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the keys of the groups {group_ids}: {e}.'
+                    )
+        keys = {}
+        for line in lines:
+            keys.setdefault(line[0], {})[line[1]] = line[2]
+        return keys
+
     def get_private_key(
             self: Self,
             group_id: str,
             user_id: str,
             ) -> str:
+        """ Returns the private key of a user in a group as text.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+        ---
+        Returns:
+            (str): Key decoded from utf-8.
+        ---
+        Raises:
+            (DatabaseException): If no key is stored, if it is not utf-8 text
+            or if the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        key = service_bdd.get_private_key('3', '5')
+        ```
+        """
+        if self.negative_cache.contains('private_key', (group_id, user_id)):
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
+        try:
+            query_result = self.fetch_query(
+                    'SELECT convert_from("key", \'UTF8\') FROM "PrivateKey" '
+                    'WHERE "group_id" = %s '
+                    'AND "user_id" = %s ',
+                    [group_id, user_id]
+                    )
+            return query_result[0][0]
+        except IndexError:
+            self.negative_cache.add('private_key', (group_id, user_id))
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
+        except Exception as e:
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: {e}.'
+                    )
+
+    def get_private_key_buffer(
+            self: Self,
+            group_id: str,
+            user_id: str,
+            ) -> memoryview:
+        """ Returns the private key of a user in a group as stored.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            group_id (str): Id of the group.
+            user_id (str): Id of the user.
+        ---
+        Returns:
+            (memoryview): Buffer of the key read from the database, not
+            copied.
+        ---
+        Raises:
+            (DatabaseException): If no key is stored or if the query fails.
+        ---
+        Example:
+        ```python
+        service_bdd = Service_bdd()
+        key = service_bdd.get_private_key_buffer('3', '5')
+        ```
+        """
+        if self.negative_cache.contains('private_key', (group_id, user_id)):
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
         try:
             query_result = self.fetch_query(
                     'SELECT key FROM "PrivateKey" '
@@ -1306,8 +2975,29 @@ class Service_bdd:
                     [group_id, user_id]
                     )
             return query_result[0][0]
+        except IndexError:
+            self.negative_cache.add('private_key', (group_id, user_id))
+            raise DatabaseException(
+                    f'Could not get the key group {group_id} '
+                    f'user {user_id}: no key stored.'
+                    )
         except Exception as e:
             raise DatabaseException(
                     f'Could not get the key group {group_id} '
                     f'user {user_id}: {e}.'
                     )
+
+
+if __name__ == '__main__':
+    # Re-encodes the stored messages after a change of CONTENT_CODEC or of
+    # the compression threshold, see Service_bdd.reencode_messages.
+    logging.basicConfig(level = logging.INFO)
+    service_bdd = Service_bdd()
+    count = service_bdd.reencode_messages(
+            int(os.getenv("REENCODE_BATCH_SIZE", '1000')),
+            float(os.getenv("REENCODE_PAUSE", '0'))
+            )
+    logging.info(
+            f'{count} messages re-encoded with '
+            f'{service_bdd.content_codec.codec or "no codec"}.'
+            )
@@ -0,0 +1,408 @@
+from __future__ import annotations
+from typing import Type, List, Optional
+import datetime
+import strawberry
+from strawberry.dataloader import DataLoader
+from strawberry.types import Info
+from shared.models.group import Group
+from shared.models.media import Media
+from shared.models.message import Message
+from shared.models.user import User
+
+class Graphql_loaders:
+    """ DataLoaders of a GraphQL request.
+    The lookups made while resolving a request are gathered by the loaders
+    into one Service_bdd call per kind of lookup and per tick of the event
+    loop, and each key is only loaded once for the whole request.
+    A new instance must be created for each request.
+    ---
+    Attributes:
+        service_bdd (Service_bdd): Service that access to the database.
+        user (DataLoader[str, Optional[User]]): Users by id.
+        group (DataLoader[str, Optional[Group]]): Groups by id.
+        groups_user (DataLoader[str, list[Group]]): Groups by member id.
+        members_group (DataLoader[str, list[str]]): Ids of the members by
+        group id.
+        last_messages_group (DataLoader[tuple[str, int], list[Message]]): Last
+        messages by group id and number of messages.
+        medias_message (DataLoader[str, list[Media]]): Medias by message id.
+        public_keys_group (DataLoader[str, dict[str, str]]): Public keys of
+        the members by group id.
+    ---
+    Methods:
+        __init__(Self, Service_bdd): Creates the loaders of a new request.
+        run(Self, Hashable, Callable[[], Any]) -> Any: Runs a blocking lookup
+          out of the event loop.
+        load_users(Self, list[str]) -> list[Optional[User]]: Batch function
+          of the user loader.
+        load_groups(Self, list[str]) -> list[Optional[Group]]: Batch function
+          of the group loader.
+        load_groups_users(Self, list[str]) -> list[list[Group]]: Batch
+          function of the groups_user loader.
+        load_members_groups(Self, list[str]) -> list[list[str]]: Batch
+          function of the members_group loader.
+        load_last_messages_groups(Self, list[tuple[str, int]]) ->
+          list[list[Message]]: Batch function of the last_messages_group
+          loader.
+        load_medias_messages(Self, list[str]) -> list[list[Media]]: Batch
+          function of the medias_message loader.
+        load_public_keys_groups(Self, list[str]) -> list[dict[str, str]]:
+          Batch function of the public_keys_group loader.
+    """
+
+    def __init__(self: Self, service_bdd: Service_bdd):
+        """ Creates the loaders of a new request.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            service_bdd (Service_bdd): Service that access to the database.
+        ---
+        Example:
+        ```python
+        loaders = Graphql_loaders(Service_bdd())
+        user = await loaders.user.load('3')
+        ```
+        """
+        self.service_bdd = service_bdd
+        self.user = DataLoader(load_fn = self.load_users)
+        self.group = DataLoader(load_fn = self.load_groups)
+        self.groups_user = DataLoader(load_fn = self.load_groups_users)
+        self.members_group = DataLoader(load_fn = self.load_members_groups)
+        self.last_messages_group = DataLoader(
+                load_fn = self.load_last_messages_groups
+                )
+        self.medias_message = DataLoader(load_fn = self.load_medias_messages)
+        self.public_keys_group = DataLoader(
+                load_fn = self.load_public_keys_groups
+                )
+
+    async def run(self: Self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """ Runs a blocking lookup of the service out of the event loop.
+        Identical lookups running at the same time are coalesced.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Identifies the lookup.
+            function (Callable[[], Any]): Lookup to run.
+        ---
+        Returns:
+            (Any): Value returned by the lookup.
+        ---
+        Raises:
+            (DatabaseException): If the lookup fails.
+        """
+        return await self.service_bdd.single_flight.do_async(key, function)
+
+    async def load_users(self: Self, keys: list[str]) -> list[Optional[User]]:
+        """ Reads the users with the given ids in one query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the users.
+        ---
+        Returns:
+            (list[Optional[User]]): User of each id, None if it is missing.
+        """
+        users = await self.run(
+                ('graphql_users', tuple(keys)),
+                lambda: self.service_bdd.get_users(keys)
+                )
+        users = {str(user_id): user for user_id, user in users.items()}
+        return [users.get(key) for key in keys]
+
+    async def load_groups(self: Self, keys: list[str]) -> list[Optional[Group]]:
+        """ Reads the groups with the given ids in one query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the groups.
+        ---
+        Returns:
+            (list[Optional[Group]]): Group of each id, None if it is missing.
+        """
+        groups = await self.run(
+                ('graphql_groups', tuple(keys)),
+                lambda: self.service_bdd.get_groups(keys)
+                )
+        groups = {str(group_id): group for group_id, group in groups.items()}
+        return [groups.get(key) for key in keys]
+
+    async def load_groups_users(self: Self, keys: list[str]) -> list[list[Group]]:
+        """ Reads the groups of the given users in one query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the users.
+        ---
+        Returns:
+            (list[list[Group]]): Groups of each user.
+        """
+        groups = await self.run(
+                ('graphql_groups_users', tuple(keys)),
+                lambda: self.service_bdd.get_groups_users(keys)
+                )
+        groups = {str(user_id): value for user_id, value in groups.items()}
+        return [groups.get(key, []) for key in keys]
+
+    async def load_members_groups(self: Self, keys: list[str]) -> list[list[str]]:
+        """ Reads the ids of the members of the given groups in one query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the groups.
+        ---
+        Returns:
+            (list[list[str]]): Ids of the members of each group.
+        """
+        members = await self.run(
+                ('graphql_members_groups', tuple(keys)),
+                lambda: self.service_bdd.get_member_ids_groups(keys)
+                )
+        members = {
+                str(group_id): [str(user_id) for user_id in user_ids]
+                for group_id, user_ids in members.items()
+                }
+        return [members.get(key, []) for key in keys]
+
+    async def load_last_messages_groups(
+            self: Self,
+            keys: list[tuple[str, int]]
+            ) -> list[list[Message]]:
+        """ Reads the last messages of the given groups, in one query for
+        each distinct number of messages asked.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[tuple[str, int]]): Ids of the groups and numbers of
+            messages to read.
+        ---
+        Returns:
+            (list[list[Message]]): Last messages of each group, oldest first.
+        """
+        group_ids_limit = {}
+        for group_id, limit in keys:
+            group_ids_limit.setdefault(limit, []).append(group_id)
+        messages = {}
+        for limit, group_ids in group_ids_limit.items():
+            messages_limit = await self.run(
+                    ('graphql_last_messages_groups', tuple(group_ids), limit),
+                    lambda: self.service_bdd.get_last_messages_groups(
+                        group_ids,
+                        limit
+                        )
+                    )
+            for group_id, value in messages_limit.items():
+                messages[(str(group_id), limit)] = value
+        return [messages.get(key, []) for key in keys]
+
+    async def load_medias_messages(self: Self, keys: list[str]) -> list[list[Media]]:
+        """ Reads the medias of the given messages in one query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the messages.
+        ---
+        Returns:
+            (list[list[Media]]): Medias of each message.
+        """
+        medias = await self.run(
+                ('graphql_medias_messages', tuple(keys)),
+                lambda: self.service_bdd.get_medias_messages(keys)
+                )
+        medias = {str(message_id): value for message_id, value in medias.items()}
+        return [medias.get(key, []) for key in keys]
+
+    async def load_public_keys_groups(
+            self: Self,
+            keys: list[str]
+            ) -> list[dict[str, str]]:
+        """ Reads the public keys of the members of the given groups in one
+        query.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            keys (list[str]): Ids of the groups.
+        ---
+        Returns:
+            (list[dict[str, str]]): Public keys of each group indexed by the
+            id of their user.
+        """
+        public_keys = await self.run(
+                ('graphql_public_keys_groups', tuple(keys)),
+                lambda: self.service_bdd.get_public_keys_groups(keys)
+                )
+        public_keys = {
+                str(group_id): value for group_id, value in public_keys.items()
+                }
+        return [public_keys.get(key, {}) for key in keys]
+
+
+# Function to get the loaders of the current request
+def loaders(info: Info) -> Graphql_loaders:
+    return info.context["loaders"]
+
+
+@strawberry.type
+class UserType:
+    id: strawberry.ID
+    name: str
+    first_name: Optional[str]
+    email: str
+    join_date: Optional[datetime.datetime]
+
+    @staticmethod
+    def from_model(user: User) -> UserType:
+        return UserType(
+                id = strawberry.ID(str(user.id)),
+                name = user.name,
+                first_name = user.first_name,
+                email = user.email,
+                join_date = user.join_date,
+                )
+
+    @strawberry.field
+    async def groups(self: Self, info: Info) -> List[GroupType]:
+        groups = await loaders(info).groups_user.load(str(self.id))
+        return [GroupType.from_model(group) for group in groups]
+
+
+@strawberry.type
+class MediaType:
+    id: strawberry.ID
+    name: Optional[str]
+    type: str
+    link: str
+    message_id: strawberry.ID
+
+    @staticmethod
+    def from_model(media: Media) -> MediaType:
+        return MediaType(
+                id = strawberry.ID(str(media.id)),
+                name = media.name,
+                type = media.type_,
+                link = media.link,
+                message_id = strawberry.ID(str(media.message_id)),
+                )
+
+
+@strawberry.type
+class MessageType:
+    id: strawberry.ID
+    content: str
+    sender_id: strawberry.ID
+    receiver_group_id: strawberry.ID
+    date: int
+
+    @staticmethod
+    def from_model(message: Message) -> MessageType:
+        return MessageType(
+                id = strawberry.ID(str(message.id)),
+                content = message.content,
+                sender_id = strawberry.ID(str(message.sender_id)),
+                receiver_group_id = strawberry.ID(str(message.receiver_group_id)),
+                date = message.date,
+                )
+
+    @strawberry.field
+    async def sender(self: Self, info: Info) -> Optional[UserType]:
+        user = await loaders(info).user.load(str(self.sender_id))
+        return None if user is None else UserType.from_model(user)
+
+    @strawberry.field
+    async def group(self: Self, info: Info) -> Optional[GroupType]:
+        group = await loaders(info).group.load(str(self.receiver_group_id))
+        return None if group is None else GroupType.from_model(group)
+
+    @strawberry.field
+    async def medias(self: Self, info: Info) -> List[MediaType]:
+        medias = await loaders(info).medias_message.load(str(self.id))
+        return [MediaType.from_model(media) for media in medias]
+
+
+@strawberry.type
+class PublicKeyType:
+    user_id: strawberry.ID
+    key: str
+
+    @strawberry.field
+    async def user(self: Self, info: Info) -> Optional[UserType]:
+        user = await loaders(info).user.load(str(self.user_id))
+        return None if user is None else UserType.from_model(user)
+
+
+@strawberry.type
+class GroupType:
+    id: strawberry.ID
+    name: str
+
+    @staticmethod
+    def from_model(group: Group) -> GroupType:
+        return GroupType(id = strawberry.ID(str(group.id)), name = group.name)
+
+    @strawberry.field
+    async def members(self: Self, info: Info) -> List[UserType]:
+        member_ids = await loaders(info).members_group.load(str(self.id))
+        users = await loaders(info).user.load_many(member_ids)
+        return [UserType.from_model(user) for user in users if user is not None]
+
+    @strawberry.field
+    async def messages(self: Self, info: Info, last: int = 50) -> List[MessageType]:
+        messages = await loaders(info).last_messages_group.load(
+                (str(self.id), last)
+                )
+        return [MessageType.from_model(message) for message in messages]
+
+    @strawberry.field
+    async def public_keys(self: Self, info: Info) -> List[PublicKeyType]:
+        public_keys = await loaders(info).public_keys_group.load(str(self.id))
+        return [
+                PublicKeyType(user_id = strawberry.ID(str(user_id)), key = key)
+                for user_id, key in public_keys.items()
+                ]
+
+
+@strawberry.type
+class Query:
+
+    @strawberry.field
+    async def user(self: Self, info: Info, id: strawberry.ID) -> Optional[UserType]:
+        user = await loaders(info).user.load(str(id))
+        return None if user is None else UserType.from_model(user)
+
+    @strawberry.field
+    async def users(
+            self: Self,
+            info: Info,
+            ids: List[strawberry.ID]
+            ) -> List[UserType]:
+        users = await loaders(info).user.load_many([str(id) for id in ids])
+        return [UserType.from_model(user) for user in users if user is not None]
+
+    @strawberry.field
+    async def group(self: Self, info: Info, id: strawberry.ID) -> Optional[GroupType]:
+        group = await loaders(info).group.load(str(id))
+        return None if group is None else GroupType.from_model(group)
+
+    @strawberry.field
+    async def groups(
+            self: Self,
+            info: Info,
+            ids: List[strawberry.ID]
+            ) -> List[GroupType]:
+        groups = await loaders(info).group.load_many([str(id) for id in ids])
+        return [
+                GroupType.from_model(group) for group in groups
+                if group is not None
+                ]
+
+    @strawberry.field
+    async def groups_of_user(
+            self: Self,
+            info: Info,
+            user_id: strawberry.ID
+            ) -> List[GroupType]:
+        groups = await loaders(info).groups_user.load(str(user_id))
+        return [GroupType.from_model(group) for group in groups]
+
+
+schema = strawberry.Schema(query = Query)
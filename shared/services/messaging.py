@@ -1,30 +1,536 @@
+from __future__ import annotations
+from typing import Type
 import smtplib
-import base64
+import functools
+import heapq
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from shared.exceptions.overloaded_exception import OverloadedException
 
-def send_email(email, totp_code):
-    smtp_server = "smtp.laposte.net"
-    smtp_port = 587
-    sender_email = "arthur2klein@laposte.net"
-    sender_password = base64.b64decode("R3NqbiZHYzJwJjJjcWRkbHA=").decode('utf-8')
+SENDER_EMAIL = "arthur2klein@laposte.net"
+
+def connect_smtp(
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        timeout: float = 10.0
+        ) -> smtplib.SMTP:
+    """ Opens a new SMTP session, secured with STARTTLS and logged in if
+    asked.
+    ---
+    Parameters:
+        host (str): Host of the SMTP server.
+        port (int): Port of the SMTP server.
+        user (Optional[str]): User to log in as, None to send anonymously.
+        password (Optional[str]): Password of the user.
+        starttls (bool): Whether to secure the session with STARTTLS.
+        timeout (float): Seconds to wait for the server.
+    ---
+    Returns:
+        (smtplib.SMTP): Open session.
+    ---
+    Raises:
+        (smtplib.SMTPException, OSError): If the server can not be reached or
+        refuses the session.
+    ---
+    Example:
+    ```python
+    session = connect_smtp('localhost', 25, starttls = False)
+    session.quit()
+    ```
+    """
+    session = smtplib.SMTP(host, port, timeout = timeout)
+    try:
+        if starttls:
+            session.starttls()
+        if user:
+            session.login(user, password)
+    except BaseException:
+        session.close()
+        raise
+    return session
 
+def build_totp_email(sender: str, email: str, totp_code: str) -> MIMEMultipart:
+    """ Builds the email giving a double authentication code.
+    ---
+    Parameters:
+        sender (str): Address the email is sent from.
+        email (str): Address of the user.
+        totp_code (str): Code to send.
+    ---
+    Returns:
+        (MIMEMultipart): Email to send.
+    ---
+    Example:
+    ```python
+    message = build_totp_email(SENDER_EMAIL, 'user@example.com', '123456')
+    ```
+    """
     # Create message container
     msg = MIMEMultipart()
-    msg['From'] = sender_email
+    msg['From'] = sender
     msg['To'] = email
     msg['Subject'] = "Double Authentification Code"
 
     # Add TOTP code to message body
     body = f"The code is: {totp_code}"
     msg.attach(MIMEText(body, 'plain'))
-    print("Message created")
-
-    # Send email
-    with smtplib.SMTP(smtp_server, smtp_port) as server:
-        print("Starting server")
-        server.starttls()
-        print("Logging")
-        server.login(sender_email, sender_password)
-        print("Sending the message")
-        server.send_message(msg)
+    return msg
+
+def send_email(email, totp_code):
+    """ Sends a double authentication code right away, in a new SMTP session
+    configured by the environment (see email_queue_from_env). Email_queue
+    should be preferred, it does not block the caller.
+    """
+    connect = smtp_connect_from_env()
+    with connect() as server:
+        server.send_message(build_totp_email(
+            os.getenv("SMTP_SENDER", SENDER_EMAIL),
+            email,
+            totp_code
+            ))
+
+class Email_queue:
+    """ Sends emails from a background thread.
+    The thread keeps its SMTP session open between emails, sends the waiting
+    emails in batches over that session and closes it after idle_timeout
+    seconds without email. An email that fails for a temporary reason (lost
+    connection, 4xx answer) is sent again later, waiting backoff seconds,
+    then twice as long at each new failure, up to max_backoff. An email
+    refused for good (5xx answer), malformed or failing max_attempts times
+    is dropped and logged.
+    ---
+    Attributes:
+        connect (Callable[[], smtplib.SMTP]): Opens a new SMTP session.
+        sender (str): Address the emails are sent from.
+        emails (queue.Queue): Emails waiting to be sent.
+        batch_size (int): Maximum number of emails sent in a row.
+        max_attempts (int): Number of tries before an email is dropped.
+        backoff (float): Seconds before the first new try of an email.
+        max_backoff (float): Maximum number of seconds between two tries.
+        idle_timeout (float): Seconds without email before the session is
+        closed.
+        retries (list[tuple[float, int, Message, int]]): Heap of the emails to
+        try again, with the time to try at and the number of tries so far,
+        used by the thread only.
+        counter (Iterator[int]): Orders the new tries due at the same time.
+        session (Optional[smtplib.SMTP]): Current SMTP session of the thread.
+        thread (Optional[threading.Thread]): Thread sending the emails,
+        started by the first email.
+        lock (threading.Lock): Lock protecting the start of the thread.
+        sent (int): Number of emails sent.
+        dropped (int): Number of emails dropped.
+    ---
+    Methods:
+        __init__(Self,Callable[[],smtplib.SMTP],str,int,int,int,float,float,
+          float): Creates a new queue.
+        enqueue(Self,Message): Adds an email to send.
+        enqueue_totp(Self,str,str): Adds an email giving a double
+          authentication code.
+        start(Self): Starts the thread if it is not running.
+        stop(Self,Optional[float]): Sends the waiting emails then stops the
+          thread.
+        join(Self): Waits until every email was sent or dropped.
+        run(Self): Loop of the thread.
+        next_batch(Self) -> Optional[list[tuple[Message, int]]]: Waits for
+          the next emails to send.
+        send_batch(Self,list[tuple[Message, int]]): Sends emails over the
+          session.
+        fail(Self,Message,int,Exception,bool): Schedules a new try of an email
+          or drops it.
+        ensure_session(Self) -> smtplib.SMTP: Returns an open session.
+        close_session(Self): Closes the session without failing.
+    """
+
+    # Put in the queue to stop the thread
+    STOP = object()
+
+    def __init__(
+            self: Self,
+            connect: Callable[[], smtplib.SMTP],
+            sender: str = SENDER_EMAIL,
+            max_size: int = 1000,
+            batch_size: int = 20,
+            max_attempts: int = 5,
+            backoff: float = 1.0,
+            max_backoff: float = 60.0,
+            idle_timeout: float = 60.0
+            ):
+        """ Creates a new queue, the thread is started by the first email.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            connect (Callable[[], smtplib.SMTP]): Opens a new SMTP session.
+            sender (str): Address the emails are sent from.
+            max_size (int): Maximum number of emails waiting.
+            batch_size (int): Maximum number of emails sent in a row.
+            max_attempts (int): Number of tries before an email is dropped.
+            backoff (float): Seconds before the first new try of an email.
+            max_backoff (float): Maximum number of seconds between two tries.
+            idle_timeout (float): Seconds without email before the session is
+            closed.
+        ---
+        Example:
+        ```python
+        email_queue = Email_queue(
+                functools.partial(connect_smtp, 'localhost', 25),
+                'noreply@example.com'
+                )
+        ```
+        """
+        self.connect = connect
+        self.sender = sender
+        self.emails = queue.Queue(max_size)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.retries = []
+        self.counter = itertools.count()
+        self.session = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+
+    def enqueue(self: Self, message: Message):
+        """ Adds an email to send and returns immediately.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            message (email.message.Message): Email to send, with its From and
+            To headers.
+        ---
+        Raises:
+            (OverloadedException): If max_size emails are already waiting.
+        ---
+        Example:
+        ```python
+        email_queue.enqueue(build_totp_email(
+                email_queue.sender,
+                'user@example.com',
+                '123456'
+                ))
+        ```
+        """
+        self.start()
+        try:
+            self.emails.put_nowait((message, 0))
+        except queue.Full:
+            raise OverloadedException(
+                    f'Too many emails waiting ({self.emails.maxsize}), '
+                    f'could not send the email to {message["To"]}.'
+                    )
+
+    def enqueue_totp(self: Self, email: str, totp_code: str):
+        """ Adds an email giving a double authentication code to a user.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            email (str): Address of the user.
+            totp_code (str): Code to send.
+        ---
+        Raises:
+            (OverloadedException): If max_size emails are already waiting.
+        ---
+        Example:
+        ```python
+        email_queue.enqueue_totp('user@example.com', '123456')
+        ```
+        """
+        self.enqueue(build_totp_email(self.sender, email, totp_code))
+
+    def start(self: Self):
+        """ Starts the thread if it is not running.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        email_queue.start()
+        ```
+        """
+        with self.lock:
+            if self.thread is None or not(self.thread.is_alive()):
+                self.thread = threading.Thread(
+                        target = self.run,
+                        name = 'email_queue',
+                        daemon = True
+                        )
+                self.thread.start()
+
+    def stop(self: Self, timeout: Optional[float] = None):
+        """ Sends the emails already waiting then stops the thread, emails
+        waiting for a new try are dropped.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            timeout (Optional[float]): Maximum number of seconds to wait for
+            the thread, None to wait until it stops.
+        ---
+        Example:
+        ```python
+        email_queue.stop(timeout = 5)
+        ```
+        """
+        with self.lock:
+            thread = self.thread
+        if thread is None or not(thread.is_alive()):
+            return
+        self.emails.put((self.STOP, 0))
+        thread.join(timeout)
+
+    def join(self: Self):
+        """ Waits until every email added was sent or dropped.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        email_queue.enqueue_totp('user@example.com', '123456')
+        email_queue.join()
+        ```
+        """
+        self.emails.join()
+
+    def run(self: Self):
+        """ Loop of the thread, sends the emails until stop is called.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        """
+        try:
+            while True:
+                batch = self.next_batch()
+                if batch is None:
+                    break
+                if batch:
+                    self.send_batch(batch)
+        finally:
+            self.close_session()
+            while self.retries:
+                _, _, message, _ = heapq.heappop(self.retries)
+                self.dropped += 1
+                self.emails.task_done()
+                logging.error(f'Email to {message["To"]} dropped at stop.')
+
+    def next_batch(self: Self) -> Optional[list[tuple[Message, int]]]:
+        """ Waits for the next emails to send: the new emails and the emails
+        whose new try is due, at most batch_size of them. The session is
+        closed if no email comes within idle_timeout seconds.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (Optional[list[tuple[Message, int]]]): Emails with their number of
+            tries so far, possibly none, None if the thread must stop.
+        """
+        now = time.monotonic()
+        if self.retries:
+            timeout = max(self.retries[0][0] - now, 0)
+        else:
+            timeout = self.idle_timeout
+        batch = []
+        try:
+            batch.append(self.emails.get(timeout = timeout))
+        except queue.Empty:
+            if not(self.retries):
+                self.close_session()
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.emails.get_nowait())
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        while (self.retries and self.retries[0][0] <= now
+               and len(batch) < self.batch_size):
+            _, _, message, attempts = heapq.heappop(self.retries)
+            batch.append((message, attempts))
+        if any(message is self.STOP for message, _ in batch):
+            for message, attempts in batch:
+                if message is self.STOP:
+                    self.emails.task_done()
+                else:
+                    # Sent before stopping
+                    self.send_batch([(message, attempts)])
+            return None
+        return batch
+
+    def send_batch(self: Self, batch: list[tuple[Message, int]]):
+        """ Sends emails over the session, opening a new one if needed.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            batch (list[tuple[Message, int]]): Emails with their number of
+            tries so far.
+        """
+        try:
+            session = self.ensure_session()
+        except Exception as e:
+            for message, attempts in batch:
+                self.fail(message, attempts, e, True)
+            return
+        for index, (message, attempts) in enumerate(batch):
+            try:
+                session.send_message(message)
+            except (smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPSenderRefused,
+                    smtplib.SMTPDataError) as e:
+                code = getattr(e, 'smtp_code', None)
+                if code is None:
+                    codes = [code for code, _ in e.recipients.values()]
+                    code = min(codes, default = 500)
+                self.fail(message, attempts, e, code < 500)
+                continue
+            except (smtplib.SMTPException, OSError) as e:
+                # The session is lost, the whole rest of the batch is retried
+                self.close_session()
+                for message, attempts in batch[index:]:
+                    self.fail(message, attempts, e, True)
+                return
+            except Exception as e:
+                # Malformed email, sending it again would fail the same way
+                self.fail(message, attempts, e, False)
+                continue
+            self.sent += 1
+            self.emails.task_done()
+
+    def fail(
+            self: Self,
+            message: Message,
+            attempts: int,
+            error: Exception,
+            temporary: bool
+            ):
+        """ Schedules a new try of an email that could not be sent, or drops
+        it if the error is permanent or it was tried max_attempts times.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            message (Message): Email that could not be sent.
+            attempts (int): Number of tries before this one.
+            error (Exception): Error of the try.
+            temporary (bool): Whether a new try may succeed.
+        """
+        attempts += 1
+        if temporary and attempts < self.max_attempts:
+            delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            heapq.heappush(
+                    self.retries,
+                    (time.monotonic() + delay, next(self.counter), message,
+                     attempts)
+                    )
+            logging.warning(
+                    f'Could not send the email to {message["To"]} '
+                    f'(try {attempts}), next try in {delay} seconds: {error}'
+                    )
+            return
+        self.dropped += 1
+        self.emails.task_done()
+        logging.error(
+                f'Email to {message["To"]} dropped after {attempts} tries: '
+                f'{error}'
+                )
+
+    def ensure_session(self: Self) -> smtplib.SMTP:
+        """ Returns the current session if the server still answers a NOOP, a
+        new one otherwise. It is called once per batch.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (smtplib.SMTP): Open session.
+        ---
+        Raises:
+            (smtplib.SMTPException, OSError): If no session can be opened.
+        """
+        if self.session is not None:
+            try:
+                if self.session.noop()[0] == 250:
+                    return self.session
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close_session()
+        self.session = self.connect()
+        return self.session
+
+    def close_session(self: Self):
+        """ Closes the current session without failing.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        """
+        session, self.session = self.session, None
+        if session is None:
+            return
+        try:
+            session.quit()
+        except (smtplib.SMTPException, OSError):
+            session.close()
+
+def smtp_connect_from_env() -> Callable[[], smtplib.SMTP]:
+    """ Returns a function opening SMTP sessions to the server configured by
+    SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_STARTTLS ('1' or
+    '0') and SMTP_TIMEOUT.
+    SMTP_PASSWORD is required by servers that need a login, without it the
+    sessions are not logged in.
+    ---
+    Returns:
+        (Callable[[], smtplib.SMTP]): Opens a new session.
+    ---
+    Example:
+    ```python
+    session = smtp_connect_from_env()()
+    ```
+    """
+    password = os.getenv("SMTP_PASSWORD")
+    if password is None:
+        logging.warning('SMTP_PASSWORD is not set, the emails are sent '
+                        'without logging in.')
+    return functools.partial(
+            connect_smtp,
+            os.getenv("SMTP_HOST", "smtp.laposte.net"),
+            int(os.getenv("SMTP_PORT", '587')),
+            os.getenv("SMTP_USER", SENDER_EMAIL) if password else None,
+            password,
+            os.getenv("SMTP_STARTTLS", '1') == '1',
+            float(os.getenv("SMTP_TIMEOUT", '10'))
+            )
+
+def email_queue_from_env() -> Email_queue:
+    """ Returns the queue configured by the environment: the server as in
+    smtp_connect_from_env, SMTP_SENDER for the sender, EMAIL_QUEUE_SIZE,
+    EMAIL_BATCH_SIZE, EMAIL_MAX_ATTEMPTS, EMAIL_BACKOFF, EMAIL_MAX_BACKOFF
+    and SMTP_IDLE_TIMEOUT for the queue.
+    ---
+    Returns:
+        (Email_queue): Configured queue, its thread is not started yet.
+    ---
+    Example:
+    ```python
+    email_queue = email_queue_from_env()
+    ```
+    """
+    return Email_queue(
+            smtp_connect_from_env(),
+            os.getenv("SMTP_SENDER", SENDER_EMAIL),
+            int(os.getenv("EMAIL_QUEUE_SIZE", '1000')),
+            int(os.getenv("EMAIL_BATCH_SIZE", '20')),
+            int(os.getenv("EMAIL_MAX_ATTEMPTS", '5')),
+            float(os.getenv("EMAIL_BACKOFF", '1')),
+            float(os.getenv("EMAIL_MAX_BACKOFF", '60')),
+            float(os.getenv("SMTP_IDLE_TIMEOUT", '60'))
+            )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from typing import Type
+from shared.services.cache import Cache, Lru_cache
+
+class Negative_cache:
+    """ Remembers for a short time the lookups that did not find any row.
+    ---
+    Attributes:
+        ttl (float): Number of seconds a miss is remembered.
+        cache (Cache): Storage of the misses, shared between the workers when
+        it is a Shared_cache.
+    ---
+    Methods:
+        __init__(Self,float,Optional[Cache]): Creates a new negative cache.
+        contains(Self,str,Any) -> bool: Checks if a miss is remembered for the
+          given key.
+        add(Self,str,Any): Remembers a miss for the given key.
+        discard(Self,str,Any): Forgets the miss for the given key.
+        clear(Self): Forgets every miss.
+    """
+
+    def __init__(self: Self, ttl: float = 5.0, cache: Optional[Cache] = None):
+        """ Creates a new negative cache.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            ttl (float): Number of seconds a miss is remembered.
+            cache (Optional[Cache]): Storage of the misses, a private
+            Lru_cache if None.
+        ---
+        Example:
+        ```python
+        negative_cache = Negative_cache(ttl = 5.0)
+        ```
+        """
+        self.ttl = ttl
+        self.cache = Lru_cache() if cache is None else cache
+
+    @staticmethod
+    def _entry_key(kind: str, key: Any) -> tuple[str, Any]:
+        """ Returns the key used to store a miss.
+        Ids are compared as strings since they come both from the routes
+        (str) and from the database (int).
+        ---
+        Parameters:
+            kind (str): Type of the entity that was looked up.
+            key (Any): Key of the lookup, a tuple for composite keys.
+        ---
+        Returns:
+            (tuple[str, Any]): Normalized key.
+        """
+        if isinstance(key, tuple):
+            return (kind, tuple(str(part) for part in key))
+        return (kind, str(key))
+
+    def contains(self: Self, kind: str, key: Any) -> bool:
+        """ Checks if a miss is remembered for the given key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            kind (str): Type of the entity that is looked up.
+            key (Any): Key of the lookup.
+        ---
+        Returns:
+            (bool): True iff a lookup for this key recently found nothing.
+        ---
+        Example:
+        ```python
+        negative_cache = Negative_cache()
+        negative_cache.add('user', '5')
+        assert(negative_cache.contains('user', 5))
+        ```
+        """
+        return self.cache.get(self._entry_key(kind, key), False)
+
+    def add(self: Self, kind: str, key: Any):
+        """ Remembers a miss for the given key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            kind (str): Type of the entity that was looked up.
+            key (Any): Key of the lookup.
+        ---
+        Example:
+        ```python
+        negative_cache = Negative_cache()
+        negative_cache.add('public_key', ('3', '5'))
+        ```
+        """
+        if self.ttl <= 0:
+            return
+        self.cache.set(self._entry_key(kind, key), True, self.ttl)
+
+    def discard(self: Self, kind: str, key: Any):
+        """ Forgets the miss for the given key, to call once the row exists.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            kind (str): Type of the entity that was created.
+            key (Any): Key of the created entity.
+        ---
+        Example:
+        ```python
+        negative_cache = Negative_cache()
+        negative_cache.add('group', '4')
+        negative_cache.discard('group', 4)
+        assert(not(negative_cache.contains('group', '4')))
+        ```
+        """
+        self.cache.delete(self._entry_key(kind, key))
+
+    def clear(self: Self):
+        """ Forgets every miss.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        negative_cache = Negative_cache()
+        negative_cache.clear()
+        ```
+        """
+        self.cache.clear()
@@ -0,0 +1,242 @@
+from __future__ import annotations
+from typing import Type
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from shared.exceptions.overloaded_exception import OverloadedException
+
+def hash_password(password: str) -> bytes:
+    """ Hashes a password with bcrypt and a new salt, run by the workers of
+    Password_hasher.
+    ---
+    Parameters:
+        password (str): Password to hash.
+    ---
+    Returns:
+        (bytes): Hash of the password.
+    ---
+    Example:
+    ```python
+    hashed_password = hash_password('my_password')
+    ```
+    """
+    # Only the worker processes need bcrypt
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+
+def check_password(password: str, hashed_password: bytes) -> bool:
+    """ Checks a password against a bcrypt hash, run by the workers of
+    Password_hasher.
+    ---
+    Parameters:
+        password (str): Password to check.
+        hashed_password (bytes): Hash made by hash_password.
+    ---
+    Returns:
+        (bool): True iff the password matches the hash.
+    ---
+    Example:
+    ```python
+    assert(check_password('my_password', hash_password('my_password')))
+    ```
+    """
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+class Password_hasher:
+    """ Hashes and checks passwords in a dedicated pool of processes, so that
+    bcrypt neither blocks the event loop nor takes the threads of the
+    requests.
+    At most workers hashes run at a time and at most max_pending are running
+    or waiting, the calls beyond are refused instead of queued.
+    ---
+    Attributes:
+        workers (int): Number of worker processes.
+        max_pending (int): Maximum number of calls running or waiting.
+        pending (int): Number of calls running or waiting.
+        lock (threading.Lock): Lock protecting pending and executor.
+        executor (Optional[ProcessPoolExecutor]): Pool of worker processes,
+        started on the first call.
+    ---
+    Methods:
+        __init__(Self,int,int): Creates a new hasher.
+        hash(Self,str) -> bytes: Hashes a password in a worker.
+        check(Self,str,bytes) -> bool: Checks a password in a worker.
+        run(Self,Callable[...,Any],Any...) -> Any: Runs a function in a worker
+          unless too many calls are pending.
+        get_executor(Self) -> ProcessPoolExecutor: Returns the pool of worker
+          processes, starting it if needed.
+        shutdown(Self): Stops the worker processes.
+    """
+
+    def __init__(self: Self, workers: int = 2, max_pending: int = 32):
+        """ Creates a new hasher, no process is started before the first
+        call.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            workers (int): Number of worker processes.
+            max_pending (int): Maximum number of calls running or waiting.
+        ---
+        Example:
+        ```python
+        password_hasher = Password_hasher(workers = 2, max_pending = 16)
+        ```
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = None
+
+    async def hash(self: Self, password: str) -> bytes:
+        """ Hashes a password with bcrypt in a worker.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            password (str): Password to hash.
+        ---
+        Returns:
+            (bytes): Hash of the password.
+        ---
+        Raises:
+            (OverloadedException): If max_pending calls are already pending.
+        ---
+        Example:
+        ```python
+        hashed_password = await password_hasher.hash('my_password')
+        ```
+        """
+        return await self.run(hash_password, password)
+
+    async def check(self: Self, password: str, hashed_password: bytes) -> bool:
+        """ Checks a password against a bcrypt hash in a worker.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            password (str): Password to check.
+            hashed_password (bytes): Hash of the expected password.
+        ---
+        Returns:
+            (bool): True iff the password matches the hash.
+        ---
+        Raises:
+            (OverloadedException): If max_pending calls are already pending.
+        ---
+        Example:
+        ```python
+        assert(await password_hasher.check('my_password', hashed_password))
+        ```
+        """
+        return await self.run(check_password, password, hashed_password)
+
+    async def run(self: Self, function: Callable[..., Any], *args: Any) -> Any:
+        """ Runs a function in a worker unless max_pending calls are already
+        running or waiting.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            function (Callable[..., Any]): Function defined at the top level of
+            a module, so that it can be sent to the workers.
+            args (Any): Arguments of the function.
+        ---
+        Returns:
+            (Any): Value returned by the function.
+        ---
+        Raises:
+            (OverloadedException): If max_pending calls are already pending.
+            (Exception): Exception raised by the function.
+        ---
+        Example:
+        ```python
+        hashed_password = await password_hasher.run(
+                hash_password,
+                'my_password'
+                )
+        ```
+        """
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise OverloadedException(
+                        f'Too many password hashes in progress '
+                        f'({self.pending}), try again later.'
+                        )
+            self.pending += 1
+        try:
+            executor = self.get_executor()
+            return await asyncio.wrap_future(executor.submit(function, *args))
+        except BrokenProcessPool:
+            # A worker died, the next call starts a new pool
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            raise
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def get_executor(self: Self) -> ProcessPoolExecutor:
+        """ Returns the pool of worker processes, starting it if needed.
+        The workers are spawned rather than forked, the threads of the server
+        are not copied into them.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Returns:
+            (ProcessPoolExecutor): Pool of worker processes.
+        ---
+        Example:
+        ```python
+        future = password_hasher.get_executor().submit(hash_password, 'pwd')
+        ```
+        """
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                        max_workers = self.workers,
+                        mp_context = multiprocessing.get_context('spawn')
+                        )
+            return self.executor
+
+    def shutdown(self: Self):
+        """ Stops the worker processes, a later call starts new ones.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        password_hasher.shutdown()
+        ```
+        """
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+def password_hasher_from_env() -> Password_hasher:
+    """ Returns the hasher configured by the environment.
+    PASSWORD_HASH_WORKERS is the number of worker processes (half of the
+    processors by default, at least one) and PASSWORD_HASH_QUEUE the maximum
+    number of hashes running or waiting (8 per worker by default).
+    ---
+    Returns:
+        (Password_hasher): Configured hasher.
+    ---
+    Example:
+    ```python
+    password_hasher = password_hasher_from_env()
+    ```
+    """
+    workers = int(os.getenv(
+        'PASSWORD_HASH_WORKERS',
+        str(max((os.cpu_count() or 2) // 2, 1))
+        ))
+    return Password_hasher(
+            workers,
+            int(os.getenv('PASSWORD_HASH_QUEUE', str(8 * workers)))
+            )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from typing import Type
+import json
+import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def default(value: Any) -> Any:
+    """ Converts the values the json encoders do not know, the models are
+    converted with their to_dict method and the dates (like the join date of
+    the users) to ISO 8601 strings, as orjson does.
+    ---
+    Parameters:
+        value (Any): Value to convert.
+    ---
+    Returns:
+        (Any): Value that can be encoded in json.
+    ---
+    Raises:
+        (TypeError): If the value can not be converted.
+    ---
+    Example:
+    ```python
+    message = Message('Hello world!', '1', '2', 1706873888)
+    assert(default(message) == message.to_dict())
+    ```
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f'Object of type {type(value).__name__} is not json '
+                        f'serializable')
+    return to_dict()
+
+def dumps(value: Any) -> bytes:
+    """ Encodes a value to json bytes.
+    orjson is used when it is installed, the standard library otherwise.
+    Models can be given directly, keys that are not strings (like the ids
+    read from the database) are converted to strings.
+    ---
+    Parameters:
+        value (Any): Value to encode.
+    ---
+    Returns:
+        (bytes): Compact json encoded in utf-8.
+    ---
+    Raises:
+        (TypeError): If a value can not be encoded.
+    ---
+    Example:
+    ```python
+    messages = service_bdd.get_all_messages_group('3')
+    body = dumps({"message": messages})
+    ```
+    """
+    if orjson is not None:
+        return orjson.dumps(
+                value,
+                default = default,
+                option = orjson.OPT_NON_STR_KEYS
+                )
+    return json.dumps(
+            value,
+            default = default,
+            ensure_ascii = False,
+            separators = (',', ':')
+            ).encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """ Decodes json bytes or string.
+    orjson is used when it is installed, the standard library otherwise.
+    ---
+    Parameters:
+        data (Union[bytes, str]): Json to decode.
+    ---
+    Returns:
+        (Any): Decoded value.
+    ---
+    Raises:
+        (ValueError): If the data is not valid json.
+    ---
+    Example:
+    ```python
+    assert(loads(b'{"id":"3"}') == {"id": "3"})
+    ```
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def loads_many(data: Union[bytes, str]) -> list[Any]:
+    """ Decodes a json array or newline delimited json (one object per line)
+    in a single parse.
+    The lines of newline delimited json are joined into one array instead of
+    being decoded one by one, blank lines are ignored.
+    ---
+    Parameters:
+        data (Union[bytes, str]): Json array or newline delimited json.
+    ---
+    Returns:
+        (list[Any]): Decoded values, in order.
+    ---
+    Raises:
+        (ValueError): If the data is not a valid json array or newline
+        delimited json.
+    ---
+    Example:
+    ```python
+    assert(loads_many(b'[{"id":"3"},{"id":"4"}]') == [{"id": "3"}, {"id": "4"}])
+    assert(loads_many(b'{"id":"3"}\n{"id":"4"}\n') == [{"id": "3"}, {"id": "4"}])
+    ```
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    data = data.strip()
+    if data[:1] == b'[':
+        values = loads(data)
+    else:
+        values = loads(
+                b'[' + b','.join(
+                    line for line in data.splitlines() if line.strip()
+                    ) + b']'
+                )
+    if not(isinstance(values, list)):
+        raise ValueError('Expected a json array or newline delimited json.')
+    return values
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Type
+import asyncio
+import threading
+import weakref
+
+class Flight:
+    """ Call in progress shared by every caller asking for the same key.
+    ---
+    Attributes:
+        done (threading.Event): Set once the call is over.
+        result (Any): Value returned by the call.
+        error (Optional[BaseException]): Exception raised by the call.
+    """
+
+    def __init__(self: Self):
+        """ Creates a new call in progress.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Single_flight:
+    """ Coalesces identical concurrent calls into a single one.
+    While a call for a key is in progress, the other callers asking for the
+    same key wait for it and receive its result (or its exception) instead of
+    running it again.
+    ---
+    Attributes:
+        lock (threading.Lock): Lock protecting the calls in progress.
+        flights (dict[Hashable, Flight]): Calls in progress of the threads.
+        async_flights (weakref.WeakKeyDictionary[asyncio.AbstractEventLoop,
+        dict[Hashable, asyncio.Future]]): Calls in progress of the
+        coroutines, for each event loop.
+    ---
+    Methods:
+        __init__(Self): Creates a new single-flight group.
+        do(Self,Hashable,Callable[[],Any]) -> Any: Runs the function unless a
+          call for the same key is in progress, and returns its result.
+        do_async(Self,Hashable,Callable[[],Any]) -> Any: Same as do for
+          coroutines, the function is run in the default executor.
+    """
+
+    def __init__(self: Self):
+        """ Creates a new single-flight group.
+        ---
+        Parameters:
+            self (Self): Current instance.
+        ---
+        Example:
+        ```python
+        single_flight = Single_flight()
+        ```
+        """
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.async_flights = weakref.WeakKeyDictionary()
+
+    def do(self: Self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """ Runs the function unless a call for the same key is in progress,
+        and returns its result.
+        The result is shared by every caller, it must not be modified.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Identifies the calls that can be coalesced.
+            function (Callable[[], Any]): Call to run.
+        ---
+        Returns:
+            (Any): Value returned by the function.
+        ---
+        Raises:
+            (Exception): Exception raised by the function.
+        ---
+        Example:
+        ```python
+        single_flight = Single_flight()
+        group = single_flight.do(
+                ('group', '3'),
+                lambda: service_bdd.fetch_query(query, ['3'])
+                )
+        ```
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                self.flights[key] = flight
+        if not(leader):
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = function()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def do_async(
+            self: Self,
+            key: Hashable,
+            function: Callable[[], Any]
+            ) -> Any:
+        """ Runs the function in the default executor unless a call for the
+        same key is in progress, and returns its result.
+        The call goes through do, so it is also shared with the threads asking
+        for the same key.
+        ---
+        Parameters:
+            self (Self): Current instance.
+            key (Hashable): Identifies the calls that can be coalesced.
+            function (Callable[[], Any]): Blocking call to run.
+        ---
+        Returns:
+            (Any): Value returned by the function.
+        ---
+        Raises:
+            (Exception): Exception raised by the function.
+        ---
+        Example:
+        ```python
+        single_flight = Single_flight()
+        group = await single_flight.do_async(
+                ('group', '3'),
+                lambda: service_bdd.fetch_query(query, ['3'])
+                )
+        ```
+        """
+        loop = asyncio.get_running_loop()
+        flights = self.async_flights.setdefault(loop, {})
+        future = flights.get(key)
+        if future is None:
+            future = loop.run_in_executor(None, self.do, key, function)
+            flights[key] = future
+            future.add_done_callback(lambda _: flights.pop(key, None))
+        return await asyncio.shield(future)
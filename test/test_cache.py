@@ -0,0 +1,128 @@
+import pytest
+import multiprocessing
+import os
+import time
+from shared.services.cache import Cache, Lru_cache, Shared_cache, serve_cache
+from shared.services.cache import cache_authkey, create_cache
+
+def test_get_absent():
+    cache = Lru_cache()
+    assert(cache.get('a') == None)
+    assert(cache.get('a', 0) == 0)
+
+def test_set():
+    cache = Lru_cache()
+    cache.set('a', 1)
+    assert(cache.get('a') == 1)
+    cache.set('a', 2)
+    assert(cache.get('a') == 2)
+
+def test_delete():
+    cache = Lru_cache()
+    cache.set('a', 1)
+    cache.delete('a')
+    assert(cache.get('a') == None)
+    cache.delete('a')
+
+def test_clear():
+    cache = Lru_cache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.clear()
+    assert(len(cache) == 0)
+
+def test_clear_namespace():
+    cache = Lru_cache()
+    cache.set(('negative', 'a'), 1)
+    cache.set(('token', 'a'), 2)
+    cache.set('a', 3)
+    cache.clear_namespace('negative')
+    assert(cache.get(('negative', 'a')) == None)
+    assert(cache.get(('token', 'a')) == 2)
+    assert(cache.get('a') == 3)
+
+def test_abstract():
+    with pytest.raises(TypeError):
+        Cache()
+
+def test_ttl():
+    cache = Lru_cache()
+    cache.set('a', 1, 0.01)
+    cache.set('b', 2, 0)
+    assert(cache.get('a') == 1)
+    assert(cache.get('b') == None)
+    time.sleep(0.02)
+    assert(cache.get('a') == None)
+
+def test_least_recently_used():
+    cache = Lru_cache(max_size = 2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert(cache.get('a') == 1)
+    cache.set('c', 3)
+    assert(cache.get('b') == None)
+    assert(cache.get('a') == 1)
+    assert(cache.get('c') == 3)
+
+def test_stats():
+    cache = Lru_cache()
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    assert(cache.stats() == {"hits": 1, "misses": 1, "size": 1})
+
+@pytest.fixture
+def cache_server(tmp_path):
+    address = str(tmp_path / 'cache.sock')
+    server = multiprocessing.Process(
+            target = serve_cache,
+            args = (address, b'secret'),
+            daemon = True
+            )
+    server.start()
+    for _ in range(100):
+        if os.path.exists(address):
+            break
+        time.sleep(0.05)
+    yield address
+    server.terminate()
+    server.join()
+
+def test_shared_between_clients(cache_server):
+    worker1 = Shared_cache('negative', cache_server, b'secret')
+    worker2 = Shared_cache('negative', cache_server, b'secret')
+    worker1.set('a', 1)
+    assert(worker2.get('a') == 1)
+    worker2.delete('a')
+    assert(worker1.get('a') == None)
+
+def test_shared_namespaces(cache_server):
+    cache1 = Shared_cache('negative', cache_server, b'secret')
+    cache2 = Shared_cache('token', cache_server, b'secret')
+    cache1.set('a', 1)
+    assert(cache2.get('a') == None)
+
+def test_shared_clear(cache_server):
+    cache1 = Shared_cache('negative', cache_server, b'secret')
+    cache2 = Shared_cache('token', cache_server, b'secret')
+    cache1.set('a', 1)
+    cache2.set('a', 2)
+    cache1.clear()
+    assert(cache1.get('a') == None)
+    assert(cache2.get('a') == 2)
+
+def test_authkey_required(monkeypatch):
+    monkeypatch.delenv('CACHE_AUTHKEY', raising = False)
+    with pytest.raises(ValueError):
+        cache_authkey()
+    with pytest.raises(ValueError):
+        serve_cache('unused', b'')
+    with pytest.raises(ValueError):
+        Shared_cache('negative', 'unused', b'')
+    monkeypatch.setenv('CACHE_AUTHKEY', 'secret')
+    assert(cache_authkey() == b'secret')
+
+def test_create_cache_without_authkey(monkeypatch):
+    monkeypatch.setenv('CACHE_BACKEND', 'shared')
+    monkeypatch.delenv('CACHE_AUTHKEY', raising = False)
+    assert(isinstance(create_cache('negative'), Lru_cache))
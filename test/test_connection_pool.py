@@ -0,0 +1,142 @@
+import pytest
+import threading
+import time
+from shared.services.connection_pool import Connection_pool
+from shared.exceptions.database_exception import DatabaseException
+
+class Fake_cursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query):
+        if self.connection.broken:
+            raise Exception('server closed the connection')
+        self.connection.queries.append(query)
+
+class Fake_connection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.queries = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        return Fake_cursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise Exception('server closed the connection')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+def fake_connect(connections):
+    def connect():
+        connection = Fake_connection()
+        connections.append(connection)
+        return connection
+    return connect
+
+def test_reuse():
+    connections = []
+    pool = Connection_pool(fake_connect(connections), max_size = 2)
+    with pool.connection() as connection1:
+        pass
+    with pool.connection() as connection2:
+        pass
+    assert(connection1 is connection2)
+    assert(len(connections) == 1)
+    assert(connection1.rollbacks == 2)
+
+def test_bounded():
+    connections = []
+    pool = Connection_pool(
+            fake_connect(connections),
+            max_size = 2,
+            timeout = 0.05
+            )
+    connection1 = pool.acquire()
+    connection2 = pool.acquire()
+    assert(connection1 is not connection2)
+    with pytest.raises(DatabaseException):
+        pool.acquire()
+    pool.release(connection2)
+    assert(pool.acquire() is connection2)
+    assert(len(connections) == 2)
+
+def test_wait_for_release():
+    pool = Connection_pool(fake_connect([]), max_size = 1, timeout = 1)
+    connection = pool.acquire()
+    threading.Timer(0.05, pool.release, [connection]).start()
+    start = time.monotonic()
+    assert(pool.acquire() is connection)
+    assert(time.monotonic() - start >= 0.04)
+
+def test_closed_connection_replaced():
+    connections = []
+    pool = Connection_pool(fake_connect(connections))
+    with pool.connection() as connection:
+        pass
+    connection.close()
+    with pool.connection() as new_connection:
+        pass
+    assert(new_connection is not connection)
+    assert(len(connections) == 2)
+
+def test_health_check():
+    connections = []
+    pool = Connection_pool(fake_connect(connections), check_interval = 0)
+    with pool.connection() as connection:
+        pass
+    with pool.connection() as same_connection:
+        pass
+    assert(same_connection is connection)
+    assert(connection.queries == ['SELECT 1'])
+    connection.broken = True
+    with pool.connection() as new_connection:
+        pass
+    assert(new_connection is not connection)
+    assert(connection.closed)
+
+def test_recent_connection_not_checked():
+    pool = Connection_pool(fake_connect([]), check_interval = 60)
+    with pool.connection() as connection:
+        pass
+    with pool.connection():
+        pass
+    assert(connection.queries == [])
+
+def test_broken_connection_dropped():
+    connections = []
+    pool = Connection_pool(fake_connect(connections), max_size = 1)
+    with pool.connection() as connection:
+        connection.broken = True
+    assert(connection.closed)
+    with pool.connection() as new_connection:
+        pass
+    assert(new_connection is not connection)
+
+def test_connect_error():
+    def connect():
+        raise Exception('could not connect to server')
+    pool = Connection_pool(connect, max_size = 1, timeout = 0.05)
+    for _ in range(2):
+        with pytest.raises(DatabaseException):
+            pool.acquire()
+
+def test_close():
+    pool = Connection_pool(fake_connect([]))
+    connection1 = pool.acquire()
+    connection2 = pool.acquire()
+    pool.release(connection1)
+    pool.release(connection2)
+    pool.close()
+    assert(connection1.closed and connection2.closed)
+    assert(pool.idle == [])
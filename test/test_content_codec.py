@@ -0,0 +1,41 @@
+import pytest
+from shared.services.content_codec import Content_codec, decode
+
+def test_short_content():
+    content_codec = Content_codec('zlib', threshold = 1024)
+    assert(content_codec.encode('Hello') == ('Hello', None, None))
+
+def test_round_trip():
+    content_codec = Content_codec('zlib', threshold = 16)
+    content = 'Hello world, é ' * 200
+    text, compressed, codec = content_codec.encode(content)
+    assert(text == None)
+    assert(codec == 'zlib')
+    assert(len(compressed) < len(content.encode('utf-8')))
+    assert(decode(text, compressed, codec) == content)
+    assert(decode(text, memoryview(compressed), codec) == content)
+
+def test_incompressible_content():
+    content_codec = Content_codec('zlib', threshold = 4)
+    content = 'aZ3$'
+    assert(content_codec.encode(content) == (content, None, None))
+
+def test_no_codec():
+    content_codec = Content_codec(None, threshold = 0)
+    content = 'Hello ' * 1000
+    assert(content_codec.encode(content) == (content, None, None))
+    assert(content_codec.encode(None) == (None, None, None))
+
+def test_decode_text():
+    assert(decode('Hello', None, None) == 'Hello')
+    assert(decode(None, None, None) == None)
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        Content_codec('lzma')
+    with pytest.raises(ValueError):
+        decode(None, b'data', 'lzma')
+
+def test_invalid_data():
+    with pytest.raises(ValueError):
+        decode(None, b'not zlib data', 'zlib')
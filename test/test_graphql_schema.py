@@ -0,0 +1,173 @@
+import pytest
+import asyncio
+import datetime
+from shared.models.group import Group
+from shared.models.media import Media
+from shared.models.message import Message
+from shared.models.user import User
+from shared.services.single_flight import Single_flight
+
+strawberry = pytest.importorskip('strawberry')
+from shared.services.graphql_schema import schema, Graphql_loaders
+
+JOIN_DATE = datetime.datetime(2024, 2, 2, 12, 30)
+
+class Stub_service_bdd:
+    """ Serves groups of three members, each group with a message of each
+    member, and counts the calls of each batch lookup.
+    """
+
+    def __init__(self, group_count):
+        self.single_flight = Single_flight()
+        self.group_ids = [str(index) for index in range(1, group_count + 1)]
+        self.calls = {}
+
+    def count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def member_ids(self, group_id):
+        return [str(int(group_id) * 10 + index) for index in range(3)]
+
+    def get_users(self, user_ids):
+        self.count('get_users')
+        return {
+                user_id: User(
+                    f'name{user_id}',
+                    None,
+                    f'{user_id}@example.com',
+                    JOIN_DATE,
+                    id = user_id
+                    )
+                for user_id in user_ids
+                }
+
+    def get_groups(self, group_ids):
+        self.count('get_groups')
+        return {
+                group_id: Group(f'group{group_id}', id = group_id)
+                for group_id in group_ids
+                }
+
+    def get_groups_users(self, user_ids):
+        self.count('get_groups_users')
+        return {
+                user_id: [
+                    Group(f'group{group_id}', id = group_id)
+                    for group_id in self.group_ids
+                    ]
+                for user_id in user_ids
+                }
+
+    def get_member_ids_groups(self, group_ids):
+        self.count('get_member_ids_groups')
+        return {group_id: self.member_ids(group_id) for group_id in group_ids}
+
+    def get_last_messages_groups(self, group_ids, limit):
+        self.count('get_last_messages_groups')
+        return {
+                group_id: [
+                    Message(
+                        f'Hi from {user_id}',
+                        user_id,
+                        group_id,
+                        1706873888,
+                        id = user_id
+                        )
+                    for user_id in self.member_ids(group_id)
+                    ][-limit:]
+                for group_id in group_ids
+                }
+
+    def get_medias_messages(self, message_ids):
+        self.count('get_medias_messages')
+        return {
+                message_id: [Media.from_row(
+                    (message_id, 'img', f'link/{message_id}.png', message_id)
+                    )]
+                for message_id in message_ids
+                }
+
+    def get_public_keys_groups(self, group_ids):
+        self.count('get_public_keys_groups')
+        return {
+                group_id: {
+                    user_id: f'key{user_id}'
+                    for user_id in self.member_ids(group_id)
+                    }
+                for group_id in group_ids
+                }
+
+def execute(service_bdd, query):
+    async def run():
+        return await schema.execute(
+                query,
+                context_value = {"loaders": Graphql_loaders(service_bdd)}
+                )
+
+    result = asyncio.run(run())
+    assert(result.errors is None)
+    return result.data
+
+NESTED_QUERY = '''
+{ groupsOfUser(userId: "1") { name members { name }
+  messages(last: 50) { content sender { name } medias { name link } } } }
+'''
+
+def test_user_fields():
+    service_bdd = Stub_service_bdd(1)
+    data = execute(
+            service_bdd,
+            '{ user(id: "5") { name firstName email joinDate } }'
+            )
+    assert(data == {"user": {
+        "name": "name5",
+        "firstName": None,
+        "email": "5@example.com",
+        "joinDate": JOIN_DATE.isoformat(),
+        }})
+
+def test_nested_query():
+    service_bdd = Stub_service_bdd(2)
+    data = execute(service_bdd, NESTED_QUERY)
+    groups = data["groupsOfUser"]
+    assert([group["name"] for group in groups] == ['group1', 'group2'])
+    assert(groups[0]["members"] == [
+        {"name": "name10"},
+        {"name": "name11"},
+        {"name": "name12"},
+        ])
+    assert(groups[1]["messages"][0] == {
+        "content": "Hi from 20",
+        "sender": {"name": "name20"},
+        "medias": [{"name": None, "link": "link/20.png"}],
+        })
+
+def test_nested_query_constant_calls():
+    calls = []
+    for group_count in (1, 10):
+        service_bdd = Stub_service_bdd(group_count)
+        execute(service_bdd, NESTED_QUERY)
+        calls.append(service_bdd.calls)
+    # One batch per loader, whatever the number of groups
+    assert(calls[0] == calls[1] == {
+        'get_groups_users': 1,
+        'get_member_ids_groups': 1,
+        'get_last_messages_groups': 1,
+        'get_users': 1,
+        'get_medias_messages': 1,
+        })
+
+def test_loaders_load_each_key_once():
+    service_bdd = Stub_service_bdd(1)
+
+    async def load():
+        loaders = Graphql_loaders(service_bdd)
+        return await asyncio.gather(
+                loaders.user.load('1'),
+                loaders.user.load('2'),
+                loaders.user.load('1'),
+                )
+
+    users = asyncio.run(load())
+    assert([user.name for user in users] == ['name1', 'name2', 'name1'])
+    assert(service_bdd.calls == {'get_users': 1})
@@ -122,3 +122,49 @@ def test_contains_user():
     group.add_user(user)
     assert(group.contains_user(user))
 
+
+def test_to_dict():
+    user = User('name', 'first_name', 'email', 0, id = '2')
+    group = Group('my_group', id = '5', l_users = [user])
+    assert(group.to_dict() == {
+        "id": "5",
+        "name": "my_group",
+        "l_users": [user.to_dict()]
+    })
+
+def test_slots():
+    group = Group('my_group')
+    assert(not(hasattr(group, '__dict__')))
+    with pytest.raises(AttributeError):
+        group.owner = 'owner'
+
+def test_users_by_id():
+    user = User('name', 'first_name', 'email', 0, id = '2')
+    renamed = User('new_name', 'first_name', 'email', 0, id = '2')
+    other = User('name', 'first_name', 'email', 0, id = '3')
+    group = Group('my_group', l_users = [user, other])
+    assert(group.contains_user(renamed))
+    group.add_user(renamed)
+    assert(list(group.get_users()) == [renamed, other])
+    assert(group.remove_user(renamed))
+    assert(list(group.get_users()) == [other])
+
+def test_users_order():
+    users = [User('name', 'first_name', 'email', 0, id = i) for i in range(5, 0, -1)]
+    group = Group('my_group', l_users = users)
+    assert(list(group.get_users()) == users)
+    group.remove_user(users[2])
+    group.add_user(users[2])
+    assert(list(group.get_users()) == users[:2] + users[3:] + users[2:3])
+
+def test_users_copied():
+    user = User('name', 'first_name', 'email', 0)
+    l_users = [user]
+    group = Group('my_group', l_users = l_users)
+    l_users.clear()
+    assert(list(group.get_users()) == [user])
+
+def test_from_json_many():
+    json_string = '[{"name": "my_group"}, {"id": "5", "name": "other"}]'
+    groups = Group.from_json_many(json_string)
+    assert(groups == [Group('my_group'), Group('other', id = '5')])
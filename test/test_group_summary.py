@@ -0,0 +1,60 @@
+import pytest
+from shared.models.group_summary import GroupSummary
+
+def test_eq():
+    summary1 = GroupSummary('3', 'my_group')
+    summary2 = GroupSummary('3', 'my_group')
+    summary3 = GroupSummary('3', 'my_group', 1, 1706873888, '5', 'Hi', '1')
+    assert(summary1 == summary2)
+    assert(summary1 != summary3)
+
+def test_to_json_empty():
+    summary = GroupSummary('3', 'my_group')
+    target = '{' \
+            '"group_id": "3", ' \
+            '"group_name": "my_group", ' \
+            '"message_count": 0, ' \
+            '"last_activity": null, ' \
+            '"last_message_id": null, ' \
+            '"last_message_content": null, ' \
+            '"last_message_sender_id": null}'
+    assert(summary.to_json() == target)
+    assert(str(summary) == target)
+
+def test_to_json():
+    summary = GroupSummary('3', 'my_group', 2, 1706873888, '5', 'Hi "you"', '1')
+    target = '{' \
+            '"group_id": "3", ' \
+            '"group_name": "my_group", ' \
+            '"message_count": 2, ' \
+            '"last_activity": 1706873888, ' \
+            '"last_message_id": "5", ' \
+            '"last_message_content": "Hi \\"you\\"", ' \
+            '"last_message_sender_id": "1"}'
+    assert(summary.to_json() == target)
+
+def test_from_json():
+    summary = GroupSummary('3', 'my_group', 2, 1706873888, '5', 'Hi', '1')
+    assert(GroupSummary.from_json(summary.to_json()) == summary)
+
+def test_getters():
+    summary = GroupSummary('3', 'my_group', 2, 1706873888, '5', 'Hi', '1')
+    assert(summary.get_group_id() == '3')
+    assert(summary.get_group_name() == 'my_group')
+    assert(summary.get_message_count() == 2)
+    assert(summary.get_last_activity() == 1706873888)
+    assert(summary.get_last_message_id() == '5')
+    assert(summary.get_last_message_content() == 'Hi')
+    assert(summary.get_last_message_sender_id() == '1')
+
+def test_to_dict():
+    summary = GroupSummary('3', 'my_group', 2, 1706873888, '5', 'Hi', '1')
+    assert(summary.to_dict() == {
+        "group_id": "3",
+        "group_name": "my_group",
+        "message_count": 2,
+        "last_activity": 1706873888,
+        "last_message_id": "5",
+        "last_message_content": "Hi",
+        "last_message_sender_id": "1"
+    })
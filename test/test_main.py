@@ -0,0 +1,54 @@
+import pytest
+import importlib
+
+class Fake_connection:
+    def cursor(self):
+        return None
+
+class Fake_service_bdd:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def get_public_key_buffer(self, group_id, user_id):
+        return memoryview(self.keys[('public', group_id, user_id)])
+
+    def get_private_key_buffer(self, group_id, user_id):
+        return memoryview(self.keys[('private', group_id, user_id)])
+
+@pytest.fixture
+def main(monkeypatch):
+    for module in (
+            'fastapi',
+            'httpx',
+            'jose',
+            'strawberry',
+            'sqlalchemy',
+            'dotenv',
+            'pyotp',
+            'psycopg2'
+            ):
+        pytest.importorskip(module)
+    from shared.services.db_service import Service_bdd
+    monkeypatch.setattr(
+            Service_bdd,
+            'connect',
+            staticmethod(lambda: Fake_connection())
+            )
+    main = importlib.import_module('app.main')
+    monkeypatch.setattr(main, 'KEY_CHUNK_SIZE', 4)
+    return main
+
+def test_get_key_binary(main, monkeypatch):
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr(main, 'bdd_service', Fake_service_bdd({
+        ('public', '1', '2'): b'public key\x00\xff',
+        ('private', '1', '2'): b'private key\x00\xff',
+        }))
+    client = TestClient(main.app)
+    headers = {"Accept": "application/octet-stream"}
+    response = client.get('/key/public/get/1/2', headers = headers)
+    assert(response.status_code == 200)
+    assert(response.content == b'public key\x00\xff')
+    response = client.get('/key/private/get/1/2', headers = headers)
+    assert(response.status_code == 200)
+    assert(response.content == b'private key\x00\xff')
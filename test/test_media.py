@@ -103,3 +103,33 @@ def test_set_message_id():
     media.set_message_id('5')
     assert(media.get_message_id() == '5')
 
+
+def test_to_dict():
+    media = Media('mon_image', 'img', 'link/to/image.png', '3', id = '4')
+    assert(media.to_dict() == {
+        "name": "mon_image",
+        "type_": "img",
+        "link": "link/to/image.png",
+        "message_id": "3",
+        "id": "4"
+    })
+
+def test_slots():
+    media = Media('mon_image', 'img', 'link/to/image.png', '3')
+    assert(not(hasattr(media, '__dict__')))
+
+def test_from_json_many():
+    ndjson = b'{"name": "mon_image", "type_": "img", ' \
+            b'"link": "link/to/image.png", "message_id": "3"}\n' \
+            b'{"name": "ma_video", "type_": "video", ' \
+            b'"link": "link/to/video.mp4", "message_id": "3", "id": "7"}\n'
+    assert(Media.from_json_many(ndjson) == [
+        Media('mon_image', 'img', 'link/to/image.png', '3'),
+        Media('ma_video', 'video', 'link/to/video.mp4', '3', id = '7'),
+    ])
+
+def test_from_row():
+    # The Media table has no name column
+    media = Media.from_row((4, 'img', 'link/to/image.png', 3))
+    assert(media == Media(None, 'img', 'link/to/image.png', 3, id = 4))
+    assert(media.get_message_id() == 3)
@@ -1,4 +1,5 @@
 import pytest
+import json
 from shared.models.message import Message
 
 def test_eq():
@@ -195,3 +196,34 @@ def test_set_id():
     message.set_id('5')
     assert(message.get_id() == '5')
 
+
+def test_to_dict():
+    message = Message('Hello world!', '1', '2', 1706873888, id = '4')
+    assert(message.to_dict() == {
+        "id": "4",
+        "content": "Hello world!",
+        "sender_id": "1",
+        "receiver_group_id": "2",
+        "date": 1706873888
+    })
+
+def test_slots():
+    message = Message('Hello world!', '1', '2', 1706873888)
+    assert(not(hasattr(message, '__dict__')))
+    with pytest.raises(AttributeError):
+        message.read = True
+
+def test_from_json_many():
+    messages = [
+            Message('Hello "world"!', '1', '2', 1706873888, id = '3'),
+            Message('Héllo', '1', '2', 1706873889, id = '4'),
+            ]
+    json_array = '[' + ', '.join(
+            json.dumps(message.to_dict()) for message in messages
+            ) + ']'
+    ndjson = ''.join(
+            json.dumps(message.to_dict()) + '\n' for message in messages
+            )
+    assert(Message.from_json_many(json_array) == messages)
+    assert(Message.from_json_many(ndjson.encode('utf-8')) == messages)
+    assert(Message.from_json_many('') == [])
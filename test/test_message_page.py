@@ -0,0 +1,95 @@
+import pytest
+from array import array
+from shared.models.message import Message
+from shared.models.message_page import MessagePage
+from shared.services import serializer
+
+ROWS = [
+        (1, 'Hi', 5, 1706873888),
+        (2, 'Héllo "world"', 6, 1706873889),
+        (3, '', 5, 1706873890),
+        ]
+
+def test_from_rows():
+    page = MessagePage.from_rows(3, ROWS)
+    assert(len(page) == 3)
+    assert(page.ids.tolist() == [1, 2, 3])
+    assert(page.sender_ids.tolist() == [5, 6, 5])
+    assert(page.dates.tolist() == [1706873888, 1706873889, 1706873890])
+    assert(page.contents() == ['Hi', 'Héllo "world"', ''])
+
+def test_mismatched_columns():
+    with pytest.raises(ValueError):
+        MessagePage(3, array('q', [1]), array('q'), array('q'), b'', array('q'))
+
+def test_getitem():
+    page = MessagePage.from_rows(3, ROWS)
+    assert(page[1] == Message('Héllo "world"', 6, 3, 1706873889, id = 2))
+    assert(page[-1] == Message('', 5, 3, 1706873890, id = 3))
+    with pytest.raises(IndexError):
+        page[3]
+
+def test_iter():
+    page = MessagePage.from_rows(3, ROWS)
+    assert([message.id for message in page] == [1, 2, 3])
+
+def test_from_messages():
+    page = MessagePage.from_rows(3, ROWS)
+    assert(MessagePage.from_messages(3, list(page)) == page)
+
+def test_slice_shares_buffers():
+    page = MessagePage.from_rows(3, ROWS)
+    sliced = page[1:3]
+    assert(sliced.content.obj is page.content.obj)
+    assert(sliced.ids.obj is page.ids.obj)
+    assert(sliced == MessagePage.from_rows(3, ROWS[1:3]))
+    assert(len(page[5:10]) == 0)
+    with pytest.raises(ValueError):
+        page[::2]
+
+def test_to_json():
+    page = MessagePage.from_rows(3, ROWS[:1])
+    assert(page.to_json() == '{' \
+            '"receiver_group_id": 3, ' \
+            '"id": [1], ' \
+            '"sender_id": [5], ' \
+            '"date": [1706873888], ' \
+            '"content": ["Hi"]}'
+            )
+
+def test_from_json():
+    page = MessagePage.from_rows(3, ROWS)
+    assert(MessagePage.from_json(page.to_json()) == page)
+    assert(MessagePage.from_json(page[1:].to_json()) == page[1:])
+
+def test_bytes():
+    page = MessagePage.from_rows(3, ROWS)
+    assert(MessagePage.from_bytes(page.to_bytes()) == page)
+    assert(MessagePage.from_bytes(page[1:2].to_bytes()) == page[1:2])
+    assert(MessagePage.from_bytes(page[3:].to_bytes()) == page[3:])
+
+def test_from_bytes_invalid():
+    with pytest.raises(ValueError):
+        MessagePage.from_bytes(b'MPG')
+    with pytest.raises(ValueError):
+        MessagePage.from_bytes(b'XXXX' + bytes(12))
+
+def test_from_json_many():
+    page = MessagePage.from_rows(3, ROWS)
+    messages = [
+            Message(content, str(sender_id), '3', date, id = str(id))
+            for id, content, sender_id, date in ROWS
+            ]
+    ndjson = '\n'.join(message.to_json() for message in messages[:1])
+    json_array = '[' + ', '.join(
+            serializer.dumps(message).decode('utf-8') for message in messages
+            ) + ']'
+    assert(MessagePage.from_json_many(3, json_array) == page)
+    assert(MessagePage.from_json_many(3, ndjson) == page[:1])
+    assert(len(MessagePage.from_json_many(3, '')) == 0)
+
+def test_from_json_many_other_group():
+    ndjson = '{"id": 1, "content": "Hi", "sender_id": 5, ' \
+            '"receiver_group_id": 4, "date": 1706873888}\n'
+    with pytest.raises(ValueError):
+        MessagePage.from_json_many(3, ndjson)
@@ -0,0 +1,246 @@
+import pytest
+import email
+import functools
+import socketserver
+import threading
+import time
+from shared.services.messaging import Email_queue, build_totp_email
+from shared.services.messaging import connect_smtp
+from shared.exceptions.overloaded_exception import OverloadedException
+
+class Smtp_handler(socketserver.StreamRequestHandler):
+    """ Answers just enough SMTP for smtplib to send emails. """
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.sessions += 1
+        self.reply('220 localhost ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not(line):
+                return
+            command = line.decode('ascii').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command.split(':', 1)[1].strip('<> ')
+                if recipient in server.refused:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 Go ahead')
+                data = b''
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b'.\r\n', b''):
+                        break
+                    data += line
+                with server.lock:
+                    failures = server.failures
+                    server.failures = max(failures - 1, 0)
+                if failures:
+                    self.reply('451 Try again later')
+                else:
+                    with server.lock:
+                        server.received.append(
+                            (recipients, email.message_from_bytes(data))
+                            )
+                    self.reply('250 OK')
+            elif verb == 'RSET':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+class Smtp_server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), Smtp_handler)
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.received = []
+        self.refused = set()
+        self.failures = 0
+
+@pytest.fixture
+def smtp_server():
+    server = Smtp_server()
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_queue(server, **kwargs):
+    connect = functools.partial(
+            connect_smtp,
+            '127.0.0.1',
+            server.server_address[1],
+            starttls = False,
+            timeout = 2
+            )
+    return Email_queue(connect, 'noreply@example.com', **kwargs)
+
+def test_build_totp_email():
+    message = build_totp_email('noreply@example.com', 'a@example.com', '123')
+    assert(message['From'] == 'noreply@example.com')
+    assert(message['To'] == 'a@example.com')
+    assert('The code is: 123' in message.get_payload()[0].get_payload())
+
+def test_persistent_session(smtp_server):
+    email_queue = make_queue(smtp_server)
+    try:
+        for index in range(10):
+            email_queue.enqueue_totp(f'user{index}@example.com', str(index))
+        email_queue.join()
+        email_queue.enqueue_totp('late@example.com', '10')
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    recipients = [recipients for recipients, _ in smtp_server.received]
+    assert(recipients == [
+        [f'user{index}@example.com'] for index in range(10)
+        ] + [['late@example.com']])
+    assert(smtp_server.sessions == 1)
+    assert(email_queue.sent == 11)
+    assert(email_queue.session is None)
+
+def test_enqueue_returns_immediately(smtp_server):
+    email_queue = make_queue(smtp_server)
+    try:
+        start = time.monotonic()
+        email_queue.enqueue_totp('user@example.com', '123')
+        assert(time.monotonic() - start < 0.05)
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(len(smtp_server.received) == 1)
+
+def test_idle_session_closed(smtp_server):
+    email_queue = make_queue(smtp_server, idle_timeout = 0.05)
+    try:
+        email_queue.enqueue_totp('user1@example.com', '1')
+        email_queue.join()
+        time.sleep(0.2)
+        assert(email_queue.session is None)
+        email_queue.enqueue_totp('user2@example.com', '2')
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(smtp_server.sessions == 2)
+    assert(email_queue.sent == 2)
+
+def test_retry_with_backoff(smtp_server):
+    smtp_server.failures = 2
+    email_queue = make_queue(smtp_server, backoff = 0.05)
+    try:
+        start = time.monotonic()
+        email_queue.enqueue_totp('user@example.com', '123')
+        email_queue.join()
+        # Waited 0.05 then 0.1 seconds
+        assert(time.monotonic() - start >= 0.15)
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(len(smtp_server.received) == 1)
+    assert(email_queue.sent == 1)
+    assert(email_queue.dropped == 0)
+
+def test_max_attempts(smtp_server):
+    smtp_server.failures = 10
+    email_queue = make_queue(smtp_server, backoff = 0.01, max_attempts = 3)
+    try:
+        email_queue.enqueue_totp('user@example.com', '123')
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(smtp_server.received == [])
+    assert(smtp_server.failures == 7)
+    assert(email_queue.dropped == 1)
+
+def test_refused_recipient_dropped(smtp_server):
+    smtp_server.refused.add('unknown@example.com')
+    email_queue = make_queue(smtp_server, backoff = 0.01)
+    try:
+        email_queue.enqueue_totp('unknown@example.com', '1')
+        email_queue.enqueue_totp('user@example.com', '2')
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert([r for r, _ in smtp_server.received] == [['user@example.com']])
+    assert(email_queue.dropped == 1)
+    assert(email_queue.sent == 1)
+
+def test_server_down():
+    server = Smtp_server()
+    port = server.server_address[1]
+    server.server_close()
+    connect = functools.partial(
+            connect_smtp,
+            '127.0.0.1',
+            port,
+            starttls = False,
+            timeout = 1
+            )
+    email_queue = Email_queue(connect, backoff = 0.01, max_attempts = 2)
+    try:
+        email_queue.enqueue_totp('user@example.com', '1')
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(email_queue.dropped == 1)
+
+def test_queue_full():
+    release = threading.Event()
+
+    def connect():
+        release.wait(2)
+        raise OSError('unreachable')
+
+    email_queue = Email_queue(connect, max_size = 1, max_attempts = 1)
+    try:
+        email_queue.enqueue_totp('user1@example.com', '1')
+        while email_queue.emails.qsize():
+            time.sleep(0.01)
+        email_queue.enqueue_totp('user2@example.com', '2')
+        with pytest.raises(OverloadedException):
+            email_queue.enqueue_totp('user3@example.com', '3')
+        release.set()
+        email_queue.join()
+    finally:
+        email_queue.stop(timeout = 2)
+    assert(email_queue.dropped == 2)
+
+def test_malformed_email_dropped(smtp_server):
+    email_queue = make_queue(smtp_server)
+    malformed = build_totp_email('noreply@example.com', 'bad@example.com', '1')
+    # smtplib refuses several Resent- blocks with a ValueError
+    malformed['Resent-Date'] = 'Mon, 19 Oct 2026 10:00:00 +0000'
+    malformed['Resent-Date'] = 'Mon, 19 Oct 2026 11:00:00 +0000'
+    try:
+        email_queue.enqueue(malformed)
+        email_queue.enqueue_totp('user@example.com', '2')
+        email_queue.join()
+        assert(email_queue.thread.is_alive())
+    finally:
+        email_queue.stop(timeout = 2)
+    assert([r for r, _ in smtp_server.received] == [['user@example.com']])
+    assert(email_queue.dropped == 1)
+    assert(email_queue.sent == 1)
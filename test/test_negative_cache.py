@@ -0,0 +1,54 @@
+import pytest
+import time
+from shared.services.cache import Lru_cache
+from shared.services.negative_cache import Negative_cache
+
+def test_contains_empty():
+    negative_cache = Negative_cache()
+    assert(not(negative_cache.contains('user', '5')))
+
+def test_add():
+    negative_cache = Negative_cache()
+    negative_cache.add('user', '5')
+    assert(negative_cache.contains('user', '5'))
+    assert(negative_cache.contains('user', 5))
+    assert(not(negative_cache.contains('group', '5')))
+
+def test_add_composite_key():
+    negative_cache = Negative_cache()
+    negative_cache.add('public_key', ('3', '5'))
+    assert(negative_cache.contains('public_key', (3, 5)))
+    assert(not(negative_cache.contains('public_key', ('5', '3'))))
+
+def test_discard():
+    negative_cache = Negative_cache()
+    negative_cache.add('group', 4)
+    negative_cache.discard('group', '4')
+    assert(not(negative_cache.contains('group', 4)))
+    negative_cache.discard('group', '4')
+
+def test_expiration():
+    negative_cache = Negative_cache(ttl = 0.01)
+    negative_cache.add('user', '5')
+    time.sleep(0.02)
+    assert(not(negative_cache.contains('user', '5')))
+
+def test_disabled():
+    negative_cache = Negative_cache(ttl = 0)
+    negative_cache.add('user', '5')
+    assert(not(negative_cache.contains('user', '5')))
+
+def test_max_size():
+    negative_cache = Negative_cache(cache = Lru_cache(max_size = 2))
+    negative_cache.add('user', '1')
+    negative_cache.add('user', '2')
+    negative_cache.add('user', '3')
+    assert(not(negative_cache.contains('user', '1')))
+    assert(negative_cache.contains('user', '2'))
+    assert(negative_cache.contains('user', '3'))
+
+def test_clear():
+    negative_cache = Negative_cache()
+    negative_cache.add('user', '5')
+    negative_cache.clear()
+    assert(not(negative_cache.contains('user', '5')))
@@ -0,0 +1,88 @@
+import pytest
+import asyncio
+import time
+from shared.services.password_hasher import Password_hasher
+from shared.exceptions.overloaded_exception import OverloadedException
+
+def slow_square(value, delay):
+    time.sleep(delay)
+    return value * value
+
+def fail(message):
+    raise ValueError(message)
+
+def test_run():
+    password_hasher = Password_hasher(workers = 1, max_pending = 4)
+    try:
+        assert(asyncio.run(password_hasher.run(slow_square, 3, 0)) == 9)
+        assert(password_hasher.pending == 0)
+    finally:
+        password_hasher.shutdown()
+
+def test_run_error():
+    password_hasher = Password_hasher(workers = 1, max_pending = 4)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(password_hasher.run(fail, 'wrong'))
+        assert(password_hasher.pending == 0)
+    finally:
+        password_hasher.shutdown()
+
+def test_queue_limit():
+    password_hasher = Password_hasher(workers = 1, max_pending = 2)
+
+    async def burst():
+        calls = [
+                asyncio.ensure_future(
+                    password_hasher.run(slow_square, value, 0.2)
+                    )
+                for value in range(3)
+                ]
+        return await asyncio.gather(*calls, return_exceptions = True)
+
+    try:
+        results = asyncio.run(burst())
+        assert(results[:2] == [0, 1])
+        assert(isinstance(results[2], OverloadedException))
+        assert(password_hasher.pending == 0)
+        assert(asyncio.run(password_hasher.run(slow_square, 4, 0)) == 16)
+    finally:
+        password_hasher.shutdown()
+
+def test_event_loop_not_blocked():
+    password_hasher = Password_hasher(workers = 1, max_pending = 2)
+
+    async def tick(ticks):
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def hash_while_ticking():
+        ticks = []
+        ticker = asyncio.ensure_future(tick(ticks))
+        await password_hasher.run(slow_square, 2, 0.3)
+        ticker.cancel()
+        return ticks
+
+    try:
+        # Starts the worker before measuring
+        asyncio.run(password_hasher.run(slow_square, 1, 0))
+        ticks = asyncio.run(hash_while_ticking())
+        assert(len(ticks) > 10)
+        assert(max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1)
+    finally:
+        password_hasher.shutdown()
+
+def test_hash_and_check():
+    pytest.importorskip('bcrypt')
+    password_hasher = Password_hasher(workers = 1, max_pending = 2)
+    try:
+        hashed_password = asyncio.run(password_hasher.hash('my_password'))
+        assert(asyncio.run(
+            password_hasher.check('my_password', hashed_password)
+            ))
+        assert(not(asyncio.run(
+            password_hasher.check('other_password', hashed_password)
+            )))
+    finally:
+        password_hasher.shutdown()
@@ -0,0 +1,55 @@
+import pytest
+import json
+import datetime
+from shared.services import serializer
+from shared.models.message import Message
+from shared.models.user import User
+
+def test_dumps_models():
+    message = Message('Hello "world"!', '1', '2', 1706873888, id = '3')
+    data = serializer.dumps({"message": [message]})
+    assert(isinstance(data, bytes))
+    assert(json.loads(data) == {"message": [message.to_dict()]})
+
+def test_dumps_non_str_keys():
+    user = User('my_name', 'my_first_name', 'my_email', 1706873888, id = 5)
+    data = serializer.dumps({"users": {5: user}})
+    assert(json.loads(data) == {"users": {"5": user.to_dict()}})
+
+def test_dumps_unknown_type():
+    with pytest.raises(TypeError):
+        serializer.dumps({"value": object()})
+
+def test_dumps_fallback(monkeypatch):
+    monkeypatch.setattr(serializer, 'orjson', None)
+    message = Message('Hé', '1', '2', 1706873888, id = '3')
+    data = serializer.dumps({4: [message]})
+    assert(data == '{"4":[{"id":"3","content":"Hé","sender_id":"1",'
+           '"receiver_group_id":"2","date":1706873888}]}'.encode('utf-8'))
+    assert(serializer.loads(data) == {"4": [message.to_dict()]})
+
+def test_dumps_fallback_datetime(monkeypatch):
+    join_date = datetime.datetime(2024, 2, 2, 12, 30, 5, 123000)
+    user = User('my_name', None, 'my_email', join_date, id = 5)
+    expected = serializer.dumps([user])
+    monkeypatch.setattr(serializer, 'orjson', None)
+    assert(serializer.dumps([user]) == expected)
+    assert(serializer.loads(expected)[0]["join_date"] == join_date.isoformat())
+
+def test_loads():
+    assert(serializer.loads(b'{"id":"3"}') == {"id": "3"})
+    assert(serializer.loads('[1, 2]') == [1, 2])
+
+def test_loads_many():
+    target = [{"id": "3"}, {"id": "é"}]
+    assert(serializer.loads_many('[{"id": "3"}, {"id": "é"}]') == target)
+    assert(serializer.loads_many(b'{"id": "3"}\n\n{"id": "\xc3\xa9"}\n') == target)
+    assert(serializer.loads_many('{"id": "3"}\r\n{"id": "é"}') == target)
+    assert(serializer.loads_many('') == [])
+    assert(serializer.loads_many('[]') == [])
+
+def test_loads_many_invalid():
+    with pytest.raises(ValueError):
+        serializer.loads_many('{"id": "3"} {"id": "4"}')
+    with pytest.raises(ValueError):
+        serializer.loads_many('[{"id": "3"}')
@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import threading
+import time
+from shared.services.single_flight import Single_flight
+
+def slow_call(calls, result, delay = 0.05):
+    def function():
+        calls.append(None)
+        time.sleep(delay)
+        return result
+    return function
+
+def test_do():
+    single_flight = Single_flight()
+    assert(single_flight.do('key', lambda: 5) == 5)
+    assert(single_flight.do('key', lambda: 6) == 6)
+
+def test_do_concurrent():
+    single_flight = Single_flight()
+    calls = []
+    results = []
+    function = slow_call(calls, 'result')
+    threads = [
+            threading.Thread(
+                target = lambda: results.append(
+                    single_flight.do('key', function)
+                    )
+                )
+            for _ in range(10)
+            ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(len(calls) == 1)
+    assert(results == ['result'] * 10)
+
+def test_do_different_keys():
+    single_flight = Single_flight()
+    calls = []
+    threads = [
+            threading.Thread(
+                target = single_flight.do,
+                args = (key, slow_call(calls, key))
+                )
+            for key in ('a', 'b')
+            ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(len(calls) == 2)
+
+def test_do_error():
+    single_flight = Single_flight()
+    def function():
+        raise ValueError('failed')
+    with pytest.raises(ValueError):
+        single_flight.do('key', function)
+    assert(single_flight.do('key', lambda: 5) == 5)
+
+def test_do_async_concurrent():
+    single_flight = Single_flight()
+    calls = []
+    function = slow_call(calls, 'result')
+    async def main():
+        return await asyncio.gather(*(
+            single_flight.do_async('key', function) for _ in range(10)
+            ))
+    results = asyncio.run(main())
+    assert(len(calls) == 1)
+    assert(results == ['result'] * 10)
+    assert(asyncio.run(single_flight.do_async('key', lambda: 5)) == 5)
+
+def test_do_async_shared_with_threads():
+    single_flight = Single_flight()
+    calls = []
+    function = slow_call(calls, 'result', 0.2)
+    thread = threading.Thread(target = single_flight.do, args = ('key', function))
+    thread.start()
+    time.sleep(0.05)
+    result = asyncio.run(single_flight.do_async('key', function))
+    thread.join()
+    assert(len(calls) == 1)
+    assert(result == 'result')
@@ -285,3 +285,43 @@ def test_set_auth_id():
     user.set_auth_id('5')
     assert(user.get_auth_id() == '5')
 
+
+def test_to_dict():
+    user = User(
+        "my_name",
+        "my_first_name",
+        "my_email",
+        1706873888,
+        id = "5",
+        auth_id = "4"
+    )
+    assert(user.to_dict() == {
+        "name": "my_name",
+        "first_name": "my_first_name",
+        "email": "my_email",
+        "join_date": 1706873888,
+        "id": "5",
+        "auth_id": "4"
+    })
+
+def test_slots():
+    user = User(
+        "my_name",
+        "my_first_name",
+        "my_email",
+        1706873888,
+    )
+    assert(not(hasattr(user, '__dict__')))
+    with pytest.raises(AttributeError):
+        user.nickname = 'nick'
+
+def test_from_json_many():
+    users = [
+        User('my_name', 'my_first_name', 'my_email', 1706873888, id = '5'),
+        User('other', 'first', 'other_email', 1706873889, auth_id = '4'),
+    ]
+    ndjson = '{"id": "5", "name": "my_name", "first_name": "my_first_name", ' \
+        '"email": "my_email", "join_date": 1706873888}\n' \
+        '{"name": "other", "first_name": "first", "email": "other_email", ' \
+        '"join_date": 1706873889, "auth_id": "4"}\n'
+    assert(User.from_json_many(ndjson) == users)